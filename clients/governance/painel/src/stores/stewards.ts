@@ -1,5 +1,5 @@
 import { defineStore } from 'pinia'
-import { ref } from 'vue'
+import { ref, computed } from 'vue'
 import axiosInstance from '../lib/axios'
 import { useAppStore } from './app'
 
@@ -12,17 +12,26 @@ export interface Steward {
   created_at: string
 }
 
+const PAGE_SIZE = 50
+
 export const useStewardsStore = defineStore('stewards', () => {
   const appStore = useAppStore()
   const stewards = ref<Steward[]>([])
+  const nextCursor = ref<string | null>(null)
   const isLoading = ref(false)
+  const hasMore = computed(() => nextCursor.value !== null)
 
-  async function fetchStewards(): Promise<void> {
+  // Listagem paginada por cursor: carrega uma página por vez
+  async function loadPage(cursor: string | null): Promise<void> {
     try {
       isLoading.value = true
-      const response = await axiosInstance.get('/stewards')
+      const response = await axiosInstance.get('/stewards', {
+        params: { limit: PAGE_SIZE, cursor: cursor ?? undefined }
+      })
       if (response.data.code === 'SUCCESS') {
-        stewards.value = response.data.data
+        const page = response.data.data
+        stewards.value = cursor ? [...stewards.value, ...page.items] : page.items
+        nextCursor.value = page.next_cursor ?? null
       }
     } catch (error) {
       console.error('Erro ao buscar stewards:', error)
@@ -32,6 +41,14 @@ export const useStewardsStore = defineStore('stewards', () => {
     }
   }
 
+  async function fetchStewards(): Promise<void> {
+    await loadPage(null)
+  }
+
+  async function fetchMoreStewards(): Promise<void> {
+    if (nextCursor.value) await loadPage(nextCursor.value)
+  }
+
   function getStewardById(id: string): Steward | undefined {
     return stewards.value.find(s => s.id === id)
   }
@@ -44,7 +61,9 @@ export const useStewardsStore = defineStore('stewards', () => {
   return {
     stewards,
     isLoading,
+    hasMore,
     fetchStewards,
+    fetchMoreStewards,
     getStewardById,
     getStewardName
   }
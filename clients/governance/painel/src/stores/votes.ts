@@ -1,5 +1,5 @@
 import { defineStore } from 'pinia'
-import { ref } from 'vue'
+import { ref, computed } from 'vue'
 import axiosInstance from '../lib/axios'
 import { useAppStore } from './app'
 
@@ -33,10 +33,14 @@ export interface VoteRequest {
   comment?: string
 }
 
+const PAGE_SIZE = 50
+
 export const useVotesStore = defineStore('votes', () => {
   const appStore = useAppStore()
   const clientVotes = ref<VoteData | null>(null)
   const stewardVotes = ref<Vote[]>([])
+  const stewardVotesCursor = ref<string | null>(null)
+  const hasMoreStewardVotes = computed(() => stewardVotesCursor.value !== null)
   const isLoadingClientVotes = ref(false)
   const isLoadingStewardVotes = ref(false)
   const isSubmittingVote = ref(false)
@@ -59,13 +63,18 @@ export const useVotesStore = defineStore('votes', () => {
     }
   }
 
-  async function fetchStewardVotes(stewardId: string): Promise<Vote[]> {
+  // Listagem paginada por cursor: carrega uma página por vez
+  async function loadStewardVotesPage(stewardId: string, cursor: string | null): Promise<Vote[]> {
     try {
       isLoadingStewardVotes.value = true
-      const response = await axiosInstance.get(`/stewards/${stewardId}/votes`)
+      const response = await axiosInstance.get(`/stewards/${stewardId}/votes`, {
+        params: { limit: PAGE_SIZE, cursor: cursor ?? undefined }
+      })
       if (response.data.code === 'SUCCESS') {
-        stewardVotes.value = response.data.data
-        return response.data.data
+        const page = response.data.data
+        stewardVotes.value = cursor ? [...stewardVotes.value, ...page.items] : page.items
+        stewardVotesCursor.value = page.next_cursor ?? null
+        return page.items
       }
       return []
     } catch (error) {
@@ -77,6 +86,49 @@ export const useVotesStore = defineStore('votes', () => {
     }
   }
 
+  async function fetchStewardVotes(stewardId: string): Promise<Vote[]> {
+    return loadStewardVotesPage(stewardId, null)
+  }
+
+  async function fetchMoreStewardVotes(stewardId: string): Promise<Vote[]> {
+    if (!stewardVotesCursor.value) return []
+    return loadStewardVotesPage(stewardId, stewardVotesCursor.value)
+  }
+
+  // Eventos de votação em tempo real (SSE): aplica deltas em clientVotes
+  let votingEvents: EventSource | null = null
+
+  function subscribeToVoting(clientId: string): void {
+    unsubscribeFromVoting()
+    const url = `${import.meta.env.VITE_API_BASE_URL}/clients/voting/events?client_id=${encodeURIComponent(clientId)}`
+    votingEvents = new EventSource(url)
+
+    votingEvents.addEventListener('vote-cast', (event) => {
+      const { vote, counts } = JSON.parse((event as MessageEvent).data)
+      const current = clientVotes.value
+      if (!current || current.client_id !== vote.client_id) return
+      if (!current.votes.some(v => v.id === vote.id)) {
+        current.votes.push(vote)
+      }
+      current.total_votes = counts.total
+      current.approve_votes = counts.approve
+      current.reject_votes = counts.reject
+      current.abstain_votes = counts.abstain
+    })
+
+    votingEvents.addEventListener('status-changed', (event) => {
+      const { client_id, status } = JSON.parse((event as MessageEvent).data)
+      if (clientVotes.value && clientVotes.value.client_id === client_id) {
+        clientVotes.value.status = status
+      }
+    })
+  }
+
+  function unsubscribeFromVoting(): void {
+    votingEvents?.close()
+    votingEvents = null
+  }
+
   async function submitVote(voteRequest: VoteRequest): Promise<boolean> {
     try {
       isSubmittingVote.value = true
@@ -97,8 +149,12 @@ export const useVotesStore = defineStore('votes', () => {
     }
   }
 
-  function getStewardVoteForClient(clientId: string): Vote | null {
-    return stewardVotes.value.find(v => v.client_id === clientId) || null
+  // Os votos do cliente aberto já trazem todos os stewards; não depende das páginas de stewardVotes
+  function getStewardVoteForClient(clientId: string, stewardId: string): Vote | null {
+    const fromClient = clientVotes.value?.client_id === clientId
+      ? clientVotes.value.votes.find(v => v.steward_id === stewardId)
+      : undefined
+    return fromClient || stewardVotes.value.find(v => v.client_id === clientId && v.steward_id === stewardId) || null
   }
 
   function getVoteBadgeClass(vote: string): string {
@@ -126,12 +182,16 @@ export const useVotesStore = defineStore('votes', () => {
   return {
     clientVotes,
     stewardVotes,
+    hasMoreStewardVotes,
     isLoadingClientVotes,
     isLoadingStewardVotes,
     isSubmittingVote,
     fetchClientVotes,
     fetchStewardVotes,
+    fetchMoreStewardVotes,
     submitVote,
+    subscribeToVoting,
+    unsubscribeFromVoting,
     getStewardVoteForClient,
     getVoteBadgeClass,
     getVoteLabel,
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from typing import Dict, Any, Iterator, List, Literal, Tuple
+
+ImportFormat = Literal["csv", "ndjson"]
+
+# Colunas aceitas no arquivo de importação (mesmos campos de ClientCreate)
+IMPORT_FIELDS = ["company_name", "cnpj", "email", "phone", "address", "client_type", "description"]
+
+
+def detect_format(content_type: str | None) -> ImportFormat:
+    if content_type and "csv" in content_type:
+        return "csv"
+    return "ndjson"
+
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Mantém apenas as colunas conhecidas e remove a formatação do CNPJ"""
+    normalized = {}
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "" and field == "description":
+                value = None
+        normalized[field] = value
+    
+    if isinstance(normalized["cnpj"], str):
+        normalized["cnpj"] = "".join(c for c in normalized["cnpj"] if c not in ".-/ ")
+    return normalized
+
+
+def _csv_records(text: str) -> Iterator[Tuple[int, Dict[str, Any] | None, str | None]]:
+    reader = csv.DictReader(io.StringIO(text))
+    # Linha 1 é o cabeçalho
+    for line, row in enumerate(reader, start=2):
+        yield line, row, None
+
+
+def _ndjson_records(text: str) -> Iterator[Tuple[int, Dict[str, Any] | None, str | None]]:
+    for line, raw in enumerate(text.splitlines(), start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError as e:
+            yield line, None, f"JSON inválido: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line, None, "Cada linha deve ser um objeto JSON"
+            continue
+        yield line, record, None
+
+
+def parse_records(body: bytes, import_format: ImportFormat) -> List[Tuple[int, Dict[str, Any] | None, str | None]]:
+    """
+    Lê o arquivo e retorna (linha, registro, erro de parsing) para cada registro.
+    Levanta ValueError se o conteúdo não for UTF-8.
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("Arquivo deve estar codificado em UTF-8")
+    
+    if import_format == "csv":
+        return list(_csv_records(text))
+    return list(_ndjson_records(text))
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from typing import List, Optional
-from modules.clients.schema import ClientCreate, ClientResponse, ClientListResponse, ClientVotingResponse
+from fastapi import APIRouter, HTTPException, status, Query, Request
+from typing import Optional
+from modules.clients.schema import ClientCreate, ClientResponse, ClientListResponse, ClientVotingResponse, ClientImportResponse
+from modules.clients.importer import ImportFormat, detect_format
 from modules.clients.service import client_service
-from modules.utils.model import SuccessResponse
+from modules.utils.model import SuccessResponse, CursorPage
+from modules.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from modules.utils.streaming import StreamFormat, stream_response
+from modules.utils.events import voting_events, format_sse
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+import asyncio
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 
@@ -16,26 +23,84 @@ def create_client(client_data: ClientCreate):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao criar cliente")
 
-@router.get("", response_model=SuccessResponse[List[ClientListResponse]])
+@router.post("/import", response_model=SuccessResponse[ClientImportResponse])
+async def import_clients(
+    request: Request,
+    import_format: Optional[ImportFormat] = Query(None, alias="format", description="csv ou ndjson (padrão: pelo Content-Type)")
+):
+    try:
+        body = await request.body()
+        if not body:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Arquivo de importação vazio")
+        
+        import_format = import_format or detect_format(request.headers.get("content-type"))
+        # Validação e escrita (pymongo síncrono) fora do event loop
+        report = await run_in_threadpool(client_service.import_clients, body, import_format)
+        return SuccessResponse(data=report)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao importar clientes")
+
+@router.get("", response_model=SuccessResponse[CursorPage[ClientListResponse]])
 def get_clients(
     status_filter: Optional[str] = Query(None, alias="status"),
     type_filter: Optional[str] = Query(None, alias="type"),
-    search: Optional[str] = Query(None)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    search: Optional[str] = Query(None, description="Busca por prefixo; ordenada por relevância"),
+    stream: Optional[StreamFormat] = Query(None, description="Envia a listagem em streaming (ndjson ou json)")
 ):
     try:
+        if stream and not search:
+            return stream_response(client_service.iter_clients(status_filter, type_filter), stream)
+        
         if search:
-            clients = client_service.search_clients(search)
-        elif status_filter:
-            clients = client_service.get_clients_by_status(status_filter)
-        elif type_filter:
-            clients = client_service.get_clients_by_type(type_filter)
+            clients = client_service.search_clients(search, limit, cursor)
         else:
-            clients = client_service.get_all_clients()
+            clients = client_service.get_clients(status_filter, type_filter, limit, cursor)
         
         return SuccessResponse(data=clients)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao buscar clientes")
 
+@router.get("/voting/events")
+async def stream_voting_events(
+    request: Request,
+    client_id: Optional[str] = Query(None, description="Recebe apenas eventos deste cliente")
+):
+    """
+    Server-Sent Events com os eventos de votação (vote-cast, status-changed),
+    para o painel aplicar deltas em vez de consultar a votação repetidamente.
+    """
+    queue = voting_events.subscribe()
+    
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Mantém a conexão viva através de proxies
+                    yield ": keepalive\n\n"
+                    continue
+                if client_id and message["data"].get("client_id") != client_id:
+                    continue
+                yield format_sse(message)
+        finally:
+            voting_events.unsubscribe(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/cnpj/{cnpj}", response_model=SuccessResponse[ClientResponse])
 def get_client_by_cnpj(cnpj: str):
     try:
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, field_validator
 from typing import Optional, Literal, List
 from datetime import datetime
 
@@ -10,6 +10,12 @@ class ClientCreate(BaseModel):
     address: str = Field(..., description="Endereço completo")
     client_type: Literal["issuer", "verifier", "both"] = Field(..., description="Tipo de cliente no fluxo SSI")
     description: Optional[str] = Field(None, description="Descrição/justificativa da solicitação")
+    
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, email: str) -> str:
+        # Email em minúsculas em todos os caminhos de criação (índice único e deduplicação)
+        return email.lower()
 
 class ClientResponse(BaseModel):
     id: str
@@ -35,6 +41,9 @@ class ClientListResponse(BaseModel):
     api_key: Optional[str] = None
     created_at: datetime
 
+class ClientAwaitingVoteResponse(ClientListResponse):
+    voting_deadline: Optional[datetime] = None
+
 class ClientVoteDetail(BaseModel):
     id: str
     steward_id: str
@@ -54,3 +63,17 @@ class ClientVotingResponse(BaseModel):
     first_vote_at: Optional[datetime]
     voting_deadline: Optional[datetime]
     votes: List[ClientVoteDetail]
+
+class ClientImportRowResult(BaseModel):
+    row: int = Field(..., description="Linha do registro no arquivo")
+    status: Literal["created", "duplicate", "invalid"]
+    client_id: Optional[str] = None
+    cnpj: Optional[str] = None
+    errors: List[str] = []
+
+class ClientImportResponse(BaseModel):
+    total: int
+    created: int
+    duplicates: int
+    invalid: int
+    rows: List[ClientImportRowResult]
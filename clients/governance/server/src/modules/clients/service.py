@@ -1,10 +1,35 @@
-from typing import List, Optional
-from modules.utils.mongodb import get_mongodb_client
+from typing import List, Optional, Iterator
+from modules.utils.mongodb import get_mongodb_client, duplicate_key_field
 from modules.utils.repositories import ClientRepository, VoteRepository, StewardRepository
-from modules.clients.schema import ClientCreate, ClientResponse, ClientListResponse, ClientVotingResponse, ClientVoteDetail
+from modules.clients.schema import (
+    ClientCreate,
+    ClientResponse,
+    ClientListResponse,
+    ClientVotingResponse,
+    ClientVoteDetail,
+    ClientImportRowResult,
+    ClientImportResponse
+)
+from modules.clients.importer import ImportFormat, parse_records, normalize_record
+from modules.utils.model import CursorPage
+from modules.utils.pagination import DEFAULT_PAGE_SIZE
+from modules.utils.events import voting_events
+from modules.config.settings import settings
 from pymongo.errors import DuplicateKeyError
+from pydantic import ValidationError
 from datetime import timedelta
 
+# Campos necessários para ClientListResponse
+LIST_PROJECTION = {
+    "company_name": 1,
+    "cnpj": 1,
+    "email": 1,
+    "client_type": 1,
+    "status": 1,
+    "api_key": 1,
+    "created_at": 1
+}
+
 class ClientService:
     def __init__(self):
         self.db_client = get_mongodb_client()
@@ -21,16 +46,9 @@ class ClientService:
         return ClientListResponse(**client_data)
     
     def create_client(self, client_data: ClientCreate) -> ClientResponse:
-        existing_cnpj = self.repository.find_by_cnpj(client_data.cnpj)
-        if existing_cnpj:
-            raise ValueError("Cliente com este CNPJ já existe")
-        
-        existing_email = self.repository.find_by_email(client_data.email)
-        if existing_email:
-            raise ValueError("Cliente com este email já existe")
-        
+        # Unicidade de CNPJ e email garantida pelos índices únicos
         try:
-            client_id = self.repository.create_client(
+            created_client = self.repository.create_client(
                 company_name=client_data.company_name,
                 cnpj=client_data.cnpj,
                 email=client_data.email,
@@ -40,13 +58,87 @@ class ClientService:
                 description=client_data.description,
                 status="em_votacao"
             )
-            
-            created_client = self.repository.find_by_id(client_id)
             return self._convert_to_response(created_client)
         
-        except DuplicateKeyError:
+        except DuplicateKeyError as e:
+            field = duplicate_key_field(e)
+            if field == "cnpj":
+                raise ValueError("Cliente com este CNPJ já existe")
+            if field == "email":
+                raise ValueError("Cliente com este email já existe")
             raise ValueError("Cliente já existe no sistema")
     
+    def import_clients(self, body: bytes, import_format: ImportFormat) -> ClientImportResponse:
+        """
+        Importação em lote de clientes (CSV ou NDJSON):
+        validação de todas as linhas em uma passada, deduplicação no arquivo e
+        contra a base com uma única consulta $in, e um insert_many (ordered=False).
+        """
+        records = parse_records(body, import_format)
+        if len(records) > settings.client_import_max_rows:
+            raise ValueError(f"Arquivo excede o limite de {settings.client_import_max_rows} registros")
+        
+        rows: List[ClientImportRowResult] = []
+        valid: List[tuple] = []
+        for line, record, parse_error in records:
+            if parse_error:
+                rows.append(ClientImportRowResult(row=line, status="invalid", errors=[parse_error]))
+                continue
+            normalized = normalize_record(record)
+            try:
+                client = ClientCreate.model_validate(normalized)
+            except ValidationError as e:
+                errors = [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()]
+                cnpj = normalized["cnpj"] if isinstance(normalized["cnpj"], str) else None
+                rows.append(ClientImportRowResult(row=line, status="invalid", cnpj=cnpj, errors=errors))
+                continue
+            
+            result = ClientImportRowResult(row=line, status="created", cnpj=client.cnpj)
+            rows.append(result)
+            valid.append((result, client.model_dump()))
+        
+        existing = self.repository.find_existing_keys(
+            [client["cnpj"] for _, client in valid],
+            [client["email"] for _, client in valid]
+        )
+        
+        # CNPJ/email já cadastrados ou repetidos em linhas anteriores do arquivo
+        to_insert: List[tuple] = []
+        in_file = {"cnpj": set(), "email": set()}
+        for result, client in valid:
+            errors = [
+                f"{field}: já cadastrado" for field in ("cnpj", "email")
+                if client[field] in existing[field]
+            ] + [
+                f"{field}: repetido no arquivo" for field in ("cnpj", "email")
+                if client[field] in in_file[field]
+            ]
+            if errors:
+                result.status = "duplicate"
+                result.errors = errors
+                continue
+            in_file["cnpj"].add(client["cnpj"])
+            in_file["email"].add(client["email"])
+            to_insert.append((result, client))
+        
+        documents = [client for _, client in to_insert]
+        errors = self.repository.create_clients(documents)
+        for position, (result, client) in enumerate(to_insert):
+            if position in errors:
+                # Inserido por outra requisição entre a consulta e o insert
+                result.status = "duplicate"
+                result.errors = [f"{duplicate_key_field(errors[position]) or 'registro'}: já cadastrado"]
+            else:
+                result.client_id = client["_id"]
+        
+        return ClientImportResponse(
+            total=len(rows),
+            created=sum(1 for row in rows if row.status == "created"),
+            duplicates=sum(1 for row in rows if row.status == "duplicate"),
+            invalid=sum(1 for row in rows if row.status == "invalid"),
+            rows=rows
+        )
+    
     def get_client_by_id(self, client_id: str) -> Optional[ClientResponse]:
         client_data = self.repository.find_by_id(client_id)
         if not client_data:
@@ -59,29 +151,62 @@ class ClientService:
             return None
         return self._convert_to_response(client_data)
     
-    def get_all_clients(self) -> List[ClientListResponse]:
-        clients = self.repository.find_all()
-        return [self._convert_to_list_response(client) for client in clients]
+    def _list_filter(self, status: Optional[str], client_type: Optional[str]) -> dict:
+        filter = {}
+        if status:
+            filter["status"] = status
+        elif client_type:
+            filter["client_type"] = client_type
+        return filter
     
-    def get_clients_by_status(self, status: str) -> List[ClientListResponse]:
-        clients = self.repository.find_by_status(status)
-        return [self._convert_to_list_response(client) for client in clients]
+    def get_clients(
+        self,
+        status: Optional[str] = None,
+        client_type: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> CursorPage[ClientListResponse]:
+        clients, next_cursor = self.repository.find_page(
+            self._list_filter(status, client_type),
+            projection=LIST_PROJECTION,
+            limit=limit,
+            cursor=cursor
+        )
+        return CursorPage(
+            items=[self._convert_to_list_response(client) for client in clients],
+            next_cursor=next_cursor
+        )
     
-    def get_clients_by_type(self, client_type: str) -> List[ClientListResponse]:
-        clients = self.repository.find_by_type(client_type)
-        return [self._convert_to_list_response(client) for client in clients]
+    def iter_clients(
+        self,
+        status: Optional[str] = None,
+        client_type: Optional[str] = None
+    ) -> Iterator[ClientListResponse]:
+        clients = self.repository.iter_many(
+            self._list_filter(status, client_type),
+            projection=LIST_PROJECTION,
+            sort=[("created_at", -1)]
+        )
+        return (self._convert_to_list_response(client) for client in clients)
     
-    def search_clients(self, query: str) -> List[ClientListResponse]:
-        clients = self.repository.search_clients(query)
-        return [self._convert_to_list_response(client) for client in clients]
+    def search_clients(self, query: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> CursorPage[ClientListResponse]:
+        # Ordenada por relevância; o cursor segue a mesma ordem
+        clients, next_cursor = self.repository.search_clients(
+            query,
+            projection=LIST_PROJECTION,
+            limit=limit,
+            cursor=cursor
+        )
+        return CursorPage(
+            items=[self._convert_to_list_response(client) for client in clients],
+            next_cursor=next_cursor
+        )
     
     def update_client_status(self, client_id: str, new_status: str) -> Optional[ClientResponse]:
-        client = self.repository.find_by_id(client_id)
-        if not client:
+        updated_client = self.repository.update_client_status(client_id, new_status)
+        if not updated_client:
             return None
-        
-        self.repository.update_client_status(client_id, new_status)
-        updated_client = self.repository.find_by_id(client_id)
+        voting_events.notify_status_changed(client_id, new_status)
         return self._convert_to_response(updated_client)
     
     def get_statistics(self) -> dict:
@@ -93,30 +218,31 @@ class ClientService:
             return None
         
         # Buscar todos os votos do cliente
-        votes = self.vote_repository.find_by_client(client_id)
+        votes = self.vote_repository.find_many({"client_id": client_id}, sort=[("created_at", 1)])
+        
+        # Resolver os nomes dos stewards em lote
+        steward_names = self.steward_repository.find_names_by_ids(vote["steward_id"] for vote in votes)
         
-        # Enriquecer votos com informações do steward
-        vote_details = []
-        for vote in votes:
-            steward = self.steward_repository.find_by_id(str(vote["steward_id"]))
-            vote_detail = ClientVoteDetail(
+        vote_details = [
+            ClientVoteDetail(
                 id=str(vote["_id"]),
                 steward_id=str(vote["steward_id"]),
-                steward_name=steward["name"] if steward else "Desconhecido",
+                steward_name=steward_names.get(str(vote["steward_id"]), "Desconhecido"),
                 vote=vote["vote"],
                 comment=vote.get("comment"),
                 created_at=vote["created_at"]
             )
-            vote_details.append(vote_detail)
+            for vote in votes
+        ]
         
-        # Contar votos
-        vote_counts = self.vote_repository.count_votes_by_client(client_id)
+        # Contar votos a partir do mesmo resultado
+        vote_counts = self.vote_repository.tally_votes(votes)
         
         # Calcular deadline de votação
         first_vote_at = client.get("first_vote_at")
-        voting_deadline = None
-        if first_vote_at:
-            voting_deadline = first_vote_at + timedelta(minutes=2)
+        voting_deadline = client.get("voting_deadline")
+        if first_vote_at and not voting_deadline:
+            voting_deadline = first_vote_at + timedelta(seconds=settings.voting_duration_seconds)
         
         return ClientVotingResponse(
             client_id=str(client["_id"]),
@@ -11,15 +11,30 @@ from modules.auth.routes import router as auth_router
 from modules.scheduler.routes import router as scheduler_router
 from modules.ledger.routes import router as ledger_router
 from modules.schemas.routes import router as schemas_router
+from modules.metrics.routes import router as metrics_router
 from modules.utils.scheduler import voting_scheduler
+from modules.ledger.service import ledger_service
+from modules.clients.service import client_service
+from modules.utils.events import voting_events
+from modules.utils.change_feed import start_change_feed, stop_change_feed
+import asyncio
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Iniciar scheduler de votação
+    # Startup: Iniciar scheduler de votação e eventos em tempo real
+    voting_events.attach(asyncio.get_running_loop())
+    start_change_feed(voting_events)
+    # Reenvio de registros pendentes na ledger só no worker líder
+    voting_scheduler.add_leader_task(ledger_service.resume_pending)
+    # Chaves de busca de clientes antigos, calculadas uma vez pelo líder (no-op depois)
+    voting_scheduler.add_leader_task(client_service.repository.backfill_search_fields)
     voting_scheduler.start()
     yield
-    # Shutdown: Parar scheduler
+    # Shutdown: Parar scheduler e fechar o pool HTTP do endorser
     await voting_scheduler.stop()
+    stop_change_feed()
+    await ledger_service.close_jobs()
+    await ledger_service.close()
 
 def create_app() -> FastAPI:
     app = FastAPI(lifespan=lifespan)
@@ -46,5 +61,6 @@ def create_app() -> FastAPI:
     app.include_router(scheduler_router, prefix="/api")
     app.include_router(ledger_router, prefix="/api")
     app.include_router(schemas_router, prefix="/api")
+    app.include_router(metrics_router, prefix="/api")
 
     return app
\ No newline at end of file
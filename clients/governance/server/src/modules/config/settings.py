@@ -28,13 +28,28 @@ class Settings:
 
         self.admin_url = os.getenv("ADMIN_URL", "http://localhost:8021")
         self.api_key = os.getenv("API_KEY", "ffbe0d09b05b46b442a82199206a8c9df97e513c06f05dd85075003430221fc6")
+        self.admin_timeout = float(os.getenv("ADMIN_TIMEOUT", 30))
+        self.admin_max_connections = int(os.getenv("ADMIN_MAX_CONNECTIONS", 20))
+        self.ledger_batch_concurrency = int(os.getenv("LEDGER_BATCH_CONCURRENCY", 8))
+        # Obrigatória: sem ela o webhook do endorser recusa todas as requisições
+        self.ledger_webhook_api_key = os.getenv("LEDGER_WEBHOOK_API_KEY", "")
+        # Chamada register-nym iniciada há mais que isso (s), sem transação no endorser,
+        # pode ser reenviada ou reaberta; maior que ADMIN_TIMEOUT
+        self.ledger_pending_timeout = int(os.getenv("LEDGER_PENDING_TIMEOUT", 120))
 
         self.company_name = os.getenv("COMPANY_NAME", "Governance")
 
+        self.voting_duration_seconds = int(os.getenv("VOTING_DURATION_SECONDS", 120))
+        self.voting_resync_interval = int(os.getenv("VOTING_RESYNC_INTERVAL", 60))
+        self.scheduler_lease_ttl = int(os.getenv("SCHEDULER_LEASE_TTL", 30))
+        self.voting_events_source = os.getenv("VOTING_EVENTS_SOURCE", "app")
+        self.client_import_max_rows = int(os.getenv("CLIENT_IMPORT_MAX_ROWS", 10000))
+
         self.mongo_host = os.getenv("MONGODB_HOST", "localhost")
         self.mongo_port = int(os.getenv("MONGODB_PORT", 27017))
         self.mongo_username = os.getenv("MONGODB_USERNAME", "admin")
         self.mongo_password = os.getenv("MONGODB_PASSWORD", "admin123")
         self.mongo_database_name = os.getenv("MONGODB_DATABASE", "governance")
+        self.mongo_slow_command_ms = int(os.getenv("MONGODB_SLOW_COMMAND_MS", 100))
 
 settings = Settings()
\ No newline at end of file
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Header
-from typing import Optional
-from modules.ledger.schemas import LedgerRegisterRequest, LedgerRegisterResponse
+from fastapi import APIRouter, HTTPException, status, Header, Body
+from typing import Optional, Dict, Any
+import hmac
+from modules.ledger.schemas import LedgerRegisterRequest, LedgerRegisterResponse, LedgerBatchRequest, LedgerBatchResponse
 from modules.ledger.service import ledger_service
 from modules.utils.model import SuccessResponse
 from modules.utils.repositories import ClientRepository
 from modules.utils.mongodb import get_mongodb_client
+from modules.config.settings import settings
 
 router = APIRouter(prefix="/ledger", tags=["ledger"])
 
@@ -33,7 +35,7 @@ def validate_api_key(x_api_key: Optional[str] = Header(None, alias="X-API-Key"))
     
     return str(client["_id"])
 
-@router.post("/register", response_model=SuccessResponse[LedgerRegisterResponse], status_code=status.HTTP_201_CREATED)
+@router.post("/register", response_model=SuccessResponse[LedgerRegisterResponse], status_code=status.HTTP_202_ACCEPTED)
 async def register_client_on_ledger(
     register_data: LedgerRegisterRequest,
     x_api_key: Optional[str] = Header(None, alias="X-API-Key")
@@ -59,3 +61,63 @@ async def register_client_on_ledger(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao registrar cliente na ledger: {str(e)}"
         )
+
+@router.get("/status", response_model=SuccessResponse[LedgerRegisterResponse])
+def get_registration_status(x_api_key: Optional[str] = Header(None, alias="X-API-Key")):
+    """Status do registro do DID do cliente na ledger (pending, registered ou failed)"""
+    try:
+        client_id = validate_api_key(x_api_key)
+        
+        truthy = ledger_service.get_registration_status(client_id)
+        if not truthy:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente não possui DID registrado")
+        return SuccessResponse(data=truthy)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao consultar status na ledger: {str(e)}"
+        )
+
+@router.post("/webhook/topic/{topic}/", status_code=status.HTTP_200_OK)
+def receive_endorser_webhook(
+    topic: str,
+    payload: Dict[str, Any] = Body(...),
+    x_api_key: Optional[str] = Header(None, alias="X-API-Key")
+):
+    """
+    Recebe os webhooks do agente endorser (configurado com
+    --webhook-url <governance>/api/ledger/webhook#<LEDGER_WEBHOOK_API_KEY>)
+    """
+    # Sem chave configurada o webhook fica fechado: qualquer um poderia concluir registros
+    if not settings.ledger_webhook_api_key:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Webhook do endorser não configurado")
+    if not hmac.compare_digest(x_api_key or "", settings.ledger_webhook_api_key):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="API Key inválida")
+    
+    try:
+        new_status = ledger_service.handle_webhook(topic, payload)
+        return {"status": "ok", "ledger_status": new_status}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar webhook: {str(e)}"
+        )
+
+@router.post("/register/batch", response_model=SuccessResponse[LedgerBatchResponse], status_code=status.HTTP_202_ACCEPTED)
+async def register_clients_batch(batch_data: LedgerBatchRequest):
+    """
+    Registra na ledger os DIDs de vários clientes aprovados, com resultado por
+    item. Cada item traz a API Key do cliente; o status final de cada registro
+    é consultado em GET /ledger/status.
+    """
+    try:
+        result = await ledger_service.register_batch(batch_data.items)
+        return SuccessResponse(data=result)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao registrar clientes na ledger: {str(e)}"
+        )
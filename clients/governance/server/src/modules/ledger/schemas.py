@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Literal
 from datetime import datetime
 
 class LedgerRegisterRequest(BaseModel):
@@ -16,4 +16,29 @@ class LedgerRegisterResponse(BaseModel):
     role: str
     alias: str
     ledger_status: str
+    ledger_error: Optional[str] = None
+    ledger_transaction_id: Optional[str] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class LedgerBatchItem(BaseModel):
+    client_id: str = Field(..., description="ID do cliente aprovado")
+    api_key: str = Field(..., description="API Key do cliente, a mesma exigida em /ledger/register")
+    did: str = Field(..., description="DID criado localmente pelo cliente")
+    verkey: str = Field(..., description="Chave pública correspondente ao DID")
+    acapy_admin_url: str = Field(..., description="URL do ACA-Py do cliente")
+
+class LedgerBatchRequest(BaseModel):
+    items: List[LedgerBatchItem] = Field(..., min_length=1, max_length=500)
+
+class LedgerBatchItemResult(BaseModel):
+    client_id: str
+    did: str
+    status: Literal["pending", "failed"]
+    error: Optional[str] = None
+    truthy: Optional[LedgerRegisterResponse] = None
+
+class LedgerBatchResponse(BaseModel):
+    pending: int
+    failed: int
+    results: List[LedgerBatchItemResult]
@@ -1,28 +1,79 @@
-from typing import Optional
-from modules.utils.mongodb import get_mongodb_client
-from modules.utils.repositories import TruthyRepository, ClientRepository
-from modules.ledger.schemas import LedgerRegisterRequest, LedgerRegisterResponse
+from typing import Optional, List, Dict, Any, Set
+from modules.utils.mongodb import get_mongodb_client, duplicate_key_field
+from modules.utils.repositories import TruthyRepository, ClientRepository, EndorserEventRepository
+from modules.ledger.schemas import (
+    LedgerRegisterRequest,
+    LedgerRegisterResponse,
+    LedgerBatchItem,
+    LedgerBatchItemResult,
+    LedgerBatchResponse
+)
 from modules.config.settings import settings
 from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
+from datetime import datetime, timedelta
+import asyncio
+import hmac
+import logging
 import httpx
 
+logger = logging.getLogger(__name__)
+
+# Campos do cliente usados no registro na ledger
+CLIENT_PROJECTION = {"status": 1, "client_type": 1, "company_name": 1}
+
+# Estados finais das transações do protocolo de endorsement
+ENDORSER_TRANSACTION_STATES = {
+    "transaction_acked": "registered",
+    "transaction_refused": "failed",
+    "transaction_cancelled": "failed"
+}
+
 class LedgerService:
     def __init__(self):
         self.db_client = get_mongodb_client()
         self.truthy_repository = TruthyRepository(self.db_client)
         self.client_repository = ClientRepository(self.db_client)
+        self.endorser_event_repository = EndorserEventRepository(self.db_client)
         self.endorser_admin_url = settings.admin_url
         self.endorser_api_key = settings.api_key
+        self._http: Optional[httpx.AsyncClient] = None
+        self._jobs: Set[asyncio.Task] = set()
+        # Limita as chamadas register-nym simultâneas (registro avulso e em lote)
+        self._ledger_slots = asyncio.Semaphore(settings.ledger_batch_concurrency)
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Cliente HTTP com pool de conexões reutilizado para a API admin do endorser"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.endorser_admin_url,
+                headers={"X-API-Key": self.endorser_api_key},
+                timeout=settings.admin_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.admin_max_connections,
+                    max_keepalive_connections=settings.admin_max_connections
+                )
+            )
+        return self._http
+    
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
     
     def _convert_to_response(self, truthy_data: dict) -> LedgerRegisterResponse:
         truthy_data["id"] = str(truthy_data.pop("_id"))
         truthy_data["client_id"] = str(truthy_data["client_id"])
         return LedgerRegisterResponse(**truthy_data)
     
+    def _ledger_role(self, client: dict) -> str:
+        client_type = client.get("client_type")
+        if client_type == "issuer" or client_type == "both":
+            return "ENDORSER"
+        return "NONE"
+    
     async def register_on_ledger(self, did: str, verkey: str, alias: str, role: str) -> dict:
-        url = f"{self.endorser_admin_url}/ledger/register-nym"
-        headers = {"X-API-Key": self.endorser_api_key}
         payload = {
             "did": did,
             "verkey": verkey,
@@ -30,59 +81,234 @@ class LedgerService:
             "role": role
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, params=payload, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.post("/ledger/register-nym", params=payload)
+        response.raise_for_status()
+        return response.json()
     
     async def register_client_did(self, client_id: str, register_data: LedgerRegisterRequest) -> LedgerRegisterResponse:
-        client = self.client_repository.find_by_id(client_id)
+        client = self.client_repository.find_by_id(client_id, projection=CLIENT_PROJECTION)
         if not client:
             raise ValueError("Cliente não encontrado")
         
         if client.get("status") != "aprovado":
             raise ValueError("Cliente não está aprovado")
         
-        existing_truthy = self.truthy_repository.find_by_client_id(client_id)
-        if existing_truthy:
-            raise ValueError("Cliente já possui DID registrado")
+        role = self._ledger_role(client)
+        alias = client.get("company_name", "Client")
         
-        existing_did = self.truthy_repository.find_by_did(register_data.did)
-        if existing_did:
-            raise ValueError("DID já registrado no sistema")
+        data = {
+            "did": register_data.did,
+            "verkey": register_data.verkey,
+            "acapy_admin_url": register_data.acapy_admin_url,
+            "role": role,
+            "alias": alias
+        }
         
-        client_type = client.get("client_type")
-        if client_type == "issuer" or client_type == "both":
-            role = "ENDORSER"
-        else:
-            role = "NONE"
+        # Reserva o registro como "pending": os índices únicos de client_id e
+        # did barram duplicatas de forma atômica. Um registro que falhou na
+        # ledger, ou cuja chamada ao endorser está parada além do timeout sem
+        # transação criada, pode ser reaberto com novos dados.
+        try:
+            truthy = self.truthy_repository.create_truthy(client_id=client_id, ledger_status="pending", **data)
+        except DuplicateKeyError as e:
+            truthy = None
+            if duplicate_key_field(e) == "client_id":
+                try:
+                    truthy = self.truthy_repository.reopen_registration(client_id, data, self._stale_before())
+                except DuplicateKeyError:
+                    raise ValueError("DID já registrado no sistema")
+                if not truthy:
+                    existing = self.truthy_repository.find_by_client_id(client_id) or {}
+                    if existing.get("ledger_status") == "pending":
+                        raise ValueError("Registro do DID na ledger em andamento, tente novamente mais tarde")
+            if not truthy:
+                raise ValueError(self._duplicate_message(e.details or {}))
         
-        alias = client.get("company_name", "Client")
+        # A escrita na ledger segue em background; o status é consultado em
+        # GET /ledger/status ou atualizado pelos webhooks do endorser
+        self._dispatch(truthy)
+        return self._convert_to_response(dict(truthy))
+    
+    def _dispatch(self, truthy: Dict[str, Any]):
+        task = asyncio.create_task(self._complete_registration(truthy))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+    
+    async def _complete_registration(self, truthy: Dict[str, Any]):
+        attempt = truthy.get("attempt")
+        async with self._ledger_slots:
+            # O timeout de pendência conta a partir daqui, não da reserva; se o
+            # registro foi reaberto ou reassumido durante a espera, desiste
+            if not self.truthy_repository.start_attempt(truthy["_id"], attempt):
+                return
+            try:
+                result = await self.register_on_ledger(
+                    did=truthy["did"],
+                    verkey=truthy["verkey"],
+                    alias=truthy["alias"],
+                    role=truthy["role"]
+                )
+            except Exception as e:
+                logger.error(f"Falha ao registrar DID {truthy['did']} na ledger: {e}")
+                self.truthy_repository.complete_attempt(truthy["_id"], attempt, "failed", ledger_error=str(e))
+                return
         
-        try:
-            await self.register_on_ledger(
-                did=register_data.did,
-                verkey=register_data.verkey,
-                alias=alias,
-                role=role
-            )
-            
-            truthy_id = self.truthy_repository.create_truthy(
-                client_id=client_id,
-                did=register_data.did,
-                verkey=register_data.verkey,
-                acapy_admin_url=register_data.acapy_admin_url,
-                role=role,
-                alias=alias,
-                ledger_status="registered"
+        # Com endorsement a escrita só termina quando o endorser confirmar a
+        # transação (webhook endorse_transaction)
+        transaction_id = (result.get("txn") or {}).get("transaction_id") if isinstance(result, dict) else None
+        if not transaction_id:
+            self.truthy_repository.complete_attempt(truthy["_id"], attempt, "registered")
+            return
+        
+        if not self.truthy_repository.attach_transaction(truthy["_id"], attempt, transaction_id):
+            return
+        # O webhook pode ter chegado antes da gravação acima
+        event = self.endorser_event_repository.pop_event(transaction_id)
+        if event:
+            self._apply_transaction_state(truthy, transaction_id, event["state"])
+    
+    def _stale_before(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=settings.ledger_pending_timeout)
+    
+    def resume_pending(self):
+        """
+        Reenvia registros pendentes que não chegaram ao endorser e estão parados
+        além do timeout (ex.: reinício do processo). Executado apenas pelo
+        worker líder do scheduler, na eleição e a cada ressincronização.
+        """
+        resumed = 0
+        stale_before = self._stale_before()
+        while True:
+            truthy = self.truthy_repository.claim_stale_pending(stale_before)
+            if not truthy:
+                break
+            self._dispatch(truthy)
+            resumed += 1
+        if resumed:
+            logger.info(f"{resumed} registros pendentes reenviados à ledger")
+    
+    async def close_jobs(self):
+        for task in list(self._jobs):
+            task.cancel()
+        await asyncio.gather(*self._jobs, return_exceptions=True)
+    
+    def get_registration_status(self, client_id: str) -> Optional[LedgerRegisterResponse]:
+        truthy = self.truthy_repository.find_by_client_id(client_id)
+        if not truthy:
+            return None
+        return self._convert_to_response(truthy)
+    
+    def handle_webhook(self, topic: str, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Processa eventos do endorser. Retorna o novo ledger_status aplicado,
+        ou None se o evento não corresponde a um registro conhecido.
+        """
+        if topic != "endorse_transaction":
+            return None
+        
+        transaction_id = payload.get("transaction_id")
+        new_status = ENDORSER_TRANSACTION_STATES.get(payload.get("state"))
+        if not transaction_id or not new_status:
+            return None
+        
+        truthy = self.truthy_repository.find_by_transaction_id(transaction_id)
+        if not truthy:
+            # Transação ainda não associada ao truthy: guarda o evento e confere
+            # de novo, caso a associação tenha sido gravada nesse intervalo
+            self.endorser_event_repository.save_event(transaction_id, payload.get("state"))
+            truthy = self.truthy_repository.find_by_transaction_id(transaction_id)
+            if not truthy:
+                return None
+            self.endorser_event_repository.pop_event(transaction_id)
+        
+        return self._apply_transaction_state(truthy, transaction_id, payload.get("state"))
+    
+    def _apply_transaction_state(self, truthy: Dict[str, Any], transaction_id: str, state: str) -> Optional[str]:
+        new_status = ENDORSER_TRANSACTION_STATES.get(state)
+        fields = {}
+        if new_status == "failed":
+            fields["ledger_error"] = f"Transação {state} pelo endorser"
+        if not self.truthy_repository.complete_pending(truthy["_id"], new_status, **fields):
+            return None
+        logger.info(f"DID {truthy['did']}: ledger_status={new_status} (transação {transaction_id})")
+        return new_status
+    
+    def _duplicate_message(self, error: Dict[str, Any]) -> str:
+        field = duplicate_key_field(error)
+        if field == "client_id":
+            return "Cliente já possui DID registrado"
+        if field == "did":
+            return "DID já registrado no sistema"
+        return "Registro já existe no sistema"
+    
+    async def register_batch(self, items: List[LedgerBatchItem]) -> LedgerBatchResponse:
+        """
+        Registra vários clientes aprovados de uma vez, cada item autenticado
+        pela API Key do próprio cliente:
+        - uma consulta $in para os clientes
+        - um insert_many (ordered=False) reservando os truthys como "pending"
+        - cada reserva segue o mesmo fluxo em background do registro avulso
+        """
+        results = [
+            LedgerBatchItemResult(client_id=item.client_id, did=item.did, status="failed")
+            for item in items
+        ]
+        
+        object_ids = [ObjectId(item.client_id) for item in items if ObjectId.is_valid(item.client_id)]
+        clients = {
+            client["_id"]: client
+            for client in self.client_repository.find_many(
+                {"_id": {"$in": object_ids}},
+                projection={**CLIENT_PROJECTION, "api_key": 1}
             )
+        }
+        
+        # Validação por item, incluindo duplicatas dentro do próprio lote
+        pending: List[int] = []
+        documents: List[Dict[str, Any]] = []
+        seen_clients, seen_dids = set(), set()
+        for index, item in enumerate(items):
+            client = clients.get(item.client_id)
+            if not client or not hmac.compare_digest(client.get("api_key") or "", item.api_key):
+                results[index].error = "API Key inválida para o cliente"
+                continue
+            if client.get("status") != "aprovado":
+                results[index].error = "Cliente não está aprovado"
+                continue
+            if item.client_id in seen_clients or item.did in seen_dids:
+                results[index].error = "Cliente ou DID repetido no lote"
+                continue
+            seen_clients.add(item.client_id)
+            seen_dids.add(item.did)
             
-            created_truthy = self.truthy_repository.find_by_id(truthy_id)
-            return self._convert_to_response(created_truthy)
+            pending.append(index)
+            documents.append({
+                "client_id": item.client_id,
+                "did": item.did,
+                "verkey": item.verkey,
+                "acapy_admin_url": item.acapy_admin_url,
+                "role": self._ledger_role(client),
+                "alias": client.get("company_name", "Client"),
+                "ledger_status": "pending",
+                "attempt": 0
+            })
+        
+        errors = self.truthy_repository.insert_many_unordered(documents)
+        accepted = 0
+        for position, index in enumerate(pending):
+            if position in errors:
+                results[index].error = self._duplicate_message(errors[position])
+                continue
+            truthy = documents[position]
+            self._dispatch(truthy)
+            accepted += 1
+            results[index].status = "pending"
+            results[index].truthy = self._convert_to_response(dict(truthy))
         
-        except DuplicateKeyError:
-            raise ValueError("Registro já existe no sistema")
-        except Exception as e:
-            raise ValueError(f"Erro ao registrar na ledger: {str(e)}")
+        return LedgerBatchResponse(
+            pending=accepted,
+            failed=len(items) - accepted,
+            results=results
+        )
 
 ledger_service = LedgerService()
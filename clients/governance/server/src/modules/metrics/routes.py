@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException, status
+from modules.utils.monitoring import command_metrics, pool_metrics
+from modules.utils.model import SuccessResponse
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/mongodb", response_model=SuccessResponse[dict])
+def get_mongodb_metrics():
+    """
+    Retorna latência por coleção/operação, comandos lentos e estado do pool do MongoDB
+    """
+    try:
+        return SuccessResponse(data={
+            **command_metrics.snapshot(),
+            "pool": pool_metrics.snapshot()
+        })
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao coletar métricas do MongoDB"
+        )
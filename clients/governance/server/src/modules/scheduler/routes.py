@@ -12,7 +12,11 @@ def get_scheduler_status():
     try:
         return SuccessResponse(data={
             "running": voting_scheduler.running,
-            "check_interval": voting_scheduler.check_interval,
+            "leader": voting_scheduler.is_leader,
+            "worker": voting_scheduler.lease.owner,
+            "resync_interval": voting_scheduler.resync_interval,
+            "pending_deadlines": voting_scheduler.pending_deadlines,
+            "next_deadline": voting_scheduler.next_deadline,
             "service": "Voting Scheduler"
         })
     except Exception as e:
@@ -27,7 +31,7 @@ async def trigger_manual_check():
     Força uma verificação manual das votações expiradas
     """
     try:
-        await voting_scheduler.check_expired_votings()
+        await voting_scheduler.check_now()
         return SuccessResponse(data={
             "message": "Verificação manual executada com sucesso"
         })
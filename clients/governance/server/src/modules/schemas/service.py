@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Optional
 from modules.utils.repositories import SchemaRepository, ClientRepository
 from modules.utils.mongodb import get_mongodb_client
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 from bson import ObjectId
 import math
@@ -13,19 +14,17 @@ class SchemaService:
         self.client_repository = ClientRepository(self.db_client)
     
     def register_schema(self, client_id: str, schema_id: str) -> Dict[str, Any]:
-        existing_schema = self.schema_repository.find_one({"schema_id": schema_id, "client_id": client_id})
-        if existing_schema:
-            raise ValueError("Schema já registrado para este cliente")
-        
         schema_data = {
             "schema_id": schema_id,
             "client_id": client_id,
             "created_at": datetime.utcnow()
         }
         
-        schema_obj_id = self.schema_repository.insert_one(schema_data)
-        
-        created_schema = self.schema_repository.find_by_id(schema_obj_id)
+        # O índice único (schema_id, client_id) impede registros duplicados
+        try:
+            created_schema = self.schema_repository.insert_document(schema_data)
+        except DuplicateKeyError:
+            raise ValueError("Schema já registrado para este cliente")
         
         return {
             "id": str(created_schema["_id"]),
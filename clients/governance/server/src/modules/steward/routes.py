@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query
+from typing import Optional
 from modules.steward.schema import StewardCreate, StewardResponse, StewardListResponse, VoteCreate, VoteResponse
 from modules.steward.service import steward_service
-from modules.utils.model import SuccessResponse
+from modules.clients.schema import ClientAwaitingVoteResponse
+from modules.utils.model import SuccessResponse, CursorPage
+from modules.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from modules.utils.streaming import StreamFormat, stream_response
 
 router = APIRouter(prefix="/stewards", tags=["stewards"])
 
@@ -16,14 +19,21 @@ def create_steward(steward_data: StewardCreate):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao criar steward")
 
-@router.get("", response_model=SuccessResponse[List[StewardListResponse]])
-def get_stewards(active_only: bool = False):
+@router.get("", response_model=SuccessResponse[CursorPage[StewardListResponse]])
+def get_stewards(
+    active_only: bool = False,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    stream: Optional[StreamFormat] = Query(None, description="Envia a listagem em streaming (ndjson ou json)")
+):
     try:
-        if active_only:
-            stewards = steward_service.get_active_stewards()
-        else:
-            stewards = steward_service.get_all_stewards()
+        if stream:
+            return stream_response(steward_service.iter_stewards(active_only), stream)
+        
+        stewards = steward_service.get_stewards(active_only, limit, cursor)
         return SuccessResponse(data=stewards)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao buscar stewards")
 
@@ -50,16 +60,45 @@ def delete_steward(steward_id: str):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao deletar steward")
 
-@router.get("/{steward_id}/votes", response_model=SuccessResponse[List[VoteResponse]])
-def get_steward_votes(steward_id: str):
+@router.get("/{steward_id}/votes", response_model=SuccessResponse[CursorPage[VoteResponse]])
+def get_steward_votes(
+    steward_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor"),
+    stream: Optional[StreamFormat] = Query(None, description="Envia a listagem em streaming (ndjson ou json)")
+):
     try:
-        votes = steward_service.get_steward_votes(steward_id)
+        if stream:
+            return stream_response(steward_service.iter_steward_votes(steward_id), stream)
+        
+        votes = steward_service.get_steward_votes(steward_id, limit, cursor)
         return SuccessResponse(data=votes)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao buscar votos do steward")
 
+@router.get("/{steward_id}/awaiting-votes", response_model=SuccessResponse[CursorPage[ClientAwaitingVoteResponse]])
+def get_awaiting_votes(
+    steward_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em next_cursor")
+):
+    """
+    Clientes em votação que ainda aguardam o voto do steward, ordenados pelo prazo
+    """
+    try:
+        clients = steward_service.get_awaiting_votes(steward_id, limit, cursor)
+        return SuccessResponse(data=clients)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao buscar votações pendentes do steward")
+
 @router.post("/votes", response_model=SuccessResponse[VoteResponse], status_code=status.HTTP_201_CREATED)
 def create_vote(vote_data: VoteCreate):
     try:
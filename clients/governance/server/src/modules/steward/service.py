@@ -1,7 +1,14 @@
-from typing import List, Optional
-from modules.utils.mongodb import get_mongodb_client
+from typing import Optional, Iterator
+from modules.utils.mongodb import get_mongodb_client, duplicate_key_field
 from modules.utils.repositories import StewardRepository, VoteRepository, ClientRepository
 from modules.steward.schema import StewardCreate, StewardResponse, StewardListResponse, VoteCreate, VoteResponse
+from modules.utils.scheduler import voting_scheduler
+from modules.utils.voting import evaluate_voting, has_min_participation
+from modules.utils.events import voting_events
+from modules.config.settings import settings
+from modules.utils.model import CursorPage
+from modules.utils.pagination import DEFAULT_PAGE_SIZE, encode_cursor, decode_cursor_values
+from modules.clients.schema import ClientAwaitingVoteResponse
 from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
 from datetime import datetime, timedelta
@@ -39,6 +46,9 @@ MOCK_STEWARDS = [
     }
 ]
 
+# Campos necessários para StewardListResponse
+LIST_PROJECTION = {"name": 1, "email": 1, "organization": 1, "status": 1, "created_at": 1}
+
 class StewardService:
     def __init__(self):
         self.db_client = get_mongodb_client()
@@ -71,22 +81,19 @@ class StewardService:
         return VoteResponse(**vote_data)
     
     def create_steward(self, steward_data: StewardCreate) -> StewardResponse:
-        existing_email = self.repository.find_by_email(steward_data.email)
-        if existing_email:
-            raise ValueError("Steward com este email já existe")
-        
+        # Unicidade do email garantida pelo índice único
         try:
-            steward_id = self.repository.create_steward(
+            created_steward = self.repository.create_steward(
                 name=steward_data.name,
                 email=steward_data.email,
                 organization=steward_data.organization,
                 role=steward_data.role
             )
-            
-            created_steward = self.repository.find_by_id(steward_id)
             return self._convert_to_response(created_steward)
         
-        except DuplicateKeyError:
+        except DuplicateKeyError as e:
+            if duplicate_key_field(e) == "email":
+                raise ValueError("Steward com este email já existe")
             raise ValueError("Steward já existe no sistema")
     
     def get_steward_by_id(self, steward_id: str) -> Optional[StewardResponse]:
@@ -95,95 +102,146 @@ class StewardService:
             return None
         return self._convert_to_response(steward_data)
     
-    def get_all_stewards(self) -> List[StewardListResponse]:
-        stewards = self.repository.find_all()
-        return [self._convert_to_list_response(s) for s in stewards]
+    def get_stewards(
+        self,
+        active_only: bool = False,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> CursorPage[StewardListResponse]:
+        filter = {"status": "active"} if active_only else {}
+        stewards, next_cursor = self.repository.find_page(
+            filter,
+            projection=LIST_PROJECTION,
+            limit=limit,
+            cursor=cursor
+        )
+        return CursorPage(
+            items=[self._convert_to_list_response(s) for s in stewards],
+            next_cursor=next_cursor
+        )
     
-    def get_active_stewards(self) -> List[StewardListResponse]:
-        stewards = self.repository.find_active_stewards()
-        return [self._convert_to_list_response(s) for s in stewards]
+    def iter_stewards(self, active_only: bool = False) -> Iterator[StewardListResponse]:
+        filter = {"status": "active"} if active_only else {}
+        stewards = self.repository.iter_many(filter, projection=LIST_PROJECTION, sort=[("created_at", -1)])
+        return (self._convert_to_list_response(s) for s in stewards)
     
     def delete_steward(self, steward_id: str) -> bool:
+        self.repository.invalidate_name_cache(steward_id)
         return self.repository.delete_by_id(steward_id)
     
-    def get_steward_votes(self, steward_id: str) -> List[VoteResponse]:
-        steward = self.repository.find_by_id(steward_id)
-        if not steward:
+    def _ensure_steward_exists(self, steward_id: str):
+        if not ObjectId.is_valid(steward_id) or not self.repository.exists({"_id": ObjectId(steward_id)}):
             raise ValueError("Steward não encontrado")
+    
+    def get_steward_votes(
+        self,
+        steward_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> CursorPage[VoteResponse]:
+        self._ensure_steward_exists(steward_id)
+        
+        votes, next_cursor = self.vote_repository.find_page(
+            {"steward_id": steward_id},
+            limit=limit,
+            cursor=cursor
+        )
+        return CursorPage(
+            items=[self._convert_vote_to_response(vote) for vote in votes],
+            next_cursor=next_cursor
+        )
+    
+    def get_awaiting_votes(
+        self,
+        steward_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> CursorPage[ClientAwaitingVoteResponse]:
+        """Fila de clientes em votação que ainda aguardam o voto do steward"""
+        self._ensure_steward_exists(steward_id)
+        
+        after = decode_cursor_values(cursor) if cursor else None
+        clients = self.client_repository.find_awaiting_vote(steward_id, limit + 1, after)
+        
+        next_cursor = None
+        if len(clients) > limit:
+            clients = clients[:limit]
+            next_cursor = encode_cursor(clients[-1], field="voting_sort_key")
         
-        votes = self.vote_repository.find_by_steward(steward_id)
-        return [self._convert_vote_to_response(vote) for vote in votes]
+        items = []
+        for client in clients:
+            client.pop("voting_sort_key")
+            client["id"] = client.pop("_id")
+            items.append(ClientAwaitingVoteResponse(**client))
+        return CursorPage(items=items, next_cursor=next_cursor)
+    
+    def iter_steward_votes(self, steward_id: str) -> Iterator[VoteResponse]:
+        # Valida antes de iniciar o streaming para ainda poder responder 404
+        self._ensure_steward_exists(steward_id)
+        
+        votes = self.vote_repository.iter_many({"steward_id": steward_id}, sort=[("created_at", -1)])
+        return (self._convert_vote_to_response(vote) for vote in votes)
     
     def create_vote(self, vote_data: VoteCreate) -> VoteResponse:
-        steward = self.repository.find_by_id(vote_data.steward_id)
+        steward = self.repository.find_by_id(vote_data.steward_id, projection={"status": 1})
         if not steward:
             raise ValueError("Steward não encontrado")
         
-        client = self.client_repository.find_by_id(vote_data.client_id)
-        if not client:
+        if not ObjectId.is_valid(vote_data.client_id):
             raise ValueError("Cliente não encontrado")
         
-        # Verificar se o cliente ainda está em votação
-        if client.get("status") != "em_votacao":
-            raise ValueError("Cliente não está mais em processo de votação")
-        
-        existing_vote = self.vote_repository.find_vote(vote_data.steward_id, vote_data.client_id)
-        if existing_vote:
+        if self.vote_repository.exists({"steward_id": vote_data.steward_id, "client_id": vote_data.client_id}):
             raise ValueError("Steward já votou neste cliente")
         
+        # Confirma a votação e reserva o voto em vote_count antes de gravá-lo: uma
+        # finalização concorrente com contagem diferente de vote_count não é aplicada
+        voting = self.client_repository.register_vote(
+            vote_data.client_id,
+            timedelta(seconds=settings.voting_duration_seconds)
+        )
+        if not voting:
+            if not self.client_repository.exists({"_id": ObjectId(vote_data.client_id)}):
+                raise ValueError("Cliente não encontrado")
+            raise ValueError("Cliente não está mais em processo de votação")
+        
         try:
-            # Registrar o timestamp do primeiro voto
-            if not client.get("first_vote_at"):
-                self.client_repository.set_first_vote_timestamp(vote_data.client_id)
-                client = self.client_repository.find_by_id(vote_data.client_id)
-            
-            vote_id = self.vote_repository.create_vote(
+            # O índice único (steward_id, client_id) impede votos duplicados
+            vote_document = self.vote_repository.create_vote(
                 steward_id=vote_data.steward_id,
                 client_id=vote_data.client_id,
                 vote=vote_data.vote,
                 comment=vote_data.comment
             )
-            
-            # Verificar condições de finalização da votação
-            vote_counts = self.vote_repository.count_votes_by_client(vote_data.client_id)
-            total_stewards = self.repository.count({"status": "active"})
-            
-            # Verificar se o tempo de votação expirou (2 minutos após o primeiro voto)
-            first_vote_at = client.get("first_vote_at")
-            voting_expired = False
-            if first_vote_at:
-                deadline = first_vote_at + timedelta(minutes=2)
-                voting_expired = datetime.utcnow() > deadline
-            
-            # Verificar se todos os stewards votaram
-            all_voted = vote_counts["total"] >= total_stewards
-            
-            # Verificar se pelo menos 50% dos stewards participaram
-            min_participation = total_stewards * 0.5
-            has_min_participation = vote_counts["total"] >= min_participation
-            
-            # Finalizar votação se: todos votaram OU tempo expirou com participação mínima
-            should_finalize = all_voted or (voting_expired and has_min_participation)
-            
-            if should_finalize:
-                # Calcular resultado
-                # Para aprovação: pelo menos 2/3 dos votos válidos (approve + reject) devem ser approve
-                valid_votes = vote_counts["approve"] + vote_counts["reject"]
-                required_approvals = valid_votes * (2/3)
-                
-                if vote_counts["approve"] >= required_approvals and has_min_participation:
-                    # Aprovar cliente
-                    self.client_repository.update_client_status(vote_data.client_id, "aprovado")
-                    # Gerar e definir a chave de API para o cliente aprovado
-                    api_key = self.client_repository.generate_api_key()
-                    self.client_repository.set_api_key(vote_data.client_id, api_key)
-                else:
-                    self.client_repository.update_client_status(vote_data.client_id, "rejeitado")
-            
-            created_vote = self.vote_repository.find_by_id(vote_id)
-            return self._convert_vote_to_response(created_vote)
-        
         except DuplicateKeyError:
-            raise ValueError("Voto já registrado")
+            self.client_repository.unregister_vote(vote_data.client_id, voting)
+            raise ValueError("Steward já votou neste cliente")
+        except Exception:
+            self.client_repository.unregister_vote(vote_data.client_id, voting)
+            raise
+        
+        deadline = voting["voting_deadline"]
+        if voting["first_vote"]:
+            voting_scheduler.schedule(vote_data.client_id, deadline)
+        
+        # Verificar condições de finalização da votação
+        vote_counts = self.vote_repository.count_votes_by_client(vote_data.client_id)
+        total_stewards = self.repository.count({"status": "active"})
+        
+        voting_expired = datetime.utcnow() > deadline
+        all_voted = vote_counts["total"] >= total_stewards
+        
+        # Finalizar votação se: todos votaram OU tempo expirou com participação mínima
+        vote_response = self._convert_vote_to_response(vote_document)
+        steward_name = self.repository.find_names_by_ids([vote_data.steward_id]).get(vote_data.steward_id, "Desconhecido")
+        voting_events.notify_vote_cast({**vote_response.model_dump(), "steward_name": steward_name}, vote_counts)
+        
+        if all_voted or (voting_expired and has_min_participation(vote_counts, total_stewards)):
+            new_status, reason = evaluate_voting(vote_counts, total_stewards)
+            # Transição condicional: se o scheduler já finalizou, nada acontece
+            # Se outro voto ainda está sendo gravado a contagem não bate; quem o gravar finaliza
+            if self.client_repository.finalize_voting(vote_data.client_id, new_status, vote_counts["total"]):
+                voting_events.notify_status_changed(vote_data.client_id, new_status, reason)
+        
+        return vote_response
 
 steward_service = StewardService()
@@ -11,14 +11,16 @@ from .repositories import (
     StewardRepository,
     ClientRepository,
     SchemaRepository,
-    CredentialRepository
+    CredentialRepository,
+    LeaseRepository
 )
 
 # Response models
 from .model import (
     BaseResponse,
     SuccessResponse,
-    ErrorResponse
+    ErrorResponse,
+    CursorPage
 )
 
 __all__ = [
@@ -33,9 +35,11 @@ __all__ = [
     "ClientRepository",
     "SchemaRepository",
     "CredentialRepository",
+    "LeaseRepository",
     
     # Models
     "BaseResponse",
     "SuccessResponse",
     "ErrorResponse",
+    "CursorPage",
 ]
\ No newline at end of file
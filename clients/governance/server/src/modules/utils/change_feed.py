@@ -0,0 +1,109 @@
+import threading
+import logging
+from typing import Optional
+from pymongo.errors import PyMongoError, OperationFailure
+from modules.utils.mongodb import get_mongodb_client
+from modules.utils.repositories import VoteRepository, StewardRepository
+from modules.utils.events import VotingEventBroker
+
+logger = logging.getLogger(__name__)
+
+# Votos inseridos e mudanças de status dos clientes
+VOTES_PIPELINE = [{"$match": {"operationType": "insert"}}]
+CLIENTS_PIPELINE = [{"$match": {
+    "operationType": "update",
+    "updateDescription.updatedFields.status": {"$exists": True}
+}}]
+
+
+class VotingChangeFeed:
+    """
+    Publica os eventos de votação a partir dos change streams do MongoDB
+    (requer replica set). Assim todos os workers recebem os eventos, não só
+    o que atendeu o voto. Sem replica set, volta para a origem "app".
+    """
+    
+    def __init__(self, broker: VotingEventBroker):
+        self.broker = broker
+        self.db_client = get_mongodb_client()
+        self.vote_repository = VoteRepository(self.db_client)
+        self.steward_repository = StewardRepository(self.db_client)
+        self._streams = []
+        self._threads = []
+        self._running = False
+    
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for target in (self._watch_votes, self._watch_clients):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Change stream de votação iniciado")
+    
+    def stop(self):
+        self._running = False
+        for stream in self._streams:
+            try:
+                stream.close()
+            except PyMongoError:
+                pass
+        self._streams = []
+        self._threads = []
+    
+    def _watch(self, collection_name: str, pipeline: list, handler):
+        collection = self.db_client.get_collection(collection_name)
+        try:
+            with collection.watch(pipeline) as stream:
+                self._streams.append(stream)
+                for change in stream:
+                    if not self._running:
+                        break
+                    try:
+                        handler(change)
+                    except Exception as e:
+                        logger.error(f"Erro ao publicar evento de '{collection_name}': {e}")
+        except OperationFailure as e:
+            # Change streams exigem replica set: publica pelo caminho da aplicação
+            logger.warning(f"Change stream indisponível ({e}); usando eventos da aplicação")
+            self.broker.source = "app"
+        except PyMongoError as e:
+            if self._running:
+                logger.error(f"Change stream de '{collection_name}' encerrado: {e}")
+    
+    def _watch_votes(self):
+        self._watch("votes", VOTES_PIPELINE, self._on_vote)
+    
+    def _watch_clients(self):
+        self._watch("clients", CLIENTS_PIPELINE, self._on_status)
+    
+    def _on_vote(self, change: dict):
+        vote = dict(change["fullDocument"])
+        vote["id"] = str(vote.pop("_id"))
+        vote["steward_name"] = self.steward_repository.find_names_by_ids([vote["steward_id"]]).get(
+            vote["steward_id"], "Desconhecido"
+        )
+        self.broker.publish_vote_cast(vote, self.vote_repository.count_votes_by_client(vote["client_id"]))
+    
+    def _on_status(self, change: dict):
+        status = change["updateDescription"]["updatedFields"]["status"]
+        self.broker.publish_status_changed(str(change["documentKey"]["_id"]), status)
+
+
+_change_feed: Optional[VotingChangeFeed] = None
+
+
+def start_change_feed(broker: VotingEventBroker):
+    global _change_feed
+    if broker.source != "change_stream" or _change_feed is not None:
+        return
+    _change_feed = VotingChangeFeed(broker)
+    _change_feed.start()
+
+
+def stop_change_feed():
+    global _change_feed
+    if _change_feed:
+        _change_feed.stop()
+        _change_feed = None
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from modules.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+VOTE_CAST = "vote-cast"
+STATUS_CHANGED = "status-changed"
+
+
+class VotingEventBroker:
+    """
+    Pub/sub em memória para os eventos de votação enviados ao painel (SSE).
+    
+    publish() pode ser chamado das rotas síncronas (threadpool) ou de threads
+    de background: a entrega às filas dos assinantes é feita no event loop.
+    """
+    
+    def __init__(self, source: str = "app", queue_size: int = 100):
+        # "app": eventos emitidos pelo caminho de voto/finalização
+        # "change_stream": eventos emitidos pelo change stream do MongoDB
+        self.source = source
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+    
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+    
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+    
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+    
+    def publish(self, event: str, data: Dict[str, Any]):
+        if self._loop is None or self._loop.is_closed():
+            return
+        
+        with self._lock:
+            self._sequence += 1
+            message = {"id": self._sequence, "event": event, "data": jsonable_encoder(data)}
+        self._loop.call_soon_threadsafe(self._dispatch, message)
+    
+    def _dispatch(self, message: Dict[str, Any]):
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Assinante lento: descarta o evento mais antigo
+                queue.get_nowait()
+            queue.put_nowait(message)
+    
+    def publish_vote_cast(self, vote: Dict[str, Any], vote_counts: Dict[str, int]):
+        self.publish(VOTE_CAST, {
+            "client_id": vote["client_id"],
+            "vote": vote,
+            "counts": vote_counts
+        })
+    
+    def publish_status_changed(self, client_id: str, status: str, reason: Optional[str] = None):
+        self.publish(STATUS_CHANGED, {
+            "client_id": client_id,
+            "status": status,
+            "reason": reason
+        })
+    
+    # Ganchos chamados pelo código que grava votos e finaliza votações; com o
+    # change stream ativo quem publica é o VotingChangeFeed
+    
+    def notify_vote_cast(self, vote: Dict[str, Any], vote_counts: Dict[str, int]):
+        if self.source == "app":
+            self.publish_vote_cast(vote, vote_counts)
+    
+    def notify_status_changed(self, client_id: str, status: str, reason: Optional[str] = None):
+        if self.source == "app":
+            self.publish_status_changed(client_id, status, reason)
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    return (
+        f"id: {message['id']}\n"
+        f"event: {message['event']}\n"
+        f"data: {json.dumps(message['data'])}\n\n"
+    )
+
+
+voting_events = VotingEventBroker(source=settings.voting_events_source)
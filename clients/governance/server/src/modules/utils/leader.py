@@ -0,0 +1,53 @@
+import os
+import socket
+import uuid
+import logging
+from datetime import timedelta
+from modules.utils.mongodb import get_mongodb_client
+from modules.utils.repositories import LeaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    """
+    Eleição de líder baseada em lease no MongoDB.
+    
+    Cada worker tenta adquirir/renovar o lease periodicamente; se o líder
+    parar de renovar (queda do processo), outro worker assume após o TTL.
+    """
+    
+    def __init__(self, name: str, ttl_seconds: int = 30):
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.repository = LeaseRepository(get_mongodb_client())
+    
+    @property
+    def renew_interval(self) -> float:
+        # Renovar bem antes do vencimento
+        return self.ttl.total_seconds() / 3
+    
+    def renew(self) -> bool:
+        """Adquire ou renova o lease. Retorna True se este worker é o líder."""
+        was_leader = self.is_leader
+        try:
+            self.is_leader = self.repository.try_acquire(self.name, self.owner, self.ttl)
+        except Exception as e:
+            logger.error(f"Erro ao renovar lease '{self.name}': {e}")
+            self.is_leader = False
+        
+        if self.is_leader and not was_leader:
+            logger.info(f"Worker {self.owner} assumiu a liderança de '{self.name}'")
+        elif was_leader and not self.is_leader:
+            logger.warning(f"Worker {self.owner} perdeu a liderança de '{self.name}'")
+        return self.is_leader
+    
+    def release(self):
+        if self.is_leader:
+            try:
+                self.repository.release(self.name, self.owner)
+            except Exception as e:
+                logger.error(f"Erro ao liberar lease '{self.name}': {e}")
+        self.is_leader = False
@@ -1,4 +1,4 @@
-from typing import Optional, TypeVar, Generic
+from typing import Optional, TypeVar, Generic, List
 from pydantic import BaseModel, Field
 
 # TypeVar para permitir genéricos
@@ -22,3 +22,12 @@ class ErrorResponse(BaseResponse[str]):
     code: str = Field(..., description="Código de erro")
     data: str = Field(..., description="Mensagem de erro")
 
+
+
+# --------------------------
+# Paginação
+# --------------------------
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T] = Field(..., description="Itens da página")
+    next_cursor: Optional[str] = Field(None, description="Cursor opaco da próxima página (None na última)")
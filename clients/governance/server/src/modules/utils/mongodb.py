@@ -1,12 +1,14 @@
-from typing import Optional, List, Dict, Any, TypeVar
-from pymongo import MongoClient
+from typing import Optional, List, Dict, Any, TypeVar, Iterator, Tuple
+from pymongo import MongoClient, ReturnDocument
 from pymongo.collection import Collection
 from pymongo.database import Database
-from pymongo.errors import ConnectionFailure, OperationFailure, DuplicateKeyError
+from pymongo.errors import ConnectionFailure, OperationFailure, DuplicateKeyError, BulkWriteError
 from bson import ObjectId
 from datetime import datetime
 import logging
 from modules.config.settings import settings
+from modules.utils.pagination import KEYSET_SORT, apply_cursor, encode_cursor
+from modules.utils.monitoring import event_listeners
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -43,7 +45,8 @@ class MongoDBClient:
             
             self._client = MongoClient(
                 connection_string,
-                serverSelectionTimeoutMS=5000
+                serverSelectionTimeoutMS=5000,
+                event_listeners=event_listeners()
             )
             
             # Verifica a conexão
@@ -101,6 +104,11 @@ class MongoDBRepository:
             logger.error(f"Falha ao inserir documento: {e}")
             raise
     
+    def insert_document(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Insere e retorna o próprio documento (com _id), sem reler do banco"""
+        document["_id"] = self.insert_one(document)
+        return document
+    
     def insert_many(self, documents: List[Dict[str, Any]]) -> List[str]:
         try:
             # Adiciona timestamp de criação
@@ -116,6 +124,40 @@ class MongoDBRepository:
             logger.error(f"Falha ao inserir documentos: {e}")
             raise
     
+    def insert_many_unordered(self, documents: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Insere todos os documentos em um único comando (ordered=False): falhas
+        de um documento não impedem os demais. Os documentos inseridos recebem
+        _id (str); retorna os erros por índice do documento na lista.
+        """
+        if not documents:
+            return {}
+        
+        now = datetime.utcnow()
+        for doc in documents:
+            doc.setdefault("created_at", now)
+        
+        errors: Dict[int, Dict[str, Any]] = {}
+        try:
+            self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        except OperationFailure as e:
+            logger.error(f"Falha ao inserir documentos: {e}")
+            raise
+        
+        for index, doc in enumerate(documents):
+            if index in errors:
+                doc.pop("_id", None)
+            else:
+                doc["_id"] = str(doc["_id"])
+        
+        logger.info(
+            f"{len(documents) - len(errors)} documentos inseridos na coleção "
+            f"'{self.collection_name}' ({len(errors)} rejeitados)"
+        )
+        return errors
+    
     # ==================== OPERAÇÕES DE CONSULTA ====================
     
     def find_one(
@@ -144,17 +186,19 @@ class MongoDBRepository:
             logger.error(f"ID inválido: {document_id} - {e}")
             return None
     
-    def find_many(
+    def iter_many(
         self,
         filter: Dict[str, Any] = None,
         projection: Optional[Dict[str, Any]] = None,
         sort: Optional[List[tuple]] = None,
         limit: Optional[int] = None,
-        skip: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+        skip: Optional[int] = None,
+        batch_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """Percorre o cursor em lotes sem materializar todos os documentos"""
         try:
             filter = filter or {}
-            cursor = self.collection.find(filter, projection)
+            cursor = self.collection.find(filter, projection, batch_size=batch_size)
             
             if sort:
                 cursor = cursor.sort(sort)
@@ -162,17 +206,49 @@ class MongoDBRepository:
                 cursor = cursor.skip(skip)
             if limit:
                 cursor = cursor.limit(limit)
-                
-            results = list(cursor)
-            for result in results:
-                result["_id"] = str(result["_id"])
-                
-            return results
+            
+            with cursor:
+                for result in cursor:
+                    result["_id"] = str(result["_id"])
+                    yield result
             
         except OperationFailure as e:
             logger.error(f"Erro ao buscar documentos: {e}")
             raise
     
+    def find_many(
+        self,
+        filter: Dict[str, Any] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[tuple]] = None,
+        limit: Optional[int] = None,
+        skip: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        return list(self.iter_many(filter, projection=projection, sort=sort, limit=limit, skip=skip))
+    
+    def find_page(
+        self,
+        filter: Dict[str, Any] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Paginação keyset por (created_at, _id): o custo de qualquer página é o
+        mesmo da primeira. Retorna os documentos e o cursor da próxima página.
+        """
+        filter = apply_cursor(filter or {}, cursor)
+        if projection and any(projection.values()):
+            projection = {**projection, "created_at": 1}
+        
+        # Busca um item extra para saber se existe próxima página
+        results = self.find_many(filter, projection=projection, sort=KEYSET_SORT, limit=limit + 1)
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_cursor(results[-1])
+        return results, next_cursor
+    
     def find_all(
         self,
         projection: Optional[Dict[str, Any]] = None,
@@ -180,6 +256,18 @@ class MongoDBRepository:
     ) -> List[Dict[str, Any]]:
         return self.find_many(filter={}, projection=projection, sort=sort)
     
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            results = list(self.collection.aggregate(pipeline))
+            for result in results:
+                if "_id" in result:
+                    result["_id"] = str(result["_id"])
+            return results
+            
+        except OperationFailure as e:
+            logger.error(f"Erro ao executar agregação: {e}")
+            raise
+    
     def count(self, filter: Dict[str, Any] = None) -> int:
         filter = filter or {}
         return self.collection.count_documents(filter)
@@ -209,6 +297,35 @@ class MongoDBRepository:
             logger.error(f"Erro ao atualizar documento: {e}")
             raise
     
+    def find_one_and_update(
+        self,
+        filter: Dict[str, Any],
+        update: Dict[str, Any] | List[Dict[str, Any]],
+        projection: Optional[Dict[str, Any]] = None,
+        upsert: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            # Adiciona timestamp de atualização (pipelines definem o próprio)
+            if isinstance(update, dict):
+                if "$set" not in update:
+                    update["$set"] = {}
+                update["$set"]["updated_at"] = datetime.utcnow()
+            
+            result = self.collection.find_one_and_update(
+                filter,
+                update,
+                projection=projection,
+                upsert=upsert,
+                return_document=ReturnDocument.AFTER
+            )
+            if result:
+                result["_id"] = str(result["_id"])
+            return result
+            
+        except OperationFailure as e:
+            logger.error(f"Erro ao atualizar documento: {e}")
+            raise
+    
     def update_by_id(
         self,
         document_id: str,
@@ -304,3 +421,13 @@ def close_mongodb_client() -> None:
     if _mongodb_client:
         _mongodb_client.disconnect()
         _mongodb_client = None
+
+
+def duplicate_key_field(error: DuplicateKeyError | Dict[str, Any]) -> Optional[str]:
+    """
+    Retorna o primeiro campo do índice único violado (ex.: "cnpj", "email").
+    Aceita a exceção ou um item de writeErrors de insert_many_unordered.
+    """
+    details = error if isinstance(error, dict) else (error.details or {})
+    key_pattern = details.get("keyPattern") or {}
+    return next(iter(key_pattern), None)
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+from pymongo import monitoring
+from modules.config.settings import settings
+
+# Limites (ms) dos buckets do histograma de latência
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+# Comandos cujo filtro é extraído para as amostras de comandos lentos
+_FILTER_EXTRACTORS = {
+    "find": lambda cmd: cmd.get("filter"),
+    "count": lambda cmd: cmd.get("query"),
+    "distinct": lambda cmd: cmd.get("query"),
+    "findAndModify": lambda cmd: cmd.get("query"),
+    "update": lambda cmd: (cmd.get("updates") or [{}])[0].get("q"),
+    "delete": lambda cmd: (cmd.get("deletes") or [{}])[0].get("q"),
+    "aggregate": lambda cmd: next(
+        (stage["$match"] for stage in cmd.get("pipeline", []) if "$match" in stage),
+        None
+    ),
+}
+
+# Comandos internos do driver que não interessam às métricas
+_IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+
+def filter_shape(value: Any) -> Any:
+    """
+    Substitui os valores do filtro por "?" mantendo campos e operadores,
+    para agrupar consultas iguais sem expor dados.
+    """
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and/$or/$in: preserva a estrutura apenas do primeiro elemento
+        return [filter_shape(value[0])] if value else []
+    return "?"
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, duration_ms: float, failed: bool = False):
+        index = next((i for i, limit in enumerate(LATENCY_BUCKETS_MS) if duration_ms <= limit), len(LATENCY_BUCKETS_MS))
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        if failed:
+            self.failures += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{limit}ms" for limit in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.buckets))
+        }
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Latência por coleção/operação e amostras de comandos lentos"""
+    
+    def __init__(self, slow_threshold_ms: int = 100, max_samples: int = 50):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._lock = threading.Lock()
+        self._started: Dict[Tuple[Any, int], Tuple[str, str, Optional[Dict[str, Any]]]] = {}
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._slow_commands = deque(maxlen=max_samples)
+    
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        
+        command = event.command
+        collection = command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-"
+        
+        extractor = _FILTER_EXTRACTORS.get(event.command_name)
+        shape = filter_shape(extractor(command)) if extractor else None
+        with self._lock:
+            self._started[(event.connection_id, event.request_id)] = (collection, event.command_name, shape)
+    
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, failed=False)
+    
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, failed=True)
+    
+    def _finish(self, event, failed: bool):
+        duration_ms = event.duration_micros / 1000
+        with self._lock:
+            started = self._started.pop((event.connection_id, event.request_id), None)
+            if started is None:
+                return
+            collection, operation, shape = started
+            
+            histogram = self._histograms.setdefault((collection, operation), LatencyHistogram())
+            histogram.observe(duration_ms, failed)
+            
+            if duration_ms >= self.slow_threshold_ms:
+                self._slow_commands.append({
+                    "collection": collection,
+                    "operation": operation,
+                    "duration_ms": round(duration_ms, 3),
+                    "filter_shape": shape,
+                    "failed": failed,
+                    "at": time.time()
+                })
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            commands = [
+                {"collection": collection, "operation": operation, **histogram.to_dict()}
+                for (collection, operation), histogram in sorted(self._histograms.items())
+            ]
+            slow_commands = list(reversed(self._slow_commands))
+        return {
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "commands": commands,
+            "slow_commands": slow_commands
+        }
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Estado do pool de conexões do driver"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.clears = 0
+    
+    def _update(self, **deltas: int):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        self._update(clears=1)
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        self._update(open_connections=1)
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        self._update(open_connections=-1)
+    
+    def connection_check_out_started(self, event):
+        pass
+    
+    def connection_check_out_failed(self, event):
+        self._update(checkout_failures=1)
+    
+    def connection_checked_out(self, event):
+        self._update(in_use=1, checkouts=1)
+    
+    def connection_checked_in(self, event):
+        self._update(in_use=-1)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open_connections": self.open_connections,
+                "in_use": self.in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.clears
+            }
+
+
+command_metrics = CommandMetrics(slow_threshold_ms=settings.mongo_slow_command_ms)
+pool_metrics = PoolMetrics()
+
+
+def event_listeners() -> list:
+    """Listeners registrados no MongoClient"""
+    return [command_metrics, pool_metrics]
@@ -0,0 +1,88 @@
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Ordenação estável usada por todas as listagens paginadas
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+# Tamanho padrão e máximo das páginas das listagens
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(document: Dict[str, Any], field: str = "created_at") -> str:
+    """Gera um cursor opaco a partir do último documento da página"""
+    payload = {
+        "c": document[field].isoformat(),
+        "i": str(document["_id"])
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor_values(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Valores (campo, _id) do cursor. Levanta InvalidCursorError se o cursor for inválido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise InvalidCursorError("Cursor de paginação inválido")
+
+
+def encode_ranked_cursor(score: int, document: Dict[str, Any]) -> str:
+    """Cursor de listagens ordenadas por relevância (score, created_at, _id)"""
+    payload = {
+        "s": score,
+        "c": document["created_at"].isoformat(),
+        "i": str(document["_id"])
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_ranked_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Converte o cursor de relevância em filtro keyset decrescente sobre
+    (_score, created_at, _id). Levanta InvalidCursorError se o cursor for inválido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        score, created_at, object_id = int(payload["s"]), datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise InvalidCursorError("Cursor de paginação inválido")
+    return {
+        "$or": [
+            {"_score": {"$lt": score}},
+            {"_score": score, "created_at": {"$lt": created_at}},
+            {"_score": score, "created_at": created_at, "_id": {"$lt": object_id}}
+        ]
+    }
+
+
+def decode_cursor(cursor: str, field: str = "created_at", ascending: bool = False) -> Dict[str, Any]:
+    """
+    Converte o cursor em filtro keyset (field, _id), por padrão decrescente.
+    Levanta InvalidCursorError se o cursor for inválido.
+    """
+    value, object_id = decode_cursor_values(cursor)
+    operator = "$gt" if ascending else "$lt"
+    return {
+        "$or": [
+            {field: {operator: value}},
+            {field: value, "_id": {operator: object_id}}
+        ]
+    }
+
+
+def apply_cursor(filter: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    if not cursor:
+        return filter
+    keyset = decode_cursor(cursor)
+    return {"$and": [filter, keyset]} if filter else keyset
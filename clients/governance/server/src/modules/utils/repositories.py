@@ -1,12 +1,22 @@
 from modules.utils.mongodb import MongoDBRepository, get_mongodb_client
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from modules.utils.search import build_search_fields, build_query_tokens
+from modules.utils.pagination import encode_ranked_cursor, decode_ranked_cursor
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 import secrets
+import time
 
 
 # ==================== STEWARD REPOSITORY ====================
 
-class StewardRepository(MongoDBRepository):    
+class StewardRepository(MongoDBRepository):
+    # Cache compartilhado de id -> nome (stewards mudam raramente)
+    NAME_CACHE_TTL = 300
+    _name_cache: Dict[str, tuple] = {}
+
     def __init__(self, client):
         super().__init__(client, "stewards")
         # Criar índices para otimização
@@ -14,6 +24,8 @@ class StewardRepository(MongoDBRepository):
         self.create_index([("organization", 1)])
         self.create_index([("status", 1)])
         self.create_index([("created_at", -1)])
+        self.create_index([("created_at", -1), ("_id", -1)])
+        self.create_index([("status", 1), ("created_at", -1), ("_id", -1)])
     
     def create_steward(
         self,
@@ -22,7 +34,7 @@ class StewardRepository(MongoDBRepository):
         organization: str,
         role: str = "steward",
         status: str = "active"
-    ) -> str:
+    ) -> Dict[str, Any]:
         steward = {
             "name": name,
             "email": email,
@@ -32,11 +44,40 @@ class StewardRepository(MongoDBRepository):
             "schemas_created": 0,
             "credentials_issued": 0
         }
-        return self.insert_one(steward)
+        return self.insert_document(steward)
     
     def find_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         return self.find_one({"email": email})
     
+    def find_names_by_ids(self, steward_ids: Iterable[str]) -> Dict[str, str]:
+        """Resolve nomes de vários stewards com uma única consulta $in, usando o cache"""
+        now = time.monotonic()
+        names: Dict[str, str] = {}
+        missing: List[ObjectId] = []
+        
+        for steward_id in set(str(s) for s in steward_ids):
+            cached = self._name_cache.get(steward_id)
+            if cached and cached[1] > now:
+                names[steward_id] = cached[0]
+            elif ObjectId.is_valid(steward_id):
+                missing.append(ObjectId(steward_id))
+        
+        if missing:
+            stewards = self.find_many({"_id": {"$in": missing}}, projection={"name": 1})
+            expires_at = now + self.NAME_CACHE_TTL
+            for steward in stewards:
+                names[steward["_id"]] = steward["name"]
+                self._name_cache[steward["_id"]] = (steward["name"], expires_at)
+        
+        return names
+    
+    @classmethod
+    def invalidate_name_cache(cls, steward_id: Optional[str] = None) -> None:
+        if steward_id is None:
+            cls._name_cache.clear()
+        else:
+            cls._name_cache.pop(str(steward_id), None)
+    
     def find_by_organization(self, organization: str) -> List[Dict[str, Any]]:
         return self.find_many({"organization": organization})
     
@@ -48,6 +89,7 @@ class StewardRepository(MongoDBRepository):
         steward_id: str,
         data: Dict[str, Any]
     ) -> bool:
+        self.invalidate_name_cache(steward_id)
         return self.update_by_id(steward_id, {"$set": data})
     
     def increment_schemas_created(self, steward_id: str) -> bool:
@@ -79,6 +121,11 @@ class StewardRepository(MongoDBRepository):
 # ==================== CLIENT REPOSITORY ====================
 
 class ClientRepository(MongoDBRepository):
+    SEARCH_FIELDS = ["company_name", "email", "cnpj"]
+    SEARCH_PROJECTION = {"search_keys": 0, "search_terms": 0}
+    # Chave de ordenação das votações que ainda não receberam o primeiro voto
+    NO_DEADLINE = datetime(9999, 12, 31)
+    
     def __init__(self, client):
         super().__init__(client, "clients")
         self.create_index([("cnpj", 1)], unique=True)
@@ -86,6 +133,32 @@ class ClientRepository(MongoDBRepository):
         self.create_index([("status", 1)])
         self.create_index([("client_type", 1)])
         self.create_index([("created_at", -1)])
+        self.create_index([("created_at", -1), ("_id", -1)])
+        self.create_index([("status", 1), ("created_at", -1), ("_id", -1)])
+        self.create_index([("client_type", 1), ("created_at", -1), ("_id", -1)])
+        self.create_index([("search_keys", 1)])
+        self.create_index([("status", 1), ("voting_deadline", 1), ("_id", 1)])
+    
+    def backfill_search_fields(self, batch_size: int = 500) -> int:
+        """Calcula as chaves de busca de clientes criados antes da indexação, em lotes"""
+        pending = self.iter_many(
+            {"search_keys": {"$exists": False}},
+            projection={field: 1 for field in self.SEARCH_FIELDS},
+            batch_size=batch_size
+        )
+        updated = 0
+        batch: List[UpdateOne] = []
+        for client_data in pending:
+            batch.append(UpdateOne(
+                {"_id": ObjectId(client_data["_id"])},
+                {"$set": build_search_fields(client_data, self.SEARCH_FIELDS)}
+            ))
+            if len(batch) >= batch_size:
+                updated += self.collection.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += self.collection.bulk_write(batch, ordered=False).modified_count
+        return updated
     
     def create_client(
         self,
@@ -97,7 +170,7 @@ class ClientRepository(MongoDBRepository):
         client_type: str,
         description: Optional[str] = None,
         status: str = "em_votacao"
-    ) -> str:
+    ) -> Dict[str, Any]:
         client_data = {
             "company_name": company_name,
             "cnpj": cnpj,
@@ -106,9 +179,36 @@ class ClientRepository(MongoDBRepository):
             "address": address,
             "client_type": client_type,
             "description": description,
-            "status": status
+            "status": status,
+            "vote_count": 0
         }
-        return self.insert_one(client_data)
+        client_data.update(build_search_fields(client_data, self.SEARCH_FIELDS))
+        return self.insert_document(client_data)
+    
+    def create_clients(self, clients: List[Dict[str, Any]], status: str = "em_votacao") -> Dict[int, Dict[str, Any]]:
+        """
+        Importação em lote: um único insert_many (ordered=False). Retorna os
+        erros por posição; os documentos inseridos recebem _id.
+        """
+        for client_data in clients:
+            client_data["status"] = status
+            client_data["vote_count"] = 0
+            client_data.update(build_search_fields(client_data, self.SEARCH_FIELDS))
+        return self.insert_many_unordered(clients)
+    
+    def find_existing_keys(self, cnpjs: List[str], emails: List[str]) -> Dict[str, set]:
+        """CNPJs e emails já cadastrados, em uma única consulta $in"""
+        existing = {"cnpj": set(), "email": set()}
+        if not cnpjs and not emails:
+            return existing
+        
+        for client in self.iter_many(
+            {"$or": [{"cnpj": {"$in": cnpjs}}, {"email": {"$in": emails}}]},
+            projection={"cnpj": 1, "email": 1}
+        ):
+            existing["cnpj"].add(client["cnpj"])
+            existing["email"].add(client["email"])
+        return existing
     
     def find_by_cnpj(self, cnpj: str) -> Optional[Dict[str, Any]]:
         return self.find_one({"cnpj": cnpj})
@@ -128,18 +228,49 @@ class ClientRepository(MongoDBRepository):
             limit=limit
         )
     
-    def search_clients(self, query: str) -> List[Dict[str, Any]]:
-        filter = {
-            "$or": [
-                {"company_name": {"$regex": query, "$options": "i"}},
-                {"email": {"$regex": query, "$options": "i"}},
-                {"cnpj": {"$regex": query, "$options": "i"}}
-            ]
-        }
-        return self.find_many(filter)
-    
-    def update_client_status(self, client_id: str, status: str) -> bool:
-        return self.update_by_id(client_id, {"$set": {"status": status, "updated_at": datetime.utcnow()}})
+    def search_clients(
+        self,
+        query: str,
+        projection: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Busca por prefixo de palavras em company_name, email e cnpj usando o
+        índice multikey de search_keys. Palavras completas pesam mais no ranking.
+        Paginação keyset por (relevância, created_at, _id), como em find_page.
+        """
+        tokens = build_query_tokens(query)
+        if not tokens:
+            return [], None
+        
+        pipeline = [
+            {"$match": {"search_keys": {"$all": tokens}}},
+            {"$addFields": {
+                "_score": {"$size": {"$setIntersection": [{"$ifNull": ["$search_terms", []]}, tokens]}}
+            }}
+        ]
+        if cursor:
+            pipeline.append({"$match": decode_ranked_cursor(cursor)})
+        pipeline += [
+            {"$sort": {"_score": -1, "created_at": -1, "_id": -1}},
+            # Um item extra indica se existe próxima página
+            {"$limit": limit + 1},
+            {"$project": {**projection, "_score": 1, "created_at": 1} if projection else self.SEARCH_PROJECTION}
+        ]
+        results = self.aggregate(pipeline)
+        
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_ranked_cursor(results[-1]["_score"], results[-1])
+        return results, next_cursor
+    
+    def update_client_status(self, client_id: str, status: str) -> Optional[Dict[str, Any]]:
+        """Atualiza o status e retorna o documento atualizado (None se não existir)"""
+        if not ObjectId.is_valid(client_id):
+            return None
+        return self.find_one_and_update({"_id": ObjectId(client_id)}, {"$set": {"status": status}})
     
     def generate_api_key(self) -> str:
         """Gera uma chave de API segura e única"""
@@ -149,12 +280,156 @@ class ClientRepository(MongoDBRepository):
         """Define a chave de API para um cliente"""
         return self.update_by_id(client_id, {"$set": {"api_key": api_key, "updated_at": datetime.utcnow()}})
     
-    def set_first_vote_timestamp(self, client_id: str) -> bool:
-        """Define o timestamp do primeiro voto se ainda não existir"""
-        client = self.find_by_id(client_id)
-        if client and not client.get("first_vote_at"):
-            return self.update_by_id(client_id, {"$set": {"first_vote_at": datetime.utcnow()}})
-        return False
+    def register_vote(self, client_id: str, voting_duration: timedelta) -> Optional[Dict[str, Any]]:
+        """
+        Confirma atomicamente que o cliente está em votação, reserva o voto em
+        vote_count e, no primeiro voto, define first_vote_at e voting_deadline.
+        Retorna o prazo e se este foi o primeiro voto, ou None se o cliente não
+        existir ou não estiver mais em votação.
+        
+        Clientes anteriores ao vote_count não recebem o campo (ver finalize_voting).
+        """
+        now = datetime.utcnow()
+        # MongoDB armazena datas com precisão de milissegundos
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        # Documento anterior à atualização: diz se first_vote_at foi definido agora
+        previous = self.collection.find_one_and_update(
+            {"_id": ObjectId(client_id), "status": "em_votacao"},
+            [{"$set": {
+                "first_vote_at": {"$ifNull": ["$first_vote_at", now]},
+                "voting_deadline": {"$ifNull": ["$voting_deadline", now + voting_duration]},
+                "vote_count": {"$cond": [
+                    {"$eq": [{"$type": "$vote_count"}, "missing"]},
+                    "$$REMOVE",
+                    {"$add": ["$vote_count", 1]}
+                ]},
+                "updated_at": now
+            }}],
+            projection={"first_vote_at": 1, "voting_deadline": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            return None
+        return {
+            "voting_deadline": previous.get("voting_deadline") or now + voting_duration,
+            "first_vote_at": previous.get("first_vote_at") or now,
+            "first_vote": previous.get("first_vote_at") is None
+        }
+    
+    def unregister_vote(self, client_id: str, voting: Dict[str, Any]) -> None:
+        """Desfaz register_vote quando o voto não chegou a ser gravado"""
+        self.update_one(
+            {"_id": ObjectId(client_id), "vote_count": {"$gt": 0}},
+            {"$inc": {"vote_count": -1}}
+        )
+        if voting["first_vote"]:
+            # Só reabre o prazo se nenhum outro voto foi registrado nesse meio tempo
+            self.update_one(
+                {"_id": ObjectId(client_id), "first_vote_at": voting["first_vote_at"], "vote_count": 0},
+                {"$set": {"first_vote_at": None, "voting_deadline": None}}
+            )
+    
+    def finalize_voting(self, client_id: str, status: str, total_votes: int) -> Optional[Dict[str, Any]]:
+        """
+        Transição condicional em_votacao -> aprovado/rejeitado. Apenas uma
+        chamada concorrente vence; as demais recebem None.
+        
+        total_votes é a contagem usada no resultado: se um voto foi registrado
+        depois dela (vote_count diferente), nada muda e quem chamou deve recontar.
+        """
+        data = {"status": status, "finalized_at": datetime.utcnow()}
+        if status == "aprovado":
+            data["api_key"] = self.generate_api_key()
+        return self.find_one_and_update(
+            {
+                "_id": ObjectId(client_id),
+                "status": "em_votacao",
+                "$or": [{"vote_count": total_votes}, {"vote_count": {"$exists": False}}]
+            },
+            {"$set": data},
+            projection={"company_name": 1, "status": 1}
+        )
+    
+    def find_voting_deadlines(self) -> List[Dict[str, Any]]:
+        """Prazos de todas as votações abertas que já receberam o primeiro voto"""
+        return self.find_many(
+            {"status": "em_votacao", "voting_deadline": {"$ne": None}},
+            projection={"voting_deadline": 1}
+        )
+    
+    def find_awaiting_vote(
+        self,
+        steward_id: str,
+        limit: int,
+        after: Optional[Tuple[datetime, ObjectId]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Clientes em votação sem voto do steward, por prazo (sem prazo por último).
+        Duas faixas, cada uma ordenada pelo índice (status, voting_deadline, _id):
+        primeiro as votações com prazo, depois as sem prazo. O keyset fica nos
+        campos gravados, antes do anti-join: para cada cliente, na ordem, um
+        $lookup pontual no índice (steward_id, client_id) de votes.
+        """
+        with_deadline = {"status": "em_votacao", "voting_deadline": {"$ne": None}}
+        without_deadline = {"status": "em_votacao", "voting_deadline": None}
+        if after:
+            sort_key, last_id = after
+            if sort_key >= self.NO_DEADLINE:
+                with_deadline = None
+                without_deadline["_id"] = {"$gt": last_id}
+            else:
+                with_deadline["$or"] = [
+                    {"voting_deadline": {"$gt": sort_key}},
+                    {"voting_deadline": sort_key, "_id": {"$gt": last_id}}
+                ]
+        
+        clients = []
+        for filter in (with_deadline, without_deadline):
+            if filter is None or len(clients) >= limit:
+                continue
+            clients += self.aggregate(self._awaiting_vote_pipeline(filter, steward_id, limit - len(clients)))
+        return clients
+    
+    def _awaiting_vote_pipeline(self, filter: Dict[str, Any], steward_id: str, limit: int) -> List[Dict[str, Any]]:
+        return [
+            {"$match": filter},
+            {"$sort": {"voting_deadline": 1, "_id": 1}},
+            {"$addFields": {"client_key": {"$toString": "$_id"}}},
+            {"$lookup": {
+                "from": "votes",
+                "localField": "client_key",
+                "foreignField": "client_id",
+                "pipeline": [
+                    {"$match": {"steward_id": steward_id}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1}}
+                ],
+                "as": "steward_vote"
+            }},
+            {"$match": {"steward_vote": {"$size": 0}}},
+            {"$limit": limit},
+            {"$project": {
+                "company_name": 1,
+                "cnpj": 1,
+                "email": 1,
+                "client_type": 1,
+                "status": 1,
+                "api_key": 1,
+                "created_at": 1,
+                "voting_deadline": 1,
+                "voting_sort_key": {"$ifNull": ["$voting_deadline", self.NO_DEADLINE]}
+            }}
+        ]
+    
+    def backfill_voting_deadlines(self, voting_duration: timedelta) -> int:
+        """Preenche voting_deadline de votações iniciadas antes do campo existir"""
+        result = self.collection.update_many(
+            {"status": "em_votacao", "first_vote_at": {"$ne": None}, "voting_deadline": None},
+            [{"$set": {"voting_deadline": {
+                "$add": ["$first_vote_at", int(voting_duration.total_seconds() * 1000)]
+            }}}]
+        )
+        return result.modified_count
     
     def update_client_info(
         self,
@@ -162,6 +437,10 @@ class ClientRepository(MongoDBRepository):
         data: Dict[str, Any]
     ) -> bool:
         data["updated_at"] = datetime.utcnow()
+        if any(field in data for field in self.SEARCH_FIELDS):
+            current = self.find_by_id(client_id, projection={field: 1 for field in self.SEARCH_FIELDS}) or {}
+            current.update(data)
+            data.update(build_search_fields(current, self.SEARCH_FIELDS))
         return self.update_by_id(client_id, {"$set": data})
     
     def get_client_statistics(self) -> Dict[str, Any]:
@@ -194,7 +473,7 @@ class SchemaRepository(MongoDBRepository):
         version: str,
         attributes: List[str],
         steward_id: str
-    ) -> str:
+    ) -> Dict[str, Any]:
         schema = {
             "schema_id": schema_id,
             "name": name,
@@ -203,7 +482,7 @@ class SchemaRepository(MongoDBRepository):
             "steward_id": steward_id,
             "credentials_issued": 0
         }
-        return self.insert_one(schema)
+        return self.insert_document(schema)
     
     def find_by_schema_id(self, schema_id: str) -> Optional[Dict[str, Any]]:
         return self.find_one({"schema_id": schema_id})
@@ -242,7 +521,7 @@ class CredentialRepository(MongoDBRepository):
         client_id: str,
         attributes: Dict[str, Any],
         status: str = "active"
-    ) -> str:
+    ) -> Dict[str, Any]:
         credential = {
             "credential_id": credential_id,
             "schema_id": schema_id,
@@ -252,7 +531,7 @@ class CredentialRepository(MongoDBRepository):
             "status": status,
             "issued_at": datetime.utcnow()
         }
-        return self.insert_one(credential)
+        return self.insert_document(credential)
     
     def find_by_credential_id(self, credential_id: str) -> Optional[Dict[str, Any]]:
         return self.find_one({"credential_id": credential_id})
@@ -288,6 +567,8 @@ class TruthyRepository(MongoDBRepository):
         self.create_index([("client_id", 1)], unique=True)
         self.create_index([("did", 1)], unique=True)
         self.create_index([("created_at", -1)])
+        self.create_index([("ledger_transaction_id", 1)])
+        self.create_index([("ledger_status", 1)])
     
     def create_truthy(
         self,
@@ -298,7 +579,7 @@ class TruthyRepository(MongoDBRepository):
         role: str,
         alias: str,
         ledger_status: str = "pending"
-    ) -> str:
+    ) -> Dict[str, Any]:
         truthy_data = {
             "client_id": client_id,
             "did": did,
@@ -306,9 +587,10 @@ class TruthyRepository(MongoDBRepository):
             "acapy_admin_url": acapy_admin_url,
             "role": role,
             "alias": alias,
-            "ledger_status": ledger_status
+            "ledger_status": ledger_status,
+            "attempt": 0
         }
-        return self.insert_one(truthy_data)
+        return self.insert_document(truthy_data)
     
     def find_by_client_id(self, client_id: str) -> Optional[Dict[str, Any]]:
         return self.find_one({"client_id": client_id})
@@ -316,8 +598,113 @@ class TruthyRepository(MongoDBRepository):
     def find_by_did(self, did: str) -> Optional[Dict[str, Any]]:
         return self.find_one({"did": did})
     
-    def update_ledger_status(self, truthy_id: str, status: str) -> bool:
-        return self.update_by_id(truthy_id, {"$set": {"ledger_status": status, "updated_at": datetime.utcnow()}})
+    def update_ledger_status(self, truthy_id: str, status: str, **fields: Any) -> bool:
+        return self.update_by_id(
+            truthy_id,
+            {"$set": {"ledger_status": status, "updated_at": datetime.utcnow(), **fields}}
+        )
+    
+    def find_by_transaction_id(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        return self.find_one({"ledger_transaction_id": transaction_id})
+    
+    @staticmethod
+    def _stale(stale_before: datetime) -> Dict[str, Any]:
+        """
+        Pendente sem transação no endorser e parado além do timeout: a chamada
+        register-nym começou (attempt_started_at) há mais tempo que isso, ou a
+        reserva ainda não chegou à chamada desde então. Registros anteriores ao
+        campo updated_at usam created_at.
+        """
+        return {
+            "ledger_status": "pending",
+            "ledger_transaction_id": None,
+            "$or": [
+                {"attempt_started_at": {"$lt": stale_before}},
+                {"attempt_started_at": None, "updated_at": {"$lt": stale_before}},
+                {"attempt_started_at": None, "updated_at": None, "created_at": {"$lt": stale_before}}
+            ]
+        }
+    
+    def claim_stale_pending(self, stale_before: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Assume um registro pendente parado além do timeout. O novo attempt faz
+        desistir quem ainda esperava uma vaga com o anterior, e a atualização de
+        updated_at impede que outra varredura o reassuma em seguida.
+        """
+        return self.find_one_and_update(
+            self._stale(stale_before),
+            {
+                "$set": {"ledger_status": "pending"},
+                "$unset": {"attempt_started_at": ""},
+                "$inc": {"attempt": 1}
+            }
+        )
+    
+    def reopen_registration(self, client_id: str, data: Dict[str, Any], stale_before: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Reabre com os novos dados um registro que falhou na ledger ou que está
+        pendente além do timeout sem ter chegado ao endorser
+        """
+        return self.find_one_and_update(
+            {"client_id": client_id, "$or": [{"ledger_status": "failed"}, self._stale(stale_before)]},
+            {
+                "$set": {**data, "ledger_status": "pending"},
+                "$unset": {"ledger_error": "", "ledger_transaction_id": "", "attempt_started_at": ""},
+                "$inc": {"attempt": 1}
+            }
+        )
+    
+    def start_attempt(self, truthy_id: str, attempt: Optional[int]) -> bool:
+        """
+        Marca o início da chamada register-nym, desde que a tentativa ainda seja
+        a vigente (o registro não foi reaberto nem reassumido enquanto esperava)
+        """
+        return self.update_one(
+            {"_id": ObjectId(truthy_id), "ledger_status": "pending", "ledger_transaction_id": None, "attempt": attempt},
+            {"$set": {"attempt_started_at": datetime.utcnow()}}
+        )
+    
+    def attach_transaction(self, truthy_id: str, attempt: Optional[int], transaction_id: str) -> bool:
+        """Associa a transação do endorser à tentativa vigente"""
+        return self.update_one(
+            {"_id": ObjectId(truthy_id), "ledger_status": "pending", "attempt": attempt},
+            {"$set": {"ledger_transaction_id": transaction_id}}
+        )
+    
+    def complete_attempt(self, truthy_id: str, attempt: Optional[int], status: str, **fields: Any) -> bool:
+        """Conclui a chamada register-nym, se a tentativa ainda for a vigente"""
+        return self.update_one(
+            {"_id": ObjectId(truthy_id), "ledger_status": "pending", "attempt": attempt},
+            {"$set": {"ledger_status": status, **fields}}
+        )
+    
+    def complete_pending(self, truthy_id: str, status: str, **fields: Any) -> bool:
+        """Transição condicional pending -> registered/failed (idempotente)"""
+        return self.update_one(
+            {"_id": ObjectId(truthy_id), "ledger_status": "pending"},
+            {"$set": {"ledger_status": status, **fields}}
+        )
+
+
+class EndorserEventRepository(MongoDBRepository):
+    """
+    Eventos do endorser que chegaram antes de o ledger_transaction_id ser
+    gravado no truthy; aplicados quando a transação é associada.
+    """
+    
+    def __init__(self, client):
+        super().__init__(client, "endorser_events")
+        self.collection.create_index([("created_at", 1)], expireAfterSeconds=86400)
+    
+    def save_event(self, transaction_id: str, state: str) -> None:
+        self.collection.update_one(
+            {"_id": transaction_id},
+            {"$set": {"state": state}, "$setOnInsert": {"created_at": datetime.utcnow()}},
+            upsert=True
+        )
+    
+    def pop_event(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one_and_delete({"_id": transaction_id})
 
 
 class VoteRepository(MongoDBRepository):
@@ -327,6 +714,7 @@ class VoteRepository(MongoDBRepository):
         self.create_index([("steward_id", 1)])
         self.create_index([("created_at", -1)])
         self.create_index([("steward_id", 1), ("client_id", 1)], unique=True)
+        self.create_index([("steward_id", 1), ("created_at", -1), ("_id", -1)])
     
     def create_vote(
         self,
@@ -334,14 +722,14 @@ class VoteRepository(MongoDBRepository):
         client_id: str,
         vote: str,
         comment: Optional[str] = None
-    ) -> str:
+    ) -> Dict[str, Any]:
         vote_data = {
             "steward_id": steward_id,
             "client_id": client_id,
             "vote": vote,
             "comment": comment
         }
-        return self.insert_one(vote_data)
+        return self.insert_document(vote_data)
     
     def find_by_client(self, client_id: str) -> List[Dict[str, Any]]:
         return self.find_many({"client_id": client_id})
@@ -353,7 +741,21 @@ class VoteRepository(MongoDBRepository):
         return self.find_one({"steward_id": steward_id, "client_id": client_id})
     
     def count_votes_by_client(self, client_id: str) -> Dict[str, int]:
-        votes = self.find_by_client(client_id)
+        groups = self.aggregate([
+            {"$match": {"client_id": client_id}},
+            {"$group": {"_id": "$vote", "count": {"$sum": 1}}}
+        ])
+        counts = {group["_id"]: group["count"] for group in groups}
+        return {
+            "total": sum(counts.values()),
+            "approve": counts.get("approve", 0),
+            "reject": counts.get("reject", 0),
+            "abstain": counts.get("abstain", 0)
+        }
+    
+    @staticmethod
+    def tally_votes(votes: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Contabiliza um conjunto de votos já carregado"""
         approve_count = sum(1 for v in votes if v.get("vote") == "approve")
         reject_count = sum(1 for v in votes if v.get("vote") == "reject")
         abstain_count = sum(1 for v in votes if v.get("vote") == "abstain")
@@ -363,3 +765,35 @@ class VoteRepository(MongoDBRepository):
             "reject": reject_count,
             "abstain": abstain_count
         }
+
+
+
+# ==================== LEASE REPOSITORY ====================
+
+class LeaseRepository(MongoDBRepository):
+    """Leases para eleição de líder entre workers (um documento por serviço)"""
+    
+    def __init__(self, client):
+        super().__init__(client, "leases")
+        self.create_index([("expires_at", 1)])
+    
+    def try_acquire(self, name: str, owner: str, ttl: timedelta) -> bool:
+        """Adquire ou renova o lease se estiver livre, expirado ou já for nosso"""
+        now = datetime.utcnow()
+        try:
+            lease = self.collection.find_one_and_update(
+                {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": owner, "expires_at": now + ttl, "renewed_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return lease is not None and lease.get("owner") == owner
+        except DuplicateKeyError:
+            # Outro worker detém um lease válido
+            return False
+    
+    def release(self, name: str, owner: str) -> bool:
+        return self.delete_one({"_id": name, "owner": owner})
+    
+    def find_lease(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one({"_id": name})
@@ -1,115 +1,188 @@
 import asyncio
+import heapq
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, List, Tuple, Callable
+from bson import ObjectId
+from modules.config.settings import settings
 from modules.utils.mongodb import get_mongodb_client
 from modules.utils.repositories import ClientRepository, VoteRepository, StewardRepository
+from modules.utils.voting import evaluate_voting
+from modules.utils.leader import LeaderLease
+from modules.utils.events import voting_events
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Espera antes de recontar quando um voto ainda estava sendo gravado na finalização
+FINALIZE_RETRY_DELAY = timedelta(seconds=1)
+
 class VotingScheduler:
-    def __init__(self, check_interval: int = 10):
-        self.check_interval = check_interval
+    def __init__(self, resync_interval: int = 60):
+        self.resync_interval = resync_interval
+        self.voting_duration = timedelta(seconds=settings.voting_duration_seconds)
         self.running = False
         self.task: Optional[asyncio.Task] = None
         
+        # Fila de prioridade (deadline, client_id) das votações abertas
+        self._deadlines: List[Tuple[datetime, str]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
         # Inicializar repositórios
         self.db_client = get_mongodb_client()
         self.client_repository = ClientRepository(self.db_client)
         self.vote_repository = VoteRepository(self.db_client)
         self.steward_repository = StewardRepository(self.db_client)
+        
+        # Apenas o worker líder reconstrói a fila e varre prazos vencidos
+        self.lease = LeaderLease("voting_scheduler", ttl_seconds=settings.scheduler_lease_ttl)
+        # Tarefas de manutenção executadas só pelo líder (eleição e ressincronização)
+        self._leader_tasks: List[Callable[[], None]] = []
     
-    async def check_expired_votings(self):
-        try:
-            # Buscar todos os clientes em votação
-            clients_in_voting = self.client_repository.find_by_status("em_votacao")
-            
-            now = datetime.utcnow()
-            
-            for client in clients_in_voting:
-                first_vote_at = client.get("first_vote_at")
-                
-                # Se ainda não teve primeiro voto, pular
-                if not first_vote_at:
-                    continue
-                
-                # Calcular deadline (2 minutos após primeiro voto)
-                deadline = first_vote_at + timedelta(minutes=2)
-                
-                # Se o prazo expirou
-                if now > deadline:
-                    client_id = str(client["_id"])
-                    await self._finalize_voting(client_id, client)
+    @property
+    def is_leader(self) -> bool:
+        return self.lease.is_leader
+    
+    @property
+    def pending_deadlines(self) -> int:
+        return len(self._deadlines)
+    
+    @property
+    def next_deadline(self) -> Optional[datetime]:
+        return self._deadlines[0][0] if self._deadlines else None
+    
+    def add_leader_task(self, task: Callable[[], None]):
+        self._leader_tasks.append(task)
+    
+    def _run_leader_tasks(self):
+        for task in self._leader_tasks:
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"Erro na tarefa do líder {getattr(task, '__name__', task)}: {e}")
+    
+    def rebuild_queue(self):
+        """Reconstrói a fila a partir do índice (status, voting_deadline)"""
+        backfilled = self.client_repository.backfill_voting_deadlines(self.voting_duration)
+        if backfilled:
+            logger.info(f"{backfilled} votações antigas receberam voting_deadline")
         
-        except Exception as e:
-            logger.error(f"Erro ao verificar votações expiradas: {e}")
+        deadlines = [
+            (client["voting_deadline"], str(client["_id"]))
+            for client in self.client_repository.find_voting_deadlines()
+        ]
+        heapq.heapify(deadlines)
+        self._deadlines = deadlines
+    
+    def schedule(self, client_id: str, deadline: datetime):
+        """
+        Agenda a finalização de uma votação. Pode ser chamado a partir das
+        rotas síncronas (threadpool), por isso o loop é acordado de forma thread-safe.
+        
+        Workers que não são líderes também honram os prazos dos votos que
+        receberam: a finalização é uma transição condicional e idempotente.
+        """
+        if self._loop is None or not self.running:
+            return
+        self._loop.call_soon_threadsafe(self._push, deadline, client_id)
+    
+    def _push(self, deadline: datetime, client_id: str):
+        heapq.heappush(self._deadlines, (deadline, client_id))
+        if self._wakeup:
+            self._wakeup.set()
+    
+    async def check_now(self):
+        """Verificação manual: recarrega a fila do banco e finaliza os prazos vencidos"""
+        self.rebuild_queue()
+        await self._finalize_due()
+    
+    async def _finalize_due(self):
+        now = datetime.utcnow()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, client_id = heapq.heappop(self._deadlines)
+            
+            # Consulta pontual: a votação pode já ter sido encerrada por outro caminho
+            client = self.client_repository.find_one(
+                {"_id": ObjectId(client_id), "status": "em_votacao"},
+                projection={"company_name": 1}
+            )
+            if client:
+                await self._finalize_voting(client_id, client)
     
     async def _finalize_voting(self, client_id: str, client: dict):
         try:
             vote_counts = self.vote_repository.count_votes_by_client(client_id)
             total_stewards = self.steward_repository.count({"status": "active"})
             
-            # Verificar participação mínima (50%)
-            min_participation = total_stewards * 0.5
-            has_min_participation = vote_counts["total"] >= min_participation
-            
-            if not has_min_participation:
-                # Participação insuficiente - rejeitar
-                self.client_repository.update_client_status(client_id, "rejeitado")
-                logger.info(
-                    f"Cliente {client_id} ({client.get('company_name')}) rejeitado: "
-                    f"participação insuficiente ({vote_counts['total']}/{total_stewards})"
-                )
-                return
+            new_status, reason = evaluate_voting(vote_counts, total_stewards)
             
-            # Calcular resultado baseado em 2/3 dos votos válidos
-            valid_votes = vote_counts["approve"] + vote_counts["reject"]
-            
-            if valid_votes == 0:
-                # Apenas abstenções - rejeitar
-                self.client_repository.update_client_status(client_id, "rejeitado")
-                logger.info(
-                    f"Cliente {client_id} ({client.get('company_name')}) rejeitado: "
-                    f"apenas votos de abstenção"
-                )
-                return
-            
-            required_approvals = valid_votes * (2/3)
-            
-            if vote_counts["approve"] >= required_approvals:
-                self.client_repository.update_client_status(client_id, "aprovado")
-                logger.info(
-                    f"Cliente {client_id} ({client.get('company_name')}) aprovado: "
-                    f"{vote_counts['approve']}/{valid_votes} votos favoráveis "
-                    f"(necessário: {required_approvals:.1f})"
-                )
-            else:
-                self.client_repository.update_client_status(client_id, "rejeitado")
-                logger.info(
-                    f"Cliente {client_id} ({client.get('company_name')}) rejeitado: "
-                    f"{vote_counts['approve']}/{valid_votes} votos favoráveis "
-                    f"(necessário: {required_approvals:.1f})"
-                )
+            # Transição condicional: apenas um finalizador vence
+            if self.client_repository.finalize_voting(client_id, new_status, vote_counts["total"]):
+                logger.info(f"Cliente {client_id} ({client.get('company_name')}) {new_status}: {reason}")
+                voting_events.notify_status_changed(client_id, new_status, reason)
+            elif self.client_repository.exists({"_id": ObjectId(client_id), "status": "em_votacao"}):
+                # Voto registrado depois da contagem: reconta em seguida
+                self._push(datetime.utcnow() + FINALIZE_RETRY_DELAY, client_id)
         
         except Exception as e:
             logger.error(f"Erro ao finalizar votação do cliente {client_id}: {e}")
     
+    def _seconds_until_next(self) -> float:
+        timeout = min(float(self.resync_interval), self.lease.renew_interval)
+        if self._deadlines:
+            remaining = (self._deadlines[0][0] - datetime.utcnow()).total_seconds()
+            timeout = min(timeout, max(remaining, 0.0))
+        return timeout
+    
     async def run(self):
         self.running = True
-        logger.info(f"Voting Scheduler iniciado (intervalo: {self.check_interval}s)")
+        logger.info(f"Voting Scheduler iniciado (ressincronização: {self.resync_interval}s)")
         
+        last_resync = datetime.utcnow()
+        last_renew = datetime.utcnow()
         while self.running:
             try:
-                await self.check_expired_votings()
-                await asyncio.sleep(self.check_interval)
+                now = datetime.utcnow()
+                if (now - last_renew).total_seconds() >= self.lease.renew_interval:
+                    was_leader = self.lease.is_leader
+                    self.lease.renew()
+                    last_renew = now
+                    # Novo líder: assume todos os prazos persistidos
+                    if self.lease.is_leader and not was_leader:
+                        self.rebuild_queue()
+                        self._run_leader_tasks()
+                        last_resync = now
+                
+                await self._finalize_due()
+                
+                # Ressincroniza periodicamente para cobrir votos agendados por outros processos
+                if self.lease.is_leader and (datetime.utcnow() - last_resync).total_seconds() >= self.resync_interval:
+                    self.rebuild_queue()
+                    self._run_leader_tasks()
+                    last_resync = datetime.utcnow()
+                
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_next())
+                except asyncio.TimeoutError:
+                    pass
             except Exception as e:
                 logger.error(f"Erro no loop do scheduler: {e}")
-                await asyncio.sleep(self.check_interval)
+                await asyncio.sleep(1)
     
     def start(self):
         if not self.running:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            if self.lease.renew():
+                self.rebuild_queue()
+                self._run_leader_tasks()
+            self.running = True
             self.task = asyncio.create_task(self.run())
-            logger.info("Voting Scheduler task criada")
+            logger.info(
+                f"Voting Scheduler task criada (líder: {self.is_leader}, "
+                f"{self.pending_deadlines} prazos na fila)"
+            )
     
     async def stop(self):
         self.running = False
@@ -120,5 +193,7 @@ class VotingScheduler:
             except asyncio.CancelledError:
                 pass
             logger.info("Voting Scheduler parado")
+        # Libera o lease para que outro worker assuma imediatamente
+        self.lease.release()
 
-voting_scheduler = VotingScheduler(check_interval=10)
+voting_scheduler = VotingScheduler(resync_interval=settings.voting_resync_interval)
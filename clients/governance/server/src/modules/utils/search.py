@@ -0,0 +1,67 @@
+import re
+import unicodedata
+from typing import Dict, Any, List, Iterable
+
+# Tamanho mínimo/máximo dos prefixos indexados
+MIN_PREFIX_LENGTH = 1
+MAX_PREFIX_LENGTH = 20
+
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(value: str) -> str:
+    """Remove acentos e converte para minúsculas"""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(value: str) -> List[str]:
+    return [token for token in _TOKEN_SPLIT.split(normalize_text(value)) if token]
+
+
+def _prefixes(token: str) -> Iterable[str]:
+    token = token[:MAX_PREFIX_LENGTH]
+    for size in range(MIN_PREFIX_LENGTH, len(token) + 1):
+        yield token[:size]
+
+
+def build_search_fields(document: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Calcula as chaves de busca de um documento.
+
+    - search_terms: palavras completas normalizadas (usadas no ranking)
+    - search_keys: prefixos de cada palavra (usados no filtro indexado)
+    """
+    terms = set()
+    for field in fields:
+        value = document.get(field)
+        if not value:
+            continue
+        terms.update(tokenize(str(value)))
+        # Valor completo normalizado (ex: email inteiro, CNPJ)
+        compact = "".join(tokenize(str(value)))
+        if compact:
+            terms.add(compact)
+
+    keys = set()
+    for term in terms:
+        keys.update(_prefixes(term))
+
+    return {
+        "search_terms": sorted(terms),
+        "search_keys": sorted(keys)
+    }
+
+
+def build_query_tokens(query: str) -> List[str]:
+    """Converte o texto digitado em tokens compatíveis com search_keys"""
+    tokens = []
+    raw_tokens = tokenize(query)
+    # CNPJ formatado (12.345.678/0001-99) é buscado pelos dígitos contíguos
+    if raw_tokens and all(token.isdigit() for token in raw_tokens):
+        raw_tokens = ["".join(raw_tokens)]
+    for token in raw_tokens:
+        token = token[:MAX_PREFIX_LENGTH]
+        if len(token) >= MIN_PREFIX_LENGTH and token not in tokens:
+            tokens.append(token)
+    return tokens
@@ -0,0 +1,45 @@
+from typing import Iterable, Iterator, Literal, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+StreamFormat = Literal["ndjson", "json"]
+
+# Quantidade de itens serializados por chunk enviado ao cliente
+CHUNK_SIZE = 100
+
+
+def _chunks(parts: Iterator[str]) -> Iterator[bytes]:
+    buffer = []
+    for part in parts:
+        buffer.append(part)
+        if len(buffer) >= CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def _ndjson_lines(items: Iterable[BaseModel]) -> Iterator[str]:
+    for item in items:
+        yield item.model_dump_json() + "\n"
+
+
+def _json_array(items: Iterable[BaseModel]) -> Iterator[str]:
+    # Mantém o envelope do SuccessResponse: {"code": "SUCCESS", "data": [...]}
+    yield '{"code":"SUCCESS","data":['
+    first = True
+    for item in items:
+        yield ("" if first else ",") + item.model_dump_json()
+        first = False
+    yield "]}"
+
+
+def stream_response(items: Iterable[BaseModel], stream_format: Optional[StreamFormat]) -> StreamingResponse:
+    """
+    Serializa os itens à medida que são lidos do cursor, mantendo o uso de
+    memória constante independentemente do tamanho da coleção.
+    """
+    if stream_format == "ndjson":
+        return StreamingResponse(_chunks(_ndjson_lines(items)), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(_chunks(_json_array(items)), media_type="application/json")
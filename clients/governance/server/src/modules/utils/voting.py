@@ -0,0 +1,34 @@
+from typing import Dict, Tuple
+
+# Regras da votação de clientes:
+# - participação mínima de 50% dos stewards ativos
+# - aprovação com pelo menos 2/3 dos votos válidos (approve + reject)
+MIN_PARTICIPATION = 0.5
+APPROVAL_RATIO = 2 / 3
+
+
+def has_min_participation(vote_counts: Dict[str, int], total_stewards: int) -> bool:
+    return vote_counts["total"] >= total_stewards * MIN_PARTICIPATION
+
+
+def evaluate_voting(vote_counts: Dict[str, int], total_stewards: int) -> Tuple[str, str]:
+    """
+    Calcula o resultado de uma votação encerrada.
+
+    Retorna o novo status do cliente ("aprovado" ou "rejeitado") e o motivo.
+    """
+    if not has_min_participation(vote_counts, total_stewards):
+        return "rejeitado", f"participação insuficiente ({vote_counts['total']}/{total_stewards})"
+
+    valid_votes = vote_counts["approve"] + vote_counts["reject"]
+    if valid_votes == 0:
+        return "rejeitado", "apenas votos de abstenção"
+
+    required_approvals = valid_votes * APPROVAL_RATIO
+    summary = (
+        f"{vote_counts['approve']}/{valid_votes} votos favoráveis "
+        f"(necessário: {required_approvals:.1f})"
+    )
+    if vote_counts["approve"] >= required_approvals:
+        return "aprovado", summary
+    return "rejeitado", summary
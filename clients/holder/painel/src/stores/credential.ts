@@ -11,13 +11,10 @@ export interface CredentialOffer {
   connection_id: string
   schema_id: string
   cred_def_id: string
-  credential_preview?: {
-    '@type'?: string
-    attributes: Array<{
-      name: string
-      value: string
-    }>
-  }
+  credential_preview?: Array<{
+    name: string
+    value: string
+  }>
 }
 
 export interface AcceptOfferRequest {
@@ -50,21 +47,25 @@ export const useCredentialStore = defineStore('credential', () => {
   const appStore = useAppStore()
 
   // Actions
-  async function fetchOffers(): Promise<CredentialOffer[] | null> {
+  async function fetchOffers(did: string): Promise<CredentialOffer[] | null> {
     const result = await appStore.makeApiCall(async () => {
-      const response = await axiosInstance.get('/credential/offers')
+      const items: CredentialOffer[] = []
+      let cursor: string | null = null
       
-      if (response.data.code === 'SUCCESS') {
-        const data = response.data.data
+      do {
+        const response: any = await axiosInstance.get('/credential/offers', {
+          params: { did, limit: 200, cursor: cursor ?? undefined }
+        })
         
-        if (!data || (Array.isArray(data) && data.length === 0)) {
-          return []
+        if (response.data.code !== 'SUCCESS') {
+          throw new Error(response.data.data || 'Erro ao carregar ofertas de credenciais')
         }
         
-        return Array.isArray(data) ? data : [data]
-      } else {
-        throw new Error(response.data.data || 'Erro ao carregar ofertas de credenciais')
-      }
+        items.push(...response.data.data.items)
+        cursor = response.data.data.next_cursor
+      } while (cursor)
+      
+      return items
     })
 
     if (result !== null) {
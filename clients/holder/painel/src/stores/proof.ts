@@ -84,21 +84,25 @@ export const useProofStore = defineStore('proof', () => {
   const appStore = useAppStore()
 
   // Actions
-  async function fetchProofRequests(): Promise<ProofRequest[] | null> {
+  async function fetchProofRequests(did: string): Promise<ProofRequest[] | null> {
     const result = await appStore.makeApiCall(async () => {
-      const response = await axiosInstance.get('/proof/requests')
+      const items: ProofRequest[] = []
+      let cursor: string | null = null
       
-      if (response.data.code === 'SUCCESS') {
-        const data = response.data.data
+      do {
+        const response: any = await axiosInstance.get('/proof/requests', {
+          params: { did, limit: 200, cursor: cursor ?? undefined }
+        })
         
-        if (!data || (Array.isArray(data) && data.length === 0)) {
-          return []
+        if (response.data.code !== 'SUCCESS') {
+          throw new Error(response.data.data || 'Erro ao carregar pedidos de prova')
         }
         
-        return Array.isArray(data) ? data : [data]
-      } else {
-        throw new Error(response.data.data || 'Erro ao carregar pedidos de prova')
-      }
+        items.push(...response.data.data.items)
+        cursor = response.data.data.next_cursor
+      } while (cursor)
+      
+      return items
     })
 
     if (result !== null) {
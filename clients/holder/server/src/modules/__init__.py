@@ -2,7 +2,12 @@
 from modules.config.settings import settings
 from modules.config.app import create_app
 from modules.user.schema import User
-from modules.webhook.schema import Notification, PresentProofRequest, CredentialOffer
+from modules.webhook.dedup import ProcessedWebhookEvent
+from modules.webhook.event_log import WebhookEventLog
+from modules.webhook.schema import Notification, PresentProofRequest, CredentialOffer, backfill_user_dids
+from modules.credential.schema import StoredCredential
+from modules.connection.schema import UserConnection
+from modules.utils.watermark import SyncWatermark
 
 # Create app instance
 app = create_app()
@@ -11,4 +16,10 @@ app = create_app()
 User.init_db()
 Notification.init_db()
 PresentProofRequest.init_db()
-CredentialOffer.init_db()
\ No newline at end of file
+CredentialOffer.init_db()
+StoredCredential.init_db()
+UserConnection.init_db()
+SyncWatermark.init_db()
+ProcessedWebhookEvent.init_db()
+WebhookEventLog.init_db()
+backfill_user_dids()
\ No newline at end of file
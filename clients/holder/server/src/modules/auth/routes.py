@@ -1,4 +1,6 @@
 import modules.auth.service as auth_service
+from modules.utils.password import PasswordPoolBusyError, password_hasher
+from modules.user.cache import user_cache
 from modules.utils.model import ErrorResponse, SuccessResponse
 from modules.auth.schema import AuthRegisterRequest, AuthLoginRequest
 from fastapi.responses import JSONResponse
@@ -24,6 +26,11 @@ def register_user(credentials: AuthRegisterRequest):
 
         return JSONResponse(status_code=201, content=SuccessResponse(data=result).model_dump())
 
+    except PasswordPoolBusyError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=ErrorResponse(code="AUTH_BUSY", data=e.args[0]).model_dump()
+        )
     except Exception as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -51,10 +58,21 @@ def login_user(credentials: AuthLoginRequest):
             content=SuccessResponse(data=result).model_dump(),
         )
 
+    except PasswordPoolBusyError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=ErrorResponse(code="AUTH_BUSY", data=e.args[0]).model_dump()
+        )
     except Exception as e:
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content=ErrorResponse(code="INTERNAL_SERVER_ERROR", data=e.args[0] if e.args else "Erro ao autenticar usuário").model_dump()
         )
 
-    
\ No newline at end of file
+@router.get("/metrics", response_model=SuccessResponse)
+def get_auth_metrics():
+    metrics = {
+        "password_hasher": password_hasher.snapshot(),
+        "user_cache": user_cache.snapshot()
+    }
+    return JSONResponse(status_code=200, content=SuccessResponse(data=metrics).model_dump())
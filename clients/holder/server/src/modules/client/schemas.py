@@ -240,7 +240,7 @@ class ClientConnection(Base):
             logging.exception(f"Erro inesperado: {e}")
             return None
         
-    def get_connections(self, id: str = None, alias : str = None, invitation_msg_id: str = None):
+    def get_connections(self, id: str = None, alias : str = None, invitation_msg_id: str = None, limit: int = None, offset: int = None):
         endpoint = f"{self.url}/connections"
         params = {}
         if alias and id:
@@ -249,6 +249,9 @@ class ClientConnection(Base):
             params["alias"] = alias
         if invitation_msg_id:
             params["invitation_msg_id"] = invitation_msg_id
+        if limit is not None:
+            params["limit"] = limit
+            params["offset"] = offset or 0
         if id:
             endpoint += f"/{id}"
 
@@ -579,7 +582,7 @@ class ClientIssue(Base):
 
             if response.status_code == 200:
                 logging.info(f"Credencial armazenada com sucesso.")
-                return self._fields(response.json(), ["cred_ex_id", "connection_id", "created_at", "updated_at", "state"])
+                return self._fields(response.json(), ["cred_ex_id", "connection_id", "created_at", "updated_at", "state", "cred_id_stored"])
             else:
                 logging.error(f"Falha ao armazenar credencial. Corpo da resposta: {response.text}")
                 return None
@@ -626,13 +629,17 @@ class ClientIssue(Base):
             logging.exception(f"Erro inesperado: {e}")
             return None
         
-    def get_stored_credentials(self):
+    def get_stored_credentials(self, start: int = 0, count: int = 100):
         endpoint = f"{self.url}/credentials"
+        params = {
+            "start": start,
+            "count": count
+        }
 
         logging.info(f"Enviando requisição para {endpoint}")
 
         try:
-            response = httpx.get(endpoint, headers=self._get_headers(), timeout=30.0)
+            response = httpx.get(endpoint, params=params, headers=self._get_headers(), timeout=30.0)
             response.raise_for_status()
 
             if response.status_code == 200:
@@ -654,6 +661,32 @@ class ClientIssue(Base):
             logging.exception(f"Erro inesperado: {e}")
             return None
         
+    def get_credential(self, credential_id: str):
+        endpoint = f"{self.url}/credential/{credential_id}"
+
+        logging.info(f"Enviando requisição para {endpoint}")
+
+        try:
+            response = httpx.get(endpoint, headers=self._get_headers(), timeout=10.0)
+
+            if response.status_code == 200:
+                logging.info(f"Credencial armazenada obtida com sucesso.")
+                return self._fields(response.json(), [
+                    "referent", 
+                    "schema_id", 
+                    "cred_def_id", 
+                    "attrs"
+                ])
+            else:
+                logging.error(f"Falha ao obter credencial armazenada. Corpo da resposta: {response.text}")
+                return None
+        except httpx.RequestError as e:
+            logging.error(f"Erro de conexão com o ACA-Py: {e}")
+            return None
+        except Exception as e:
+            logging.exception(f"Erro inesperado: {e}")
+            return None
+        
 class ClientVerify(Base):
     def __init__(self, url: str):
         self.url = url
@@ -804,7 +837,7 @@ class ClientVerify(Base):
             logging.exception(f"Erro inesperado: {e}")
             return None
     
-    def get_proof_records(self, descending: bool = False, limit: int = 100, offset: int = 0, order_by: str = "id"):
+    def get_proof_records(self, descending: bool = False, limit: int = 100, offset: int = 0, order_by: str = "id", state: str = None):
         """Get proof records from ACA-Py"""
         endpoint = f"{self.url}/present-proof-2.0/records"
         params = {
@@ -813,6 +846,8 @@ class ClientVerify(Base):
             "offset": offset,
             "order_by": order_by
         }
+        if state:
+            params["state"] = state
 
         logging.info(f"Enviando requisição para {endpoint}")
 
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import APIRouter
@@ -13,10 +15,39 @@ from modules.credential import routes as credential_routes
 from modules.proof import routes as proof_routes
 from modules.webhook import routes as webhook_routes
 from modules.notification import routes as notification_routes
+from modules.connection import service as connection_service
+from modules.credential import service as credential_service
+from modules.webhook.schema import backfill_user_dids
+from modules.proof import service as proof_service
+from modules.notification.events import notification_events
+from modules.utils.password import password_hasher
+
+def reconcile_wallet():
+    """Mapeia as conexões da wallet antes de reconciliar o índice de credenciais"""
+    connections = connection_service.sync_user_connections()
+    try:
+        backfill_user_dids()
+    except Exception as e:
+        print(f"Erro ao preencher o dono de notificações e ofertas: {str(e)}")
+    credentials = credential_service.sync_credential_index()
+    # A migração roda uma vez só, então espera o mapa de conexões e o índice completos
+    if isinstance(connections, dict) and isinstance(credentials, dict):
+        credential_service.migrate_credential_owners()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_hasher.start()
+    notification_events.attach(asyncio.get_running_loop())
+    # Reconcilia conexões e credenciais sem atrasar a subida da API
+    asyncio.get_running_loop().run_in_executor(None, reconcile_wallet)
+    proof_sync = asyncio.create_task(proof_service.run_proof_sync(settings.proof_sync_interval, settings.proof_reconcile_interval))
+    yield
+    proof_sync.cancel()
+    password_hasher.shutdown()
 
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     app.title = "Holder API"
 
     # Add CORS middleware
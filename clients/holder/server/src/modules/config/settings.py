@@ -25,4 +25,31 @@ class Settings:
         
         self.database_url = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
 
+        # Hash de senhas: custo do bcrypt e pool de processos (workers, fila máxima, timeout em s)
+        self.bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", 12))
+        self.password_pool_workers = int(os.getenv("PASSWORD_POOL_WORKERS", 2))
+        self.password_pool_max_pending = int(os.getenv("PASSWORD_POOL_MAX_PENDING", 16))
+        self.password_pool_timeout = float(os.getenv("PASSWORD_POOL_TIMEOUT", 10))
+
+        # Cache dos usuários autenticados por JWT: entradas máximas e TTL (s)
+        self.user_cache_size = int(os.getenv("USER_CACHE_SIZE", 1000))
+        self.user_cache_ttl = float(os.getenv("USER_CACHE_TTL", 60))
+
+        # Deduplicação de webhooks: entradas no LRU em memória e retenção (dias) da tabela
+        self.webhook_dedup_cache_size = int(os.getenv("WEBHOOK_DEDUP_CACHE_SIZE", 10000))
+        self.webhook_dedup_retention_days = int(os.getenv("WEBHOOK_DEDUP_RETENTION_DAYS", 7))
+
+        # Tamanho da página ao percorrer credenciais e conexões da wallet na reconciliação
+        self.wallet_sync_page_size = int(os.getenv("WALLET_SYNC_PAGE_SIZE", 100))
+
+        # Intervalo (s) da sincronização dos pedidos de prova pendentes com o ACA-Py
+        self.proof_sync_interval = int(os.getenv("PROOF_SYNC_INTERVAL", 60))
+        # Intervalo (s) da reconciliação completa dos pedidos de prova (todos os estados)
+        self.proof_reconcile_interval = int(os.getenv("PROOF_RECONCILE_INTERVAL", 3600))
+        # Lock que elege o único worker responsável pela sincronização
+        self.proof_sync_lock = os.getenv("PROOF_SYNC_LOCK", str(DB_PATH.parent / "proof_sync.lock"))
+
+        # Intervalo (s) do keepalive do stream SSE de notificações
+        self.notification_stream_keepalive = int(os.getenv("NOTIFICATION_STREAM_KEEPALIVE", 15))
+
 settings = Settings()
\ No newline at end of file
@@ -1,4 +1,7 @@
+import sqlite3
+from datetime import datetime
 from pydantic import BaseModel, Field
+from modules.config.settings import settings
 
 class ConnectionResponse(BaseModel):
     alias: str = Field(..., description="Alias of the connection")
@@ -6,4 +9,149 @@ class ConnectionResponse(BaseModel):
     created_at: str = Field(..., description="Creation timestamp")
     invitation_key: str = Field(..., description="Invitation key")
     invitation_mode: str = Field(..., description="Invitation mode")
-    state: str = Field(..., description="State of the connection")
\ No newline at end of file
+    state: str = Field(..., description="State of the connection")
+
+class UserConnection:
+    """Mapeamento local conexão -> usuário dono do DID efêmero"""
+    
+    def __init__(self, connection_id=None, user_did=None, my_did=None, their_did=None,
+                 their_public_did=None, their_label=None, state=None,
+                 created_at=None, updated_at=None):
+        self.connection_id = connection_id
+        self.user_did = user_did
+        self.my_did = my_did
+        self.their_did = their_did
+        self.their_public_did = their_public_did
+        self.their_label = their_label
+        self.state = state
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+    
+    @staticmethod
+    def _get_db_connection():
+        """Get database connection"""
+        db_path = settings.database_url.replace('sqlite:///', '')
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @staticmethod
+    def init_db():
+        """Initialize database tables"""
+        conn = UserConnection._get_db_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_connections (
+                connection_id TEXT PRIMARY KEY,
+                user_did TEXT,
+                my_did TEXT,
+                their_did TEXT,
+                their_public_did TEXT,
+                their_label TEXT,
+                state TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_user_connections_user_did ON user_connections(user_did)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_user_connections_my_did ON user_connections(my_did)')
+        conn.commit()
+        conn.close()
+    
+    def __repr__(self):
+        return f'<UserConnection {self.connection_id}>'
+    
+    def to_dict(self):
+        return {
+            'connection_id': self.connection_id,
+            'user_did': self.user_did,
+            'my_did': self.my_did,
+            'their_did': self.their_did,
+            'their_public_did': self.their_public_did,
+            'their_label': self.their_label,
+            'state': self.state,
+            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
+            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
+        }
+    
+    @classmethod
+    def find_by_connection_id(cls, connection_id):
+        conn = cls._get_db_connection()
+        row = conn.execute('SELECT * FROM user_connections WHERE connection_id = ?', (connection_id,)).fetchone()
+        conn.close()
+        
+        if row:
+            return cls._from_row(row)
+        return None
+    
+    @classmethod
+    def find_by_user_did(cls, user_did):
+        conn = cls._get_db_connection()
+        rows = conn.execute('SELECT * FROM user_connections WHERE user_did = ? ORDER BY created_at DESC', 
+                          (user_did,)).fetchall()
+        conn.close()
+        
+        return [cls._from_row(row) for row in rows]
+    
+    @classmethod
+    def find_mapped_by_public_did(cls, their_public_did):
+        """Conexões já associadas a um usuário com o emissor de DID público informado"""
+        conn = cls._get_db_connection()
+        rows = conn.execute('''
+            SELECT * FROM user_connections
+            WHERE their_public_did = ? AND user_did IS NOT NULL
+            ORDER BY created_at DESC
+        ''', (their_public_did,)).fetchall()
+        conn.close()
+        
+        return [cls._from_row(row) for row in rows]
+    
+    @classmethod
+    def _from_row(cls, row):
+        created_at = datetime.fromisoformat(row['created_at']) if row['created_at'] else datetime.utcnow()
+        updated_at = datetime.fromisoformat(row['updated_at']) if row['updated_at'] else datetime.utcnow()
+        
+        return cls(
+            connection_id=row['connection_id'],
+            user_did=row['user_did'],
+            my_did=row['my_did'],
+            their_did=row['their_did'],
+            their_public_did=row['their_public_did'],
+            their_label=row['their_label'],
+            state=row['state'],
+            created_at=created_at,
+            updated_at=updated_at
+        )
+    
+    def save(self):
+        """Insere ou atualiza a conexão; campos ausentes mantêm o valor gravado"""
+        conn = self._get_db_connection()
+        try:
+            self.updated_at = datetime.utcnow()
+            created_at_str = self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at
+            
+            conn.execute('''
+                INSERT INTO user_connections 
+                (connection_id, user_did, my_did, their_did, their_public_did, 
+                 their_label, state, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(connection_id) DO UPDATE SET
+                    user_did = COALESCE(excluded.user_did, user_did),
+                    my_did = COALESCE(excluded.my_did, my_did),
+                    their_did = COALESCE(excluded.their_did, their_did),
+                    their_public_did = COALESCE(excluded.their_public_did, their_public_did),
+                    their_label = COALESCE(excluded.their_label, their_label),
+                    state = COALESCE(excluded.state, state),
+                    updated_at = excluded.updated_at
+            ''', (
+                self.connection_id, self.user_did, self.my_did, self.their_did,
+                self.their_public_did, self.their_label, self.state,
+                created_at_str, self.updated_at.isoformat()
+            ))
+            
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
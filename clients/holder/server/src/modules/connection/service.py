@@ -1,5 +1,19 @@
+import threading
+from datetime import datetime, timedelta
 from typing import List
 from modules.client.service import AcaPyClient
+from modules.config.settings import settings
+from modules.connection.schema import UserConnection
+from modules.user.schema import User
+
+# Espera entre consultas ao ACA-Py por uma conexão que ele não soube informar
+CONNECTION_LOOKUP_BACKOFF = timedelta(seconds=5)
+CONNECTION_LOOKUP_MAX_BACKOFF = timedelta(minutes=5)
+
+# connection_id -> (tentativas falhas, próxima consulta permitida); só em memória,
+# então uma reinicialização volta a consultar de imediato
+_lookup_failures = {}
+_lookup_failures_lock = threading.Lock()
 
 def get_connections(alias: str = None, id: str = None) -> List[dict] | str:
     try:
@@ -26,4 +40,100 @@ def get_did_document(did: str) -> dict | str:
         return result
     except Exception as e:
         print(e)
-        return "DID_DOCUMENT_RETRIEVAL_FAILED"
\ No newline at end of file
+        return "DID_DOCUMENT_RETRIEVAL_FAILED"
+
+def record_connection(connection: dict, user_did: str = None) -> UserConnection | None:
+    """Grava/atualiza o mapeamento da conexão para o usuário dono do DID efêmero"""
+    connection_id = connection.get("connection_id")
+    if not connection_id:
+        return None
+
+    if not user_did and connection.get("my_did"):
+        existing = UserConnection.find_by_connection_id(connection_id)
+        user_did = existing.user_did if existing and existing.user_did else User.find_user_did_by_ephemeral_did(connection.get("my_did"))
+
+    user_connection = UserConnection(
+        connection_id=connection_id,
+        user_did=user_did,
+        my_did=connection.get("my_did"),
+        their_did=connection.get("their_did"),
+        their_public_did=connection.get("their_public_did"),
+        their_label=connection.get("their_label"),
+        state=connection.get("state")
+    )
+    user_connection.save()
+
+    return user_connection
+
+def sync_user_connections() -> dict | str:
+    """
+    Preenche o mapeamento local com as conexões já existentes na wallet,
+    associando cada uma ao usuário dono do DID efêmero.
+    """
+    try:
+        page_size = settings.wallet_sync_page_size
+        total = mapped = 0
+        offset = 0
+        while True:
+            page = AcaPyClient.connection.get_connections(limit=page_size, offset=offset)
+            if page is None:
+                return "CONNECTION_SYNC_FAILED"
+            if not isinstance(page, list):
+                page = [page] if page else []
+
+            for connection in page:
+                user_connection = record_connection(connection)
+                if user_connection and user_connection.user_did:
+                    mapped += 1
+            total += len(page)
+
+            if len(page) < page_size:
+                return {"total": total, "mapped": mapped}
+            offset += page_size
+
+    except Exception as e:
+        print(f"Erro ao sincronizar as conexões: {str(e)}")
+        return "CONNECTION_SYNC_FAILED"
+
+def _lookup_connection(connection_id: str) -> dict | None:
+    """Consulta a conexão no ACA-Py, respeitando o intervalo após falhas"""
+    now = datetime.utcnow()
+    with _lookup_failures_lock:
+        failures, retry_at = _lookup_failures.get(connection_id, (0, now))
+    if now < retry_at:
+        return None
+
+    connection = AcaPyClient.connection.get_connections(id=connection_id)
+
+    with _lookup_failures_lock:
+        if connection and connection.get("my_did"):
+            _lookup_failures.pop(connection_id, None)
+        else:
+            delay = min(CONNECTION_LOOKUP_BACKOFF * (2 ** failures), CONNECTION_LOOKUP_MAX_BACKOFF)
+            _lookup_failures[connection_id] = (failures + 1, now + delay)
+
+    return connection
+
+def get_user_connection(connection_id: str) -> UserConnection | None:
+    """Mapeamento da conexão; consulta o ACA-Py enquanto ela não tiver o DID efêmero"""
+    if not connection_id:
+        return None
+
+    connection = UserConnection.find_by_connection_id(connection_id)
+    if connection is None or not connection.my_did:
+        # Conexão ainda não vista (ex.: webhook de connections perdido) ou gravada sem
+        # o DID efêmero. Falha na consulta não é gravada: tenta de novo após o intervalo
+        found = _lookup_connection(connection_id)
+        if found:
+            connection = record_connection(found)
+    elif not connection.user_did:
+        # O DID efêmero pode ter sido associado depois; resolve só no banco local
+        connection.user_did = User.find_user_did_by_ephemeral_did(connection.my_did)
+        if connection.user_did:
+            connection.save()
+
+    return connection
+
+def resolve_user_did(connection_id: str) -> str | None:
+    connection = get_user_connection(connection_id)
+    return connection.user_did if connection else None
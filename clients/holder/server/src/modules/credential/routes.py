@@ -1,17 +1,38 @@
-from fastapi import APIRouter, Request
+from typing import Optional
+from fastapi import APIRouter, Request, Query
 from fastapi.responses import JSONResponse
 from modules.utils.model import SuccessResponse, ErrorResponse
-from modules.credential.service import get_holder_credentials, get_offers, accept_offer
+from modules.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from modules.credential.service import get_holder_credentials, get_offers, count_offers, accept_offer, sync_credential_index
 
 router = APIRouter(prefix="/credential", tags=["credential"])
 
 @router.get("/offers", response_model=SuccessResponse)
-def list_credential_offers():
-    offers = get_offers()
+def list_credential_offers(
+    did: str,
+    state: Optional[str] = None,
+    connection_id: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    try:
+        offers = get_offers(did, state=state, connection_id=connection_id, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        return JSONResponse(
+            status_code=400,
+            content=ErrorResponse(code="INVALID_CURSOR", data=str(e)).model_dump()
+        )
     
     return JSONResponse(
         status_code=200,
-        content=SuccessResponse(data=offers or []).model_dump()
+        content=SuccessResponse(data=offers).model_dump()
+    )
+
+@router.get("/offers/count", response_model=SuccessResponse)
+def count_credential_offers(did: str, state: Optional[str] = "offer-received", connection_id: Optional[str] = None):
+    return JSONResponse(
+        status_code=200,
+        content=SuccessResponse(data={"count": count_offers(did, state=state, connection_id=connection_id)}).model_dump()
     )
 
 @router.get("/my-credentials", response_model=SuccessResponse)
@@ -32,6 +53,24 @@ def list_holder_credentials(did: str):
         content=SuccessResponse(data=credentials).model_dump()
     )
 
+@router.post("/sync", response_model=SuccessResponse)
+def sync_holder_credentials():
+    result = sync_credential_index()
+
+    if isinstance(result, str):
+        return JSONResponse(
+            status_code=502,
+            content=ErrorResponse(
+                code=result,
+                data="Falha ao sincronizar o índice de credenciais"
+            ).model_dump()
+        )
+
+    return JSONResponse(
+        status_code=200,
+        content=SuccessResponse(data=result).model_dump()
+    )
+
 @router.post("/accept-offer", response_model=SuccessResponse)
 async def accept_credential_offer(request: Request):
     body = await request.json()
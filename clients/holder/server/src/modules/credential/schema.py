@@ -1,5 +1,9 @@
+import json
+import sqlite3
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional
+from modules.config.settings import settings
 
 class HolderCredentialRecord(BaseModel):
     credential_exchange_id: str = Field(..., description="ID da troca de credencial")
@@ -15,3 +19,168 @@ class HolderCredentialRecord(BaseModel):
     attributes: Optional[Dict[str, Any]] = Field(None, description="Atributos da credencial")
     version: Optional[str] = Field(None, description="Versão do schema")
     is_valid: bool = Field(default=True, description="Se a credencial é válida")
+
+class StoredCredential:
+    """Índice local das credenciais armazenadas na wallet do holder"""
+    
+    def __init__(self, referent=None, user_did=None, connection_id=None, schema_id=None,
+                 cred_def_id=None, issuer_did=None, issuer_name=None, attrs=None,
+                 created_at=None, updated_at=None):
+        self.referent = referent
+        self.user_did = user_did
+        self.connection_id = connection_id
+        self.schema_id = schema_id
+        self.cred_def_id = cred_def_id
+        self.issuer_did = issuer_did or (schema_id.split(":")[0] if schema_id else None)
+        self.issuer_name = issuer_name
+        self.attrs = attrs or {}
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+    
+    @staticmethod
+    def _get_db_connection():
+        """Get database connection"""
+        db_path = settings.database_url.replace('sqlite:///', '')
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @staticmethod
+    def init_db():
+        """Initialize database tables"""
+        conn = StoredCredential._get_db_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS stored_credentials (
+                referent TEXT PRIMARY KEY,
+                user_did TEXT,
+                connection_id TEXT,
+                schema_id TEXT,
+                cred_def_id TEXT,
+                issuer_did TEXT,
+                issuer_name TEXT,
+                attrs TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_stored_credentials_user_did_created_at ON stored_credentials(user_did, created_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_stored_credentials_schema_id ON stored_credentials(schema_id)')
+        conn.commit()
+        conn.close()
+    
+    def __repr__(self):
+        return f'<StoredCredential {self.referent}>'
+    
+    def to_dict(self):
+        """Formato retornado em /credential/my-credentials"""
+        return {
+            'issuer_did': self.issuer_did,
+            'issuer_name': self.issuer_name,
+            'schema_id': self.schema_id,
+            'cred_def_id': self.cred_def_id,
+            'attrs': self.attrs,
+        }
+    
+    @classmethod
+    def find_by_referent(cls, referent):
+        conn = cls._get_db_connection()
+        row = conn.execute('SELECT * FROM stored_credentials WHERE referent = ?', (referent,)).fetchone()
+        conn.close()
+        
+        if row:
+            return cls._from_row(row)
+        return None
+    
+    @classmethod
+    def find_by_user_did(cls, user_did):
+        """Credenciais do usuário, das mais recentes para as mais antigas"""
+        conn = cls._get_db_connection()
+        rows = conn.execute('SELECT * FROM stored_credentials WHERE user_did = ? ORDER BY created_at DESC', 
+                          (user_did,)).fetchall()
+        conn.close()
+        
+        return [cls._from_row(row) for row in rows]
+    
+    @classmethod
+    def get_referents(cls):
+        conn = cls._get_db_connection()
+        rows = conn.execute('SELECT referent FROM stored_credentials').fetchall()
+        conn.close()
+        
+        return {row['referent'] for row in rows}
+    
+    @classmethod
+    def find_unowned(cls):
+        """Credenciais indexadas cujo dono ainda não foi resolvido"""
+        conn = cls._get_db_connection()
+        rows = conn.execute('SELECT * FROM stored_credentials WHERE user_did IS NULL').fetchall()
+        conn.close()
+        
+        return [cls._from_row(row) for row in rows]
+    
+    @classmethod
+    def delete_many(cls, referents):
+        """Remove do índice credenciais que não estão mais na wallet"""
+        if not referents:
+            return 0
+        conn = cls._get_db_connection()
+        try:
+            placeholders = ",".join("?" for _ in referents)
+            cursor = conn.execute(f'DELETE FROM stored_credentials WHERE referent IN ({placeholders})', list(referents))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+    
+    @classmethod
+    def _from_row(cls, row):
+        created_at = datetime.fromisoformat(row['created_at']) if row['created_at'] else datetime.utcnow()
+        updated_at = datetime.fromisoformat(row['updated_at']) if row['updated_at'] else datetime.utcnow()
+        
+        return cls(
+            referent=row['referent'],
+            user_did=row['user_did'],
+            connection_id=row['connection_id'],
+            schema_id=row['schema_id'],
+            cred_def_id=row['cred_def_id'],
+            issuer_did=row['issuer_did'],
+            issuer_name=row['issuer_name'],
+            attrs=json.loads(row['attrs']) if row['attrs'] else {},
+            created_at=created_at,
+            updated_at=updated_at
+        )
+    
+    def save(self):
+        """Insere ou atualiza a credencial no índice"""
+        conn = self._get_db_connection()
+        try:
+            self.updated_at = datetime.utcnow()
+            created_at_str = self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at
+            
+            conn.execute('''
+                INSERT INTO stored_credentials 
+                (referent, user_did, connection_id, schema_id, cred_def_id, 
+                 issuer_did, issuer_name, attrs, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(referent) DO UPDATE SET
+                    user_did = COALESCE(excluded.user_did, user_did),
+                    connection_id = COALESCE(excluded.connection_id, connection_id),
+                    schema_id = excluded.schema_id,
+                    cred_def_id = excluded.cred_def_id,
+                    issuer_did = excluded.issuer_did,
+                    issuer_name = COALESCE(excluded.issuer_name, issuer_name),
+                    attrs = excluded.attrs,
+                    updated_at = excluded.updated_at
+            ''', (
+                self.referent, self.user_did, self.connection_id, self.schema_id,
+                self.cred_def_id, self.issuer_did, self.issuer_name, json.dumps(self.attrs),
+                created_at_str, self.updated_at.isoformat()
+            ))
+            
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
@@ -1,12 +1,29 @@
+from datetime import datetime
 from typing import List
-from modules.credential.schema import HolderCredentialRecord
+from modules.credential.schema import StoredCredential
+from modules.webhook.schema import CredentialOffer
+from modules.utils.model import CursorPage
+from modules.utils.pagination import DEFAULT_PAGE_SIZE
 from modules.client.service import AcaPyClient
-from modules.user.schema import User
+from modules.config.settings import settings
+from modules.connection.schema import UserConnection
+from modules.connection.service import get_user_connection
+from modules.utils.watermark import SyncWatermark
 
-def get_offers() -> List[dict]:
-    offers = AcaPyClient.issue.get_offers()
+# Marca gravada quando as credenciais anteriores ao índice já tiveram o dono atribuído
+CREDENTIAL_OWNER_MIGRATION = "credential_owner_migration"
 
-    return offers
+def get_offers(did: str, state: str = None, connection_id: str = None, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None) -> dict:
+    """Lista as ofertas do usuário a partir da tabela local (mantida pelos webhooks)"""
+    offers, next_cursor = CredentialOffer.find_page(user_did=did, state=state, connection_id=connection_id, limit=limit, cursor=cursor)
+
+    return CursorPage(
+        items=[offer.to_dict() for offer in offers],
+        next_cursor=next_cursor
+    ).model_dump()
+
+def count_offers(did: str, state: str = None, connection_id: str = None) -> int:
+    return CredentialOffer.count(user_did=did, state=state, connection_id=connection_id)
 
 def accept_offer(cred_ex_id: str) -> dict | str:
     try:
@@ -16,52 +33,156 @@ def accept_offer(cred_ex_id: str) -> dict | str:
         print(f"Erro ao aceitar a oferta de credencial: {str(e)}")
         return "OFFER_ACCEPTANCE_FAILED"
 
-def get_holder_credentials(did: str) -> List[HolderCredentialRecord] | str:
+def index_stored_credential(referent: str, connection_id: str = None) -> StoredCredential | None:
+    """Grava no índice local a credencial recém-armazenada na wallet"""
+    credential = AcaPyClient.issue.get_credential(referent)
+    if not credential:
+        return None
+
+    user_did = None
+    issuer_name = None
+    connection = get_user_connection(connection_id)
+    if connection:
+        user_did = connection.user_did
+        issuer_name = connection.their_label
+
+    stored = StoredCredential(
+        referent=referent,
+        user_did=user_did,
+        connection_id=connection_id,
+        schema_id=credential.get("schema_id"),
+        cred_def_id=credential.get("cred_def_id"),
+        issuer_name=issuer_name,
+        attrs=credential.get("attrs")
+    )
+    stored.save()
+
+    return stored
+
+def _list_wallet_credentials() -> dict | None:
+    """Todas as credenciais da wallet; o ACA-Py devolve só 10 por chamada se não paginar"""
+    page_size = settings.wallet_sync_page_size
+    wallet = {}
+    start = 0
+    while True:
+        page = AcaPyClient.issue.get_stored_credentials(start=start, count=page_size)
+        if page is None:
+            return None
+        if not isinstance(page, list):
+            page = [page] if page else []
+
+        for cred in page:
+            if cred.get("referent"):
+                wallet[cred.get("referent")] = cred
+
+        # Página incompleta: chegou ao fim da wallet
+        if len(page) < page_size:
+            return wallet
+        start += page_size
+
+def sync_credential_index() -> dict | str:
+    """
+    Reconcilia o índice local com a wallet: remove credenciais que não
+    existem mais, indexa as que chegaram sem passar pelo webhook e tenta
+    de novo resolver o dono das que foram indexadas sem ele.
+    """
     try:
-        user_dids = User.get_ephemeral_dids_by_user_did(did)
-        if not user_dids:
-            return []
-
-        credentials = AcaPyClient.issue.get_stored_credentials()
-        if not credentials:
-            return []
-        if not isinstance(credentials, list):
-            credentials = [credentials]
-        connections = AcaPyClient.connection.get_connections()
-        if not isinstance(connections, list):
-            connections = [connections]
+        wallet = _list_wallet_credentials()
+        if wallet is None:
+            return "CREDENTIAL_SYNC_FAILED"
+
+        indexed = StoredCredential.get_referents()
+
+        # Só remove depois de percorrer a wallet inteira
+        removed = StoredCredential.delete_many(indexed - set(wallet))
+
+        missing = [wallet[referent] for referent in wallet if referent not in indexed]
+        unowned = [cred for cred in StoredCredential.find_unowned() if cred.referent in wallet]
+
+        resolved = 0
+        for cred in unowned:
+            connection = get_user_connection(cred.connection_id)
+            if connection and connection.user_did:
+                cred.user_did = connection.user_did
+                cred.issuer_name = connection.their_label
+                cred.save()
+                resolved += 1
+
+        # Sem o webhook não há como saber a conexão de origem (o registro da troca
+        # é removido ao armazenar), então o dono fica em aberto em vez de chutado
+        for cred in missing:
+            StoredCredential(
+                referent=cred.get("referent"),
+                schema_id=cred.get("schema_id"),
+                cred_def_id=cred.get("cred_def_id"),
+                attrs=cred.get("attrs")
+            ).save()
+
+        return {"indexed": len(missing), "resolved": resolved, "removed": removed, "total": len(wallet)}
 
+    except Exception as e:
+        print(f"Erro ao sincronizar o índice de credenciais: {str(e)}")
+        return "CREDENTIAL_SYNC_FAILED"
+
+def get_holder_credentials(did: str) -> List[dict] | str:
+    try:
+        # Uma credencial por schema, a mais recente
         credentials_map = {}
-        for cred in credentials:
-            schema = cred.get("schema_id")
-
-            if schema not in credentials_map:
-                credentials_map[schema] = cred
-        
-        connections_map = {}
-        for conn in connections:
-            their_public_did = conn.get("their_public_did")
-            my_did = conn.get("my_did")
-
-            if my_did in [ud['ephemeral_did'] for ud in user_dids]:
-                connections_map[their_public_did] = conn
-
-        credentials_result = []
-        for schema, cred in credentials_map.items():
-            issuer_did = schema.split(":")[0]
-            conn = connections_map.get(issuer_did)
-
-
-            credentials_result.append({
-                "issuer_did": issuer_did,
-                "issuer_name": conn.get("their_label"),
-                "schema_id": cred.get("schema_id"),
-                "cred_def_id": cred.get("cred_def_id"),
-                "attrs": cred.get("attrs"),
-            })
-
-        return credentials_result
+        for cred in StoredCredential.find_by_user_did(did):
+            if cred.schema_id not in credentials_map:
+                credentials_map[cred.schema_id] = cred.to_dict()
+
+        return list(credentials_map.values())
     
     except Exception as e:
         print(f"Erro ao buscar credenciais do holder: {str(e)}")
         return "CREDENTIAL_RETRIEVAL_FAILED"
+
+def migrate_credential_owners() -> dict | str:
+    """
+    Migração única das credenciais que já estavam na wallet antes do índice
+    local: atribui o dono pela regra antiga (conexão do usuário cujo DID
+    público é o emissor do schema), só quando exatamente um usuário casa.
+    """
+    if SyncWatermark.get(CREDENTIAL_OWNER_MIGRATION):
+        return {"assigned": 0, "ambiguous": 0}
+
+    try:
+        # Com connection_id o dono vem da própria conexão na sincronização do índice
+        pending = [cred for cred in StoredCredential.find_unowned() if not cred.connection_id]
+
+        owners_by_issuer = {}
+        assigned = ambiguous = 0
+        for cred in pending:
+            issuer_did = (cred.schema_id or "").split(":")[0]
+            if not issuer_did:
+                continue
+            if issuer_did not in owners_by_issuer:
+                owners = {}
+                # Mais recente primeiro: fica a última conexão de cada usuário com o emissor
+                for connection in UserConnection.find_mapped_by_public_did(issuer_did):
+                    owners.setdefault(connection.user_did, connection)
+                owners_by_issuer[issuer_did] = owners
+
+            owners = owners_by_issuer[issuer_did]
+            if len(owners) != 1:
+                # Nenhum ou mais de um usuário conectado ao emissor: o dono fica em aberto
+                if owners:
+                    ambiguous += 1
+                continue
+
+            connection = next(iter(owners.values()))
+            cred.user_did = connection.user_did
+            cred.connection_id = connection.connection_id
+            cred.issuer_did = cred.issuer_did or issuer_did
+            cred.issuer_name = connection.their_label
+            cred.save()
+            assigned += 1
+
+        SyncWatermark.set(CREDENTIAL_OWNER_MIGRATION, datetime.utcnow().isoformat())
+
+        return {"assigned": assigned, "ambiguous": ambiguous}
+
+    except Exception as e:
+        print(f"Erro ao migrar o dono das credenciais: {str(e)}")
+        return "CREDENTIAL_OWNER_MIGRATION_FAILED"
@@ -1,5 +1,6 @@
 from modules.client.service import AcaPyClient
 from modules.user.schema import User
+from modules.connection.service import record_connection
 
 def create_did(alias: str = None) -> dict | str:
     try:
@@ -23,6 +24,7 @@ def receive(alias: str, invitation_url: dict, user_did: str) -> dict | str:
         my_did = conn.get("my_did")
 
         User.add_ephemeral_did(user_did, my_did)
+        record_connection(conn, user_did)
     except Exception as e:
         print(e)
         return "INVITATION_RECEIVE_FAILED"
@@ -0,0 +1,48 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+
+
+class NotificationBroker:
+    """
+    Avisa os streams SSE abertos de que há notificações novas na tabela.
+    
+    O aviso não carrega a notificação: cada stream lê a tabela a partir do
+    último id enviado, o mesmo caminho usado na retomada por Last-Event-ID.
+    """
+    
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+    
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+    
+    def notify(self):
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._wake)
+    
+    def _wake(self):
+        for queue in list(self._subscribers):
+            if not queue.full():
+                queue.put_nowait(True)
+
+
+def format_sse(seq: int, event: str, data: Dict[str, Any]) -> str:
+    return (
+        f"id: {seq}\n"
+        f"event: {event}\n"
+        f"data: {json.dumps(data)}\n\n"
+    )
+
+
+notification_events = NotificationBroker()
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Body
-from fastapi.responses import JSONResponse
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Body, Request, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from modules.utils.model import SuccessResponse, ErrorResponse
+from modules.notification.events import notification_events, format_sse
+from modules.config.settings import settings
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/notifications", tags=["notification"])
@@ -8,18 +13,19 @@ router = APIRouter(prefix="/notifications", tags=["notification"])
 class UpdateReadStatusRequest(BaseModel):
     read: bool
 
+class MarkReadRequest(BaseModel):
+    did: str
+    ids: Optional[List[str]] = None
+    connection_id: Optional[str] = None
+    tipo: Optional[str] = None
+    all: bool = False
+
 @router.get("", response_model=SuccessResponse)
-def list_notifications(tipo: str = None, connection_id: str = None):
+def list_notifications(did: str, tipo: str = None, connection_id: str = None):
     from modules.webhook.schema import Notification
     
     try:
-        if connection_id:
-            notifications = Notification.find_by_connection_id(connection_id)
-        else:
-            notifications = Notification.find_all()
-        
-        if tipo:
-            notifications = [n for n in notifications if n.tipo == tipo]
+        notifications = Notification.find_by_user_did(did, connection_id=connection_id, tipo=tipo)
         
         notifications_data = [n.to_dict() for n in notifications]
         
@@ -31,6 +37,88 @@ def list_notifications(tipo: str = None, connection_id: str = None):
             content=ErrorResponse(code="internal_error", data=f"Failed to retrieve notifications: {str(e)}").model_dump()
         )
 
+@router.get("/unread-count", response_model=SuccessResponse)
+def get_unread_count(did: str, connection_id: str = None, tipo: str = None):
+    from modules.webhook.schema import Notification
+    
+    try:
+        counters = Notification.unread_counts(did, connection_id=connection_id, tipo=tipo)
+        
+        return JSONResponse(
+            status_code=200,
+            content=SuccessResponse(data={
+                "total": sum(counter["unread"] for counter in counters),
+                "counters": counters
+            }).model_dump()
+        )
+    
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content=ErrorResponse(code="internal_error", data=f"Failed to retrieve unread count: {str(e)}").model_dump()
+        )
+
+@router.post("/read", response_model=SuccessResponse)
+def mark_notifications_read(request: MarkReadRequest = Body(...)):
+    from modules.webhook.schema import Notification
+    
+    if not (request.ids or request.connection_id or request.tipo or request.all):
+        return JSONResponse(
+            status_code=400,
+            content=ErrorResponse(code="invalid_request", data="ids, connection_id, tipo or all is required").model_dump()
+        )
+    
+    try:
+        updated = Notification.mark_read(request.did, ids=request.ids, connection_id=request.connection_id, tipo=request.tipo)
+        
+        return JSONResponse(status_code=200, content=SuccessResponse(data={"updated": updated}).model_dump())
+    
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content=ErrorResponse(code="internal_error", data=f"Failed to update notifications: {str(e)}").model_dump()
+        )
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    did: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events com as notificações novas. O id de cada evento é a
+    posição da notificação na tabela: com Last-Event-ID o stream retoma
+    entregando o que foi gravado durante a desconexão.
+    """
+    from modules.webhook.schema import Notification
+    
+    queue = notification_events.subscribe()
+    
+    async def events():
+        try:
+            last_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else await run_in_threadpool(Notification.last_seq)
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                pending = await run_in_threadpool(Notification.find_since, last_seq, did)
+                for seq, notification in pending:
+                    last_seq = seq
+                    yield format_sse(seq, notification.tipo, notification.to_dict())
+                if pending:
+                    continue
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=settings.notification_stream_keepalive)
+                except asyncio.TimeoutError:
+                    # Mantém a conexão viva através de proxies
+                    yield ": keepalive\n\n"
+        finally:
+            notification_events.unsubscribe(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.patch("/{notification_id}/read", response_model=SuccessResponse)
 def update_notification_read_status(notification_id: str, request: UpdateReadStatusRequest = Body(...)):
     from modules.webhook.schema import Notification
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Request
+from typing import Optional
+from fastapi import APIRouter, Request, Query
 from fastapi.responses import JSONResponse
 from modules.utils.model import SuccessResponse, ErrorResponse
+from modules.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
 from modules.proof.service import (
     get_proof_requests, 
     get_proof_request_by_id, 
@@ -11,12 +13,23 @@ from modules.proof.service import (
 router = APIRouter(prefix="/proof", tags=["proof"])
 
 @router.get("/requests", response_model=SuccessResponse)
-def list_proof_requests():
-    proof_requests = get_proof_requests()
+def list_proof_requests(
+    did: str,
+    state: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    try:
+        proof_requests = get_proof_requests(did, state=state, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        return JSONResponse(
+            status_code=400,
+            content=ErrorResponse(code="INVALID_CURSOR", data=str(e)).model_dump()
+        )
     
     return JSONResponse(
         status_code=200,
-        content=SuccessResponse(data=proof_requests or []).model_dump()
+        content=SuccessResponse(data=proof_requests).model_dump()
     )
 
 @router.get("/requests/{pres_ex_id}", response_model=SuccessResponse)
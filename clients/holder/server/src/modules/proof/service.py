@@ -1,42 +1,157 @@
+import asyncio
 from typing import List
 from modules.webhook.schema import PresentProofRequest
 from modules.client.service import AcaPyClient
+from modules.connection.schema import UserConnection
+from modules.utils.model import CursorPage
+from modules.utils.pagination import DEFAULT_PAGE_SIZE
+from modules.utils.watermark import SyncWatermark
+from modules.utils.lease import FileLease
+from modules.config.settings import settings
 
-def get_proof_requests() -> List[dict]:
+# Registros buscados por chamada ao ACA-Py durante a sincronização
+PROOF_SYNC_PAGE_SIZE = 100
+PROOF_SYNC_WATERMARK = "present_proof_requests"
+# Único estado que exige ação do usuário; os demais chegam pelos webhooks e pela reconciliação
+PROOF_SYNC_PENDING_STATE = "request-received"
+
+def get_proof_requests(did: str, state: str = None, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None) -> dict:
+    """Lista os pedidos de prova do usuário a partir da tabela local (mantida pelos webhooks)"""
+    proof_requests, next_cursor = PresentProofRequest.find_page(user_did=did, state=state, limit=limit, cursor=cursor)
+
+    return CursorPage(
+        items=[proof_request.to_dict() for proof_request in proof_requests],
+        next_cursor=next_cursor
+    ).model_dump()
+
+def _proof_request_from_record(record: dict) -> PresentProofRequest:
+    by_format = record.get("by_format", {})
+    pres_request = by_format.get("pres_request", {})
+    indy_request = pres_request.get("indy", {}) if isinstance(pres_request, dict) else {}
+
+    proof_request = PresentProofRequest.find_by_pres_ex_id(record.get("pres_ex_id")) or PresentProofRequest(
+        pres_ex_id=record.get("pres_ex_id"),
+        created_at=record.get("created_at")
+    )
+    proof_request.state = record.get("state")
+    proof_request.name = indy_request.get("name") or proof_request.name
+    proof_request.version = indy_request.get("version") or proof_request.version
+    proof_request.requested_attributes = indy_request.get("requested_attributes") or proof_request.requested_attributes
+    proof_request.requested_predicates = indy_request.get("requested_predicates") or proof_request.requested_predicates
+    proof_request.error_msg = record.get("error_msg")
+    if not proof_request.user_did:
+        connection = UserConnection.find_by_connection_id(record.get("connection_id"))
+        proof_request.user_did = connection.user_did if connection else None
+
+    return proof_request
+
+def sync_pending_proof_requests() -> dict | str:
+    """
+    Sincronização leve com o ACA-Py: busca só os pedidos aguardando resposta
+    e grava os que os webhooks não trouxeram.
+    """
     try:
-        response = AcaPyClient.verify.get_proof_records(
-            descending=False,
-            limit=100,
-            offset=0,
-            order_by="id"
-        )
-        
-        if not response or "results" not in response:
-            return []
-        
-        proof_requests = []
-        for record in response["results"]:
-            by_format = record.get("by_format", {})
-            pres_request = by_format.get("pres_request", {})
-            indy_request = pres_request.get("indy", {}) if isinstance(pres_request, dict) else {}
-            
-            proof_request = {
-                "pres_ex_id": record.get("pres_ex_id"),
-                "state": record.get("state"),
-                "name": indy_request.get("name"),
-                "version": indy_request.get("version"),
-                "requested_attributes": indy_request.get("requested_attributes", {}),
-                "requested_predicates": indy_request.get("requested_predicates", {}),
-                "created_at": record.get("created_at"),
-                "updated_at": record.get("updated_at"),
-                "error_msg": record.get("error_msg")
-            }
-            proof_requests.append(proof_request)
-        
-        return proof_requests
+        synced = 0
+        offset = 0
+
+        while True:
+            response = AcaPyClient.verify.get_proof_records(
+                limit=PROOF_SYNC_PAGE_SIZE,
+                offset=offset,
+                state=PROOF_SYNC_PENDING_STATE
+            )
+            if response is None:
+                return "PROOF_SYNC_FAILED"
+
+            records = response.get("results", [])
+            for record in records:
+                existing = PresentProofRequest.find_by_pres_ex_id(record.get("pres_ex_id"))
+                if existing and existing.state == record.get("state"):
+                    continue
+                _proof_request_from_record(record).save()
+                synced += 1
+
+            if len(records) < PROOF_SYNC_PAGE_SIZE:
+                break
+            offset += PROOF_SYNC_PAGE_SIZE
+
+        return {"synced": synced}
     except Exception as e:
-        print(f"Erro ao buscar proof requests: {str(e)}")
-        return []
+        print(f"Erro ao sincronizar proof requests pendentes: {str(e)}")
+        return "PROOF_SYNC_FAILED"
+
+def sync_proof_requests() -> dict | str:
+    """
+    Reconciliação completa com o ACA-Py: grava os registros alterados
+    depois da última marca d'água (updated_at) que os webhooks não trouxeram.
+    """
+    try:
+        watermark = SyncWatermark.get(PROOF_SYNC_WATERMARK) or ""
+        latest = watermark
+        unowned = PresentProofRequest.find_unowned_pres_ex_ids()
+        synced = 0
+        offset = 0
+
+        while True:
+            response = AcaPyClient.verify.get_proof_records(
+                descending=False,
+                limit=PROOF_SYNC_PAGE_SIZE,
+                offset=offset,
+                order_by="id"
+            )
+            if response is None:
+                return "PROOF_SYNC_FAILED"
+
+            records = response.get("results", [])
+            for record in records:
+                updated_at = record.get("updated_at") or ""
+                seen = updated_at <= watermark
+                if seen and record.get("pres_ex_id") not in unowned:
+                    continue
+                proof_request = _proof_request_from_record(record)
+                # Já sincronizado: só regrava se o dono foi resolvido agora
+                if seen and not proof_request.user_did:
+                    continue
+                proof_request.save()
+                synced += 1
+                if not seen:
+                    latest = max(latest, updated_at)
+
+            if len(records) < PROOF_SYNC_PAGE_SIZE:
+                break
+            offset += PROOF_SYNC_PAGE_SIZE
+
+        if latest != watermark:
+            SyncWatermark.set(PROOF_SYNC_WATERMARK, latest)
+
+        return {"synced": synced, "watermark": latest or None}
+    except Exception as e:
+        print(f"Erro ao sincronizar proof requests: {str(e)}")
+        return "PROOF_SYNC_FAILED"
+
+async def run_proof_sync(interval: int, reconcile_interval: int):
+    """
+    Loop de background que mantém a tabela local alinhada com o ACA-Py.
+    
+    A cada intervalo busca só os pedidos pendentes; a varredura completa roda
+    ao assumir o lock e depois a cada reconcile_interval. Com vários workers,
+    apenas quem detém o lock sincroniza.
+    """
+    loop = asyncio.get_running_loop()
+    lease = FileLease(settings.proof_sync_lock)
+    last_reconcile = None
+    try:
+        while True:
+            if lease.try_acquire():
+                if last_reconcile is None or loop.time() - last_reconcile >= reconcile_interval:
+                    await loop.run_in_executor(None, sync_proof_requests)
+                    last_reconcile = loop.time()
+                else:
+                    await loop.run_in_executor(None, sync_pending_proof_requests)
+            await asyncio.sleep(interval)
+    finally:
+        # Libera o lock para que outro worker assuma
+        lease.release()
 
 def get_proof_request_by_id(pres_ex_id: str) -> dict | None:
     try:
@@ -2,11 +2,9 @@ import uuid
 import sqlite3
 import os
 from datetime import datetime
-from passlib.context import CryptContext
 from modules.config.settings import settings
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from modules.utils.password import hash_password, verify_password
+from modules.user.cache import user_cache
 
 class User:
     def __init__(self, email=None, password=None, first_name=None, last_name=None, 
@@ -73,11 +71,11 @@ class User:
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = pwd_context.hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Check if provided password matches hash"""
-        return pwd_context.verify(password, self.password_hash)
+        return verify_password(password, self.password_hash)
     
     def to_dict(self):
         """Convert user object to dictionary"""
@@ -182,6 +180,7 @@ class User:
                 ))
             
             conn.commit()
+            user_cache.invalidate(self.id)
             return True
         except Exception as e:
             conn.rollback()
@@ -220,3 +219,14 @@ class User:
             return [dict(ephemeral_did=row['ephemeral_did'], created_at=row['created_at']) for row in rows]
         finally:
             conn.close()
+    
+    @staticmethod
+    def find_user_did_by_ephemeral_did(ephemeral_did):
+        conn = User._get_db_connection()
+        try:
+            row = conn.execute('''
+                SELECT user_did FROM user_ephemeral_dids WHERE ephemeral_did = ?
+            ''', (ephemeral_did,)).fetchone()
+            return row['user_did'] if row else None
+        finally:
+            conn.close()
@@ -0,0 +1,49 @@
+import os
+import fcntl
+import logging
+from typing import Optional
+
+
+class FileLease:
+    """
+    Eleição de líder entre workers da mesma máquina via lock exclusivo de arquivo.
+    
+    O lock é mantido enquanto o processo líder estiver vivo; se ele cair, o
+    sistema operacional libera o lock e outro worker assume na próxima tentativa.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+    
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+    
+    def try_acquire(self) -> bool:
+        """Tenta adquirir o lock sem bloquear. Retorna True se este worker é o líder."""
+        if self._fd is not None:
+            return True
+        
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        
+        # Registra o PID do líder para diagnóstico
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logging.info(f"Worker {os.getpid()} assumiu as tarefas periódicas ({self.path})")
+        return True
+    
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
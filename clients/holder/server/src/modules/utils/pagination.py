@@ -0,0 +1,38 @@
+import base64
+import json
+from typing import Optional, Tuple
+
+# Tamanho padrão e máximo das páginas das listagens
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: str, id: str) -> str:
+    """Gera um cursor opaco a partir do último registro da página"""
+    payload = {"c": created_at, "i": id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Converte o cursor em (created_at, id) do último registro visto.
+    Levanta InvalidCursorError se o cursor for inválido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(payload["c"]), str(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Cursor de paginação inválido")
+
+
+def keyset_clause(cursor: Optional[str]) -> Tuple[str, tuple]:
+    """Condição SQL para ordenação (created_at DESC, id DESC) a partir do cursor"""
+    if not cursor:
+        return "", ()
+    created_at, id = decode_cursor(cursor)
+    return "(created_at < ? OR (created_at = ? AND id < ?))", (created_at, created_at, id)
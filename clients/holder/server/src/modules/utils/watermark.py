@@ -0,0 +1,49 @@
+import sqlite3
+from datetime import datetime
+from modules.config.settings import settings
+
+
+class SyncWatermark:
+    """Marca d'água das sincronizações incrementais com o ACA-Py"""
+    
+    @staticmethod
+    def _get_db_connection():
+        """Get database connection"""
+        db_path = settings.database_url.replace('sqlite:///', '')
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @staticmethod
+    def init_db():
+        """Initialize database tables"""
+        conn = SyncWatermark._get_db_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_watermarks (
+                name TEXT PRIMARY KEY,
+                value TEXT,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+    
+    @classmethod
+    def get(cls, name):
+        conn = cls._get_db_connection()
+        row = conn.execute('SELECT value FROM sync_watermarks WHERE name = ?', (name,)).fetchone()
+        conn.close()
+        
+        return row['value'] if row else None
+    
+    @classmethod
+    def set(cls, name, value):
+        conn = cls._get_db_connection()
+        try:
+            conn.execute('''
+                INSERT INTO sync_watermarks (name, value, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            ''', (name, value, datetime.utcnow().isoformat()))
+            conn.commit()
+        finally:
+            conn.close()
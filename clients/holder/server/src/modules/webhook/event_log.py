@@ -0,0 +1,113 @@
+import json
+import sqlite3
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from modules.config.settings import settings
+from modules.webhook.dedup import WebhookDeduplicator
+
+# Verdadeiro enquanto o log está sendo reproduzido: os handlers pulam
+# efeitos externos (chamadas ao ACA-Py, notificações)
+_replaying: ContextVar[bool] = ContextVar("webhook_replaying", default=False)
+
+
+def is_replaying() -> bool:
+    return _replaying.get()
+
+
+@contextmanager
+def replaying():
+    token = _replaying.set(True)
+    try:
+        yield
+    finally:
+        _replaying.reset(token)
+
+
+class WebhookEventLog:
+    """Log append-only das entregas de webhook, com payload comprimido (zlib)"""
+    
+    @staticmethod
+    def _get_db_connection():
+        """Get database connection"""
+        db_path = settings.database_url.replace('sqlite:///', '')
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @staticmethod
+    def init_db():
+        """Initialize database tables"""
+        conn = WebhookEventLog._get_db_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS webhook_event_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                exchange_id TEXT,
+                state TEXT,
+                payload BLOB NOT NULL,
+                received_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_webhook_event_log_exchange_id ON webhook_event_log(exchange_id, seq)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_webhook_event_log_topic ON webhook_event_log(topic, seq)')
+        conn.commit()
+        conn.close()
+    
+    @classmethod
+    def append(cls, topic, body):
+        payload = zlib.compress(json.dumps(body, separators=(",", ":")).encode())
+        conn = cls._get_db_connection()
+        try:
+            cursor = conn.execute('''
+                INSERT INTO webhook_event_log (topic, exchange_id, state, payload, received_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (topic, WebhookDeduplicator.exchange_id(body), body.get('state'), payload, datetime.utcnow().isoformat()))
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _from_row(row):
+        return {
+            'seq': row['seq'],
+            'topic': row['topic'],
+            'exchange_id': row['exchange_id'],
+            'state': row['state'],
+            'received_at': row['received_at'],
+            'body': json.loads(zlib.decompress(row['payload']))
+        }
+    
+    @classmethod
+    def find_by_exchange_id(cls, exchange_id):
+        conn = cls._get_db_connection()
+        rows = conn.execute('SELECT * FROM webhook_event_log WHERE exchange_id = ? ORDER BY seq', 
+                          (exchange_id,)).fetchall()
+        conn.close()
+        
+        return [cls._from_row(row) for row in rows]
+    
+    @classmethod
+    def iter_batches(cls, after_seq=0, topic=None, exchange_id=None, batch_size=500):
+        """Percorre o log em ordem de chegada, em lotes de até batch_size eventos"""
+        conditions, params = ['seq > ?'], []
+        if topic:
+            conditions.append('topic = ?')
+            params.append(topic)
+        if exchange_id:
+            conditions.append('exchange_id = ?')
+            params.append(exchange_id)
+        
+        last_seq = after_seq
+        while True:
+            conn = cls._get_db_connection()
+            rows = conn.execute(f"SELECT * FROM webhook_event_log WHERE {' AND '.join(conditions)} ORDER BY seq LIMIT ?", 
+                              (last_seq, *params, batch_size)).fetchall()
+            conn.close()
+            
+            if not rows:
+                return
+            yield [cls._from_row(row) for row in rows]
+            last_seq = rows[-1]['seq']
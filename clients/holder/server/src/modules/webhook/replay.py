@@ -0,0 +1,60 @@
+"""
+Reprocessa o log de webhooks nos handlers locais, em lotes.
+
+Uso (a partir de src/):
+    python -m modules.webhook.replay [--topic TOPICO] [--exchange-id ID] [--from-seq N] [--batch-size N]
+"""
+import argparse
+from modules.webhook.dedup import WebhookDeduplicator
+from modules.webhook.event_log import WebhookEventLog, replaying
+from modules.webhook.service import dispatch
+from modules.credential.service import sync_credential_index
+
+
+def replay(after_seq: int = 0, topic: str = None, exchange_id: str = None, batch_size: int = 500) -> dict:
+    seen = set()
+    processed = skipped = failed = 0
+    last_seq = after_seq
+    
+    with replaying():
+        for batch in WebhookEventLog.iter_batches(after_seq, topic=topic, exchange_id=exchange_id, batch_size=batch_size):
+            for event in batch:
+                last_seq = event['seq']
+                
+                # Entregas repetidas aparecem no log; reprocessa cada evento uma vez
+                key = WebhookDeduplicator.event_key(event['topic'], event['body'])
+                if key and key in seen:
+                    skipped += 1
+                    continue
+                if key:
+                    seen.add(key)
+                
+                try:
+                    dispatch(event['topic'], event['body'])
+                    processed += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"Erro ao reprocessar evento {event['seq']} ({event['topic']}): {str(e)}")
+            
+            print(f"Lote reprocessado até o evento {last_seq}")
+    
+    return {"processed": processed, "skipped": skipped, "failed": failed, "last_seq": last_seq}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocessa o log de webhooks")
+    parser.add_argument("--topic", help="Apenas eventos deste tópico")
+    parser.add_argument("--exchange-id", help="Apenas eventos desta troca (cred_ex_id, pres_ex_id ou connection_id)")
+    parser.add_argument("--from-seq", type=int, default=0, help="Reprocessa a partir do evento seguinte a este")
+    parser.add_argument("--batch-size", type=int, default=500, help="Eventos lidos por lote")
+    args = parser.parse_args()
+    
+    result = replay(args.from_seq, topic=args.topic, exchange_id=args.exchange_id, batch_size=args.batch_size)
+    print(f"Reprocessamento concluído: {result}")
+    
+    # Credenciais armazenadas não são reprocessadas: reconcilia o índice com a wallet
+    print(f"Índice de credenciais: {sync_credential_index()}")
+
+
+if __name__ == "__main__":
+    main()
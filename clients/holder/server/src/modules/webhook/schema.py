@@ -3,15 +3,60 @@ import json
 import sqlite3
 from datetime import datetime
 from modules.config.settings import settings
+from modules.utils.pagination import encode_cursor, keyset_clause
+
+
+def _ensure_column(conn, table, column, definition):
+    """Adiciona a coluna em bancos criados antes dela existir"""
+    columns = {row['name'] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if column not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+def backfill_user_dids():
+    """
+    Preenche o user_did de notificações e ofertas gravadas antes de a conexão
+    ser mapeada, a partir de user_connections e dos DIDs efêmeros.
+    """
+    conn = Notification._get_db_connection()
+    try:
+        updated = {}
+        for table in ('notifications', 'credential_offers'):
+            cursor = conn.execute(f'''
+                UPDATE {table} SET user_did = (
+                    SELECT COALESCE(uc.user_did, ued.user_did) FROM user_connections uc
+                    LEFT JOIN user_ephemeral_dids ued ON ued.ephemeral_did = uc.my_did
+                    WHERE uc.connection_id = {table}.connection_id
+                    LIMIT 1
+                )
+                WHERE user_did IS NULL AND connection_id IN (
+                    SELECT uc.connection_id FROM user_connections uc
+                    LEFT JOIN user_ephemeral_dids ued ON ued.ephemeral_did = uc.my_did
+                    WHERE COALESCE(uc.user_did, ued.user_did) IS NOT NULL
+                )
+            ''')
+            updated[table] = cursor.rowcount
+        
+        # Os triggers só acompanham o campo read; a mudança de dono exige recontar
+        if updated['notifications']:
+            Notification._rebuild_counters(conn)
+        conn.commit()
+        return updated
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
 
 
 class Notification:
     """Notification model for webhook events"""
     
-    def __init__(self, tipo=None, connection_id=None, id=None, read=False, created_at=None, updated_at=None):
+    def __init__(self, tipo=None, connection_id=None, id=None, read=False, created_at=None, updated_at=None, user_did=None):
         self.id = id or str(uuid.uuid4())
         self.tipo = tipo
         self.connection_id = connection_id
+        self.user_did = user_did
         self.read = read
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
@@ -34,15 +79,73 @@ class Notification:
                 tipo TEXT NOT NULL,
                 connection_id TEXT,
                 read NUMBER,
+                user_did TEXT,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL
             )
         ''')
+        _ensure_column(conn, 'notifications', 'user_did', 'TEXT')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_notifications_tipo ON notifications(tipo)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_notifications_connection_id ON notifications(connection_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_notifications_user_did_created_at ON notifications(user_did, created_at)')
+        
+        # Contador de não lidas por usuário/conexão/tipo, mantido por triggers na
+        # mesma transação das inserções e mudanças do campo read
+        counter_columns = {row['name'] for row in conn.execute('PRAGMA table_info(notification_counters)')}
+        if counter_columns and 'user_did' not in counter_columns:
+            # Contadores anteriores ao escopo por usuário: recria tabela e triggers
+            conn.execute('DROP TABLE notification_counters')
+            for trigger in ('insert', 'update', 'delete'):
+                conn.execute(f'DROP TRIGGER IF EXISTS trg_notifications_unread_{trigger}')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS notification_counters (
+                user_did TEXT NOT NULL,
+                connection_id TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                unread INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_did, connection_id, tipo)
+            )
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_insert
+            AFTER INSERT ON notifications WHEN NEW.read = 0
+            BEGIN
+                INSERT INTO notification_counters (user_did, connection_id, tipo, unread)
+                VALUES (COALESCE(NEW.user_did, ''), COALESCE(NEW.connection_id, ''), NEW.tipo, 1)
+                ON CONFLICT(user_did, connection_id, tipo) DO UPDATE SET unread = unread + 1;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_update
+            AFTER UPDATE OF read ON notifications WHEN (OLD.read = 0) != (NEW.read = 0)
+            BEGIN
+                INSERT INTO notification_counters (user_did, connection_id, tipo, unread)
+                VALUES (COALESCE(NEW.user_did, ''), COALESCE(NEW.connection_id, ''), NEW.tipo, CASE WHEN NEW.read = 0 THEN 1 ELSE 0 END)
+                ON CONFLICT(user_did, connection_id, tipo) DO UPDATE SET unread = unread + CASE WHEN NEW.read = 0 THEN 1 ELSE -1 END;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_delete
+            AFTER DELETE ON notifications WHEN OLD.read = 0
+            BEGIN
+                UPDATE notification_counters SET unread = unread - 1
+                WHERE user_did = COALESCE(OLD.user_did, '') AND connection_id = COALESCE(OLD.connection_id, '') AND tipo = OLD.tipo;
+            END
+        ''')
+        # Recalcula a partir da tabela (bancos criados antes dos contadores)
+        Notification._rebuild_counters(conn)
         conn.commit()
         conn.close()
     
+    @staticmethod
+    def _rebuild_counters(conn):
+        conn.execute('DELETE FROM notification_counters')
+        conn.execute('''
+            INSERT INTO notification_counters (user_did, connection_id, tipo, unread)
+            SELECT COALESCE(user_did, ''), COALESCE(connection_id, ''), tipo, COUNT(*) FROM notifications
+            WHERE read = 0 GROUP BY COALESCE(user_did, ''), COALESCE(connection_id, ''), tipo
+        ''')
+    
     def __repr__(self):
         return f'<Notification {self.tipo}>'
     
@@ -52,6 +155,7 @@ class Notification:
             'id': self.id,
             'tipo': self.tipo,
             'connection_id': self.connection_id,
+            'user_did': self.user_did,
             'read': self.read,
             'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
             'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
@@ -88,6 +192,88 @@ class Notification:
         
         return [cls._from_row(row) for row in rows]
     
+    @classmethod
+    def find_by_user_did(cls, user_did, connection_id=None, tipo=None, limit=100):
+        """Notificações do usuário, das mais recentes para as mais antigas"""
+        conditions, params = ['user_did = ?'], [user_did]
+        if connection_id:
+            conditions.append('connection_id = ?')
+            params.append(connection_id)
+        if tipo:
+            conditions.append('tipo = ?')
+            params.append(tipo)
+        
+        conn = cls._get_db_connection()
+        rows = conn.execute(f"SELECT * FROM notifications WHERE {' AND '.join(conditions)} ORDER BY created_at DESC LIMIT ?", 
+                          (*params, limit)).fetchall()
+        conn.close()
+        
+        return [cls._from_row(row) for row in rows]
+    
+    @classmethod
+    def unread_counts(cls, user_did, connection_id=None, tipo=None):
+        """Contadores de não lidas do usuário por conexão/tipo"""
+        conditions, params = ['user_did = ?', 'unread > 0'], [user_did]
+        if connection_id:
+            conditions.append('connection_id = ?')
+            params.append(connection_id)
+        if tipo:
+            conditions.append('tipo = ?')
+            params.append(tipo)
+        
+        conn = cls._get_db_connection()
+        rows = conn.execute(f"SELECT * FROM notification_counters WHERE {' AND '.join(conditions)}", params).fetchall()
+        conn.close()
+        
+        return [
+            {'connection_id': row['connection_id'] or None, 'tipo': row['tipo'], 'unread': row['unread']}
+            for row in rows
+        ]
+    
+    @classmethod
+    def mark_read(cls, user_did, ids=None, connection_id=None, tipo=None):
+        """Marca como lidas, em um único UPDATE, as notificações do usuário que atendem aos filtros"""
+        conditions, params = ['user_did = ?', 'read = 0'], [user_did]
+        if ids:
+            conditions.append(f"id IN ({','.join('?' for _ in ids)})")
+            params.extend(ids)
+        if connection_id:
+            conditions.append('connection_id = ?')
+            params.append(connection_id)
+        if tipo:
+            conditions.append('tipo = ?')
+            params.append(tipo)
+        
+        conn = cls._get_db_connection()
+        try:
+            cursor = conn.execute(f"UPDATE notifications SET read = 1, updated_at = ? WHERE {' AND '.join(conditions)}", 
+                                  (datetime.utcnow().isoformat(), *params))
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+    
+    @classmethod
+    def find_since(cls, last_seq, user_did, limit=100):
+        """Notificações do usuário gravadas depois do rowid informado, como pares (rowid, notificação)"""
+        conn = cls._get_db_connection()
+        rows = conn.execute('SELECT rowid AS seq, * FROM notifications WHERE rowid > ? AND user_did = ? ORDER BY rowid LIMIT ?', 
+                          (last_seq, user_did, limit)).fetchall()
+        conn.close()
+        
+        return [(row['seq'], cls._from_row(row)) for row in rows]
+    
+    @classmethod
+    def last_seq(cls):
+        conn = cls._get_db_connection()
+        row = conn.execute('SELECT COALESCE(MAX(rowid), 0) AS seq FROM notifications').fetchone()
+        conn.close()
+        
+        return row['seq']
+    
     @classmethod
     def _from_row(cls, row):
         """Create Notification instance from database row"""
@@ -98,6 +284,7 @@ class Notification:
             id=row['id'],
             tipo=row['tipo'],
             connection_id=row['connection_id'],
+            user_did=row['user_did'],
             read=bool(row['read']),
             created_at=created_at,
             updated_at=updated_at
@@ -117,19 +304,19 @@ class Notification:
                 # Update
                 conn.execute('''
                     UPDATE notifications SET 
-                        tipo = ?, connection_id = ?, read = ?, updated_at = ?
+                        tipo = ?, connection_id = ?, user_did = ?, read = ?, updated_at = ?
                     WHERE id = ?
                 ''', (
-                    self.tipo, self.connection_id, int(self.read), self.updated_at.isoformat(), self.id
+                    self.tipo, self.connection_id, self.user_did, int(self.read), self.updated_at.isoformat(), self.id
                 ))
             else:
                 # Insert
                 conn.execute('''
                     INSERT INTO notifications 
-                    (id, tipo, connection_id, read, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    (id, tipo, connection_id, user_did, read, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (
-                    self.id, self.tipo, self.connection_id, int(self.read),
+                    self.id, self.tipo, self.connection_id, self.user_did, int(self.read),
                     self.created_at.isoformat(), self.updated_at.isoformat()
                 ))
             
@@ -147,10 +334,11 @@ class CredentialOffer:
     
     def __init__(self, cred_ex_id=None, connection_id=None, state=None, 
                  credential_preview=None, schema_id=None, cred_def_id=None,
-                 created_at=None, updated_at=None, id=None):
+                 created_at=None, updated_at=None, id=None, user_did=None):
         self.id = id or str(uuid.uuid4())
         self.cred_ex_id = cred_ex_id
         self.connection_id = connection_id
+        self.user_did = user_did
         self.state = state
         self.credential_preview = credential_preview or []
         self.schema_id = schema_id
@@ -179,13 +367,20 @@ class CredentialOffer:
                 credential_preview TEXT,
                 schema_id TEXT,
                 cred_def_id TEXT,
+                user_did TEXT,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL
             )
         ''')
+        _ensure_column(conn, 'credential_offers', 'user_did', 'TEXT')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_credential_offers_cred_ex_id ON credential_offers(cred_ex_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_credential_offers_user_did_created_at ON credential_offers(user_did, created_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_credential_offers_user_did_state_created_at ON credential_offers(user_did, state, created_at, id)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_credential_offers_connection_id ON credential_offers(connection_id)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_credential_offers_state ON credential_offers(state)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_credential_offers_created_at ON credential_offers(created_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_credential_offers_state_created_at ON credential_offers(state, created_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_credential_offers_connection_id_created_at ON credential_offers(connection_id, created_at, id)')
         conn.commit()
         conn.close()
     
@@ -198,6 +393,7 @@ class CredentialOffer:
             'id': self.id,
             'cred_ex_id': self.cred_ex_id,
             'connection_id': self.connection_id,
+            'user_did': self.user_did,
             'state': self.state,
             'credential_preview': self.credential_preview if isinstance(self.credential_preview, list) else json.loads(self.credential_preview) if self.credential_preview else [],
             'schema_id': self.schema_id,
@@ -248,6 +444,53 @@ class CredentialOffer:
         
         return [cls._from_row(row) for row in rows]
     
+    @staticmethod
+    def _filters(user_did=None, state=None, connection_id=None):
+        conditions, params = [], []
+        if user_did:
+            conditions.append('user_did = ?')
+            params.append(user_did)
+        if state:
+            conditions.append('state = ?')
+            params.append(state)
+        if connection_id:
+            conditions.append('connection_id = ?')
+            params.append(connection_id)
+        return conditions, params
+    
+    @classmethod
+    def find_page(cls, user_did=None, state=None, connection_id=None, limit=50, cursor=None):
+        """Página em ordem (created_at DESC, id DESC); retorna (itens, próximo cursor)"""
+        conditions, params = cls._filters(user_did, state, connection_id)
+        keyset, keyset_params = keyset_clause(cursor)
+        if keyset:
+            conditions.append(keyset)
+            params.extend(keyset_params)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        conn = cls._get_db_connection()
+        rows = conn.execute(f'SELECT * FROM credential_offers {where} ORDER BY created_at DESC, id DESC LIMIT ?', 
+                          (*params, limit + 1)).fetchall()
+        conn.close()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        
+        return [cls._from_row(row) for row in rows], next_cursor
+    
+    @classmethod
+    def count(cls, user_did=None, state=None, connection_id=None):
+        conditions, params = cls._filters(user_did, state, connection_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        conn = cls._get_db_connection()
+        row = conn.execute(f'SELECT COUNT(*) AS total FROM credential_offers {where}', params).fetchone()
+        conn.close()
+        
+        return row['total']
+    
     @classmethod
     def _from_row(cls, row):
         """Create CredentialOffer instance from database row"""
@@ -258,6 +501,7 @@ class CredentialOffer:
             id=row['id'],
             cred_ex_id=row['cred_ex_id'],
             connection_id=row['connection_id'],
+            user_did=row['user_did'],
             state=row['state'],
             credential_preview=json.loads(row['credential_preview']) if row['credential_preview'] else [],
             schema_id=row['schema_id'],
@@ -286,23 +530,23 @@ class CredentialOffer:
                 conn.execute('''
                     UPDATE credential_offers SET 
                         connection_id = ?, state = ?, credential_preview = ?, 
-                        schema_id = ?, cred_def_id = ?, updated_at = ?
+                        schema_id = ?, cred_def_id = ?, user_did = ?, updated_at = ?
                     WHERE cred_ex_id = ?
                 ''', (
                     self.connection_id, self.state, credential_preview_json,
-                    self.schema_id, self.cred_def_id, updated_at_str, self.cred_ex_id
+                    self.schema_id, self.cred_def_id, self.user_did, updated_at_str, self.cred_ex_id
                 ))
             else:
                 # Insert
                 conn.execute('''
                     INSERT INTO credential_offers 
                     (id, cred_ex_id, connection_id, state, credential_preview, 
-                     schema_id, cred_def_id, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     schema_id, cred_def_id, user_did, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     self.id, self.cred_ex_id, self.connection_id, self.state,
                     credential_preview_json, self.schema_id, self.cred_def_id,
-                    created_at_str, updated_at_str
+                    self.user_did, created_at_str, updated_at_str
                 ))
             
             conn.commit()
@@ -317,9 +561,10 @@ class CredentialOffer:
 class PresentProofRequest:
     def __init__(self, pres_ex_id=None, state=None, name=None, version=None, 
                  requested_attributes=None, requested_predicates=None, 
-                 error_msg=None, created_at=None, updated_at=None, id=None):
+                 error_msg=None, created_at=None, updated_at=None, id=None, user_did=None):
         self.id = id or str(uuid.uuid4())
         self.pres_ex_id = pres_ex_id
+        self.user_did = user_did
         self.state = state
         self.name = name
         self.version = version
@@ -349,12 +594,18 @@ class PresentProofRequest:
                 requested_attributes TEXT,
                 requested_predicates TEXT,
                 error_msg TEXT,
+                user_did TEXT,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL
             )
         ''')
+        _ensure_column(conn, 'present_proof_requests', 'user_did', 'TEXT')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_present_proof_requests_pres_ex_id ON present_proof_requests(pres_ex_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_present_proof_requests_user_did_created_at ON present_proof_requests(user_did, created_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_present_proof_requests_user_did_state_created_at ON present_proof_requests(user_did, state, created_at, id)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_present_proof_requests_state ON present_proof_requests(state)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_present_proof_requests_created_at ON present_proof_requests(created_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_present_proof_requests_state_created_at ON present_proof_requests(state, created_at, id)')
         conn.commit()
         conn.close()
     
@@ -366,6 +617,7 @@ class PresentProofRequest:
         return {
             'id': self.id,
             'pres_ex_id': self.pres_ex_id,
+            'user_did': self.user_did,
             'state': self.state,
             'name': self.name,
             'version': self.version,
@@ -396,6 +648,15 @@ class PresentProofRequest:
             return cls._from_row(row)
         return None
     
+    @classmethod
+    def find_unowned_pres_ex_ids(cls):
+        """Pedidos gravados antes de a conexão ser mapeada"""
+        conn = cls._get_db_connection()
+        rows = conn.execute('SELECT pres_ex_id FROM present_proof_requests WHERE user_did IS NULL').fetchall()
+        conn.close()
+        
+        return {row['pres_ex_id'] for row in rows}
+    
     @classmethod
     def find_all(cls, limit=100):
         conn = cls._get_db_connection()
@@ -405,6 +666,34 @@ class PresentProofRequest:
         
         return [cls._from_row(row) for row in rows]
     
+    @classmethod
+    def find_page(cls, user_did=None, state=None, limit=50, cursor=None):
+        """Página em ordem (created_at DESC, id DESC); retorna (itens, próximo cursor)"""
+        conditions, params = [], []
+        if user_did:
+            conditions.append('user_did = ?')
+            params.append(user_did)
+        if state:
+            conditions.append('state = ?')
+            params.append(state)
+        keyset, keyset_params = keyset_clause(cursor)
+        if keyset:
+            conditions.append(keyset)
+            params.extend(keyset_params)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        conn = cls._get_db_connection()
+        rows = conn.execute(f'SELECT * FROM present_proof_requests {where} ORDER BY created_at DESC, id DESC LIMIT ?', 
+                          (*params, limit + 1)).fetchall()
+        conn.close()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        
+        return [cls._from_row(row) for row in rows], next_cursor
+    
     @classmethod
     def _from_row(cls, row):
         created_at = datetime.fromisoformat(row['created_at']) if row['created_at'] else datetime.utcnow()
@@ -420,6 +709,7 @@ class PresentProofRequest:
         proof_request = cls(
             id=row['id'],
             pres_ex_id=row['pres_ex_id'],
+            user_did=row['user_did'],
             state=row['state'],
             name=row['name'],
             version=row['version'],
@@ -451,24 +741,24 @@ class PresentProofRequest:
                     UPDATE present_proof_requests SET 
                         state = ?, name = ?, version = ?, 
                         requested_attributes = ?, requested_predicates = ?, 
-                        error_msg = ?, updated_at = ?
+                        error_msg = ?, user_did = ?, updated_at = ?
                     WHERE pres_ex_id = ?
                 ''', (
                     self.state, self.name, self.version,
                     requested_attributes_json, requested_predicates_json,
-                    self.error_msg, updated_at_str, self.pres_ex_id
+                    self.error_msg, self.user_did, updated_at_str, self.pres_ex_id
                 ))
             else:
                 # Insert
                 conn.execute('''
                     INSERT INTO present_proof_requests 
                     (id, pres_ex_id, state, name, version, requested_attributes, 
-                     requested_predicates, error_msg, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     requested_predicates, error_msg, user_did, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     self.id, self.pres_ex_id, self.state, self.name, self.version,
                     requested_attributes_json, requested_predicates_json,
-                    self.error_msg, created_at_str, updated_at_str
+                    self.error_msg, self.user_did, created_at_str, updated_at_str
                 ))
             
             conn.commit()
@@ -1,7 +1,45 @@
 from modules.webhook.schema import Notification, PresentProofRequest, CredentialOffer
 from modules.client.service import AcaPyClient
+from modules.credential.service import index_stored_credential
+from modules.connection.service import record_connection, resolve_user_did
+from modules.notification.events import notification_events
+from modules.webhook.event_log import is_replaying
 import json
 
+# Estados da troca de credencial refletidos em credential_offers
+OFFER_TRACKED_STATES = ('request-sent', 'done', 'abandoned', 'deleted')
+
+def dispatch(topic: str, body: dict):
+    """Encaminha o evento ao handler do tópico (webhook e reprodução do log)"""
+    if topic == "connections":
+        return process_connections(body)
+    if topic == "issue_credential_v2_0":
+        return process_issue_credential_v2_0(body)
+    if topic == "present_proof_v2_0":
+        return process_present_proof_v2_0(body)
+    return None
+
+def create_notification(tipo: str, connection_id: str = None) -> Notification | None:
+    """Grava a notificação e avisa os streams SSE abertos"""
+    if is_replaying():
+        # Notificações são avisos de eventos ao vivo; não são recriadas na reprodução
+        return None
+    
+    notification = Notification(tipo=tipo, connection_id=connection_id, user_did=resolve_user_did(connection_id))
+    notification.save()
+    notification_events.notify()
+    
+    return notification
+
+def process_connections(body: dict):
+    try:
+        record_connection(body)
+        return None
+    
+    except Exception as e:
+        print(f"Erro ao processar connections: {str(e)}")
+        raise e
+
 def process_issue_credential_v2_0(body: dict):
     try:
         if not 'state' in body:
@@ -11,7 +49,10 @@ def process_issue_credential_v2_0(body: dict):
             return receive_offer(body)
         if body['state'] == 'credential-received':
             print("Storing received credential...")
+            update_offer_state(body)
             return store_credential(body)
+        if body['state'] in OFFER_TRACKED_STATES:
+            return update_offer_state(body)
         
         return None
         
@@ -19,6 +60,23 @@ def process_issue_credential_v2_0(body: dict):
         print(f"Erro ao processar issue credential v2.0: {str(e)}")
         raise e
     
+def update_offer_state(body: dict):
+    """Acompanha as transições da oferta na tabela local"""
+    cred_ex_id = body.get('cred_ex_id')
+    if not cred_ex_id:
+        return None
+    
+    credential_offer = CredentialOffer.find_by_cred_ex_id(cred_ex_id)
+    if not credential_offer:
+        # Webhook de offer-received perdido: cria o registro a partir deste evento
+        return receive_offer(body)
+    
+    credential_offer.state = body.get('state')
+    credential_offer.user_did = credential_offer.user_did or resolve_user_did(body.get('connection_id'))
+    credential_offer.save()
+    
+    return None
+
 def receive_offer(body: dict):
     # Extrai identificadores da credencial
     schema_id = None
@@ -61,6 +119,7 @@ def receive_offer(body: dict):
         credential_offer = CredentialOffer(
             cred_ex_id=cred_ex_id,
             connection_id=body.get('connection_id'),
+            user_did=resolve_user_did(body.get('connection_id')),
             state=body.get('state'),
             credential_preview=credential_preview,
             schema_id=schema_id,
@@ -71,16 +130,22 @@ def receive_offer(body: dict):
     return None
 
 def store_credential(body: dict):
+    if is_replaying():
+        # O ACA-Py já armazenou a credencial; o índice é refeito por sync_credential_index
+        return None
+
     cred_ex_id = body.get('cred_ex_id')
 
     result = AcaPyClient.issue.store_credential(cred_ex_id)
 
-    notification = Notification(
-        tipo="credential-received",
-        connection_id=body.get('connection_id'),
-    )
-    
-    notification.save()
+    # Mantém o índice local usado em /credential/my-credentials
+    if result and result.get('cred_id_stored'):
+        try:
+            index_stored_credential(result['cred_id_stored'], body.get('connection_id'))
+        except Exception as e:
+            print(f"Erro ao indexar credencial armazenada: {str(e)}")
+
+    create_notification("credential-received", body.get('connection_id'))
 
     return None
 
@@ -122,6 +187,7 @@ def receive_proof_request(body: dict):
     
     proof_request = PresentProofRequest(
         pres_ex_id=pres_ex_id,
+        user_did=resolve_user_did(body.get('connection_id')),
         state=state,
         name=name,
         version=version,
@@ -133,12 +199,7 @@ def receive_proof_request(body: dict):
     
     proof_request.save()
     
-    notification = Notification(
-        tipo="proof-request-received",
-        connection_id=body.get('connection_id'),
-    )
-    
-    notification.save()
+    create_notification("proof-request-received", body.get('connection_id'))
     
     return proof_request.to_dict()
 
@@ -161,6 +222,7 @@ def update_proof_request_abandoned(body: dict):
         
         proof_request = PresentProofRequest(
             pres_ex_id=pres_ex_id,
+            user_did=resolve_user_did(body.get('connection_id')),
             state=body.get('state'),
             name=indy_request.get('name'),
             version=indy_request.get('version'),
@@ -176,17 +238,14 @@ def update_proof_request_abandoned(body: dict):
         proof_request.state = body.get('state')
         proof_request.error_msg = body.get('error_msg')
         proof_request.updated_at = body.get('updated_at')
+        proof_request.user_did = proof_request.user_did or resolve_user_did(body.get('connection_id'))
         print(f"Atualizando proof request {pres_ex_id} para abandoned")
     
     proof_request.save()
     print(f"Proof request {pres_ex_id} marcado como abandoned: {proof_request.error_msg}")
     
     # Cria notificação de erro para o holder
-    notification = Notification(
-        tipo="proof-presentation-failed",
-        connection_id=body.get('connection_id'),
-    )
-    notification.save()
+    create_notification("proof-presentation-failed", body.get('connection_id'))
     
     return proof_request.to_dict()
 
@@ -209,6 +268,7 @@ def update_proof_request_sent(body: dict):
         
         proof_request = PresentProofRequest(
             pres_ex_id=pres_ex_id,
+            user_did=resolve_user_did(body.get('connection_id')),
             state=body.get('state'),
             name=indy_request.get('name'),
             version=indy_request.get('version'),
@@ -222,6 +282,7 @@ def update_proof_request_sent(body: dict):
         # Atualiza com o estado presentation-sent
         proof_request.state = body.get('state')
         proof_request.updated_at = body.get('updated_at')
+        proof_request.user_did = proof_request.user_did or resolve_user_did(body.get('connection_id'))
         print(f"Atualizando proof request {pres_ex_id} para presentation-sent")
     
     proof_request.save()
@@ -2,9 +2,13 @@
 from modules.config.settings import settings
 from modules.config.app import create_app
 from modules.user.schema import User
+from modules.webhook.dedup import ProcessedWebhookEvent
+from modules.webhook.event_log import WebhookEventLog
 
 # Create app instance
 app = create_app()
 
 # Initialize database
-User.init_db()
\ No newline at end of file
+User.init_db()
+ProcessedWebhookEvent.init_db()
+WebhookEventLog.init_db()
\ No newline at end of file
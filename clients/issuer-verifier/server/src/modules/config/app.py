@@ -15,15 +15,18 @@ from modules.proof import routes as proof_routes
 from modules.webhook import routes as webhook_routes
 from modules.scheduler import start_scheduler
 from modules.scheduler.service import stop_scheduler
+from modules.utils.password import password_hasher
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
-    # Startup: Inicia o scheduler
+    # Startup: Sobe o pool de hash de senhas e inicia o scheduler
+    password_hasher.start()
     start_scheduler()
     yield
-    # Shutdown: Para o scheduler
+    # Shutdown: Para o scheduler e o pool de hash de senhas
     await stop_scheduler()
+    password_hasher.shutdown()
 
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
@@ -28,11 +28,26 @@ class Settings:
         
         self.database_url = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
 
+        # Hash de senhas: custo do bcrypt e pool de processos (workers, fila máxima, timeout em s)
+        self.bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", 12))
+        self.password_pool_workers = int(os.getenv("PASSWORD_POOL_WORKERS", 2))
+        self.password_pool_max_pending = int(os.getenv("PASSWORD_POOL_MAX_PENDING", 16))
+        self.password_pool_timeout = float(os.getenv("PASSWORD_POOL_TIMEOUT", 10))
+
+        # Cache dos usuários autenticados por JWT: entradas máximas e TTL (s)
+        self.user_cache_size = int(os.getenv("USER_CACHE_SIZE", 1000))
+        self.user_cache_ttl = float(os.getenv("USER_CACHE_TTL", 60))
+
+        # Deduplicação de webhooks: entradas no LRU em memória e retenção (dias) da tabela
+        self.webhook_dedup_cache_size = int(os.getenv("WEBHOOK_DEDUP_CACHE_SIZE", 10000))
+        self.webhook_dedup_retention_days = int(os.getenv("WEBHOOK_DEDUP_RETENTION_DAYS", 7))
+
         self.company_name = os.getenv("COMPANY_NAME", "Instituição Agreta")
 
         self.enable_proof_scheduler = os.getenv("ENABLE_PROOF_SCHEDULER", "true").lower() == "true"
         self.proof_check_interval = int(os.getenv("PROOF_CHECK_INTERVAL", "30"))  # 1 minuto
         self.proof_request_timeout = int(os.getenv("PROOF_REQUEST_TIMEOUT", "90"))  # 1.5 minutos
+        self.proof_scheduler_lock = os.getenv("PROOF_SCHEDULER_LOCK", str(DB_PATH.parent / "proof_scheduler.lock"))
 
     @property
     def governance_api_key(self) -> str:
@@ -1,6 +1,7 @@
 import httpx
 import logging
 import os
+import time
 from modules.client.service import AcaPyClient
 from modules.config.settings import settings
 from modules.ledger.schemas import LedgerRegisterResponse
@@ -10,6 +11,27 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
+# A governança registra o DID na ledger de forma assíncrona
+LEDGER_STATUS_POLL_INTERVAL = 1.0
+LEDGER_STATUS_TIMEOUT = 60.0
+
+
+def wait_for_ledger_registration(key: str) -> dict:
+    endpoint = f"{settings.governance_url}/api/ledger/status"
+    headers = {"X-API-Key": key}
+    deadline = time.monotonic() + LEDGER_STATUS_TIMEOUT
+    
+    while True:
+        response = httpx.get(endpoint, headers=headers, timeout=10.0)
+        response.raise_for_status()
+        truthy = response.json().get("data", {})
+        
+        if truthy.get("ledger_status") != "pending":
+            return truthy
+        if time.monotonic() >= deadline:
+            return truthy
+        time.sleep(LEDGER_STATUS_POLL_INTERVAL)
+
 
 def register_did_on_governance(key: str) -> dict:
     try:
@@ -38,10 +60,22 @@ def register_did_on_governance(key: str) -> dict:
         logging.info(f"Registering DID with governance application at {endpoint}")
         response = httpx.post(endpoint, json=payload, headers=headers, timeout=30.0)
         
-        if response.status_code == 200 or response.status_code == 201:
-            logging.info("DID registered successfully with governance application")
+        if response.status_code in (200, 201, 202):
             result = response.json()
             
+            if response.status_code == 202:
+                logging.info("DID registration accepted, waiting for ledger confirmation...")
+                truthy = wait_for_ledger_registration(key)
+                if truthy.get("ledger_status") == "failed":
+                    logging.error(f"Ledger registration failed: {truthy.get('ledger_error')}")
+                    return {"error": truthy.get("ledger_error") or "Failed to register DID on ledger"}
+                if truthy.get("ledger_status") != "registered":
+                    logging.warning("Ledger registration still pending")
+                    return {"error": "DID registration on ledger is still pending, try again later"}
+                result["data"] = truthy
+            
+            logging.info("DID registered successfully with governance application")
+            
             os.environ["GOVERNANCE_API_KEY"] = key
             logging.info("API Key stored in environment variables")
             
@@ -5,6 +5,7 @@ from typing import Optional
 
 from modules.client.service import AcaPyClient
 from modules.config.settings import settings
+from modules.scheduler.leader import FileLease
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,6 +18,8 @@ class ProofRequestScheduler:
     def __init__(self):
         self.task: Optional[asyncio.Task] = None
         self.running = False
+        # Com vários workers, apenas quem detém o lock executa a varredura
+        self.lease = FileLease(settings.proof_scheduler_lock)
         
     async def invalidate_pending_proofs(self):
         """Verifica e invalida pedidos de prova que estão pendentes há muito tempo"""
@@ -99,7 +102,8 @@ class ProofRequestScheduler:
         
         while self.running:
             try:
-                await self.invalidate_pending_proofs()
+                if self.lease.try_acquire():
+                    await self.invalidate_pending_proofs()
                 await asyncio.sleep(settings.proof_check_interval)
             except asyncio.CancelledError:
                 logging.info("Scheduler cancelado.")
@@ -128,6 +132,8 @@ class ProofRequestScheduler:
             except asyncio.CancelledError:
                 pass
             logging.info("Scheduler parado.")
+        # Libera o lock para que outro worker assuma
+        self.lease.release()
 
 # Instância global do scheduler
 proof_scheduler = ProofRequestScheduler()
@@ -8,6 +8,7 @@ from jose import JWTError, jwt
 from typing import Optional
 from modules.config.settings import settings
 import modules.user.service as user_service
+from modules.user.cache import user_cache
 
 security = HTTPBearer()
 
@@ -36,7 +37,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except JWTError:
         raise credentials_exception
     
-    user = user_service.get_user_by_id(user_id)
+    user = user_cache.get_or_load(user_id, user_service.get_user_by_id)
     if user is None:
         raise credentials_exception
         
@@ -75,7 +76,7 @@ def verify_did_token(credentials: HTTPAuthorizationCredentials = Depends(securit
     except JWTError:
         raise credentials_exception
     
-    user = user_service.get_user_by_id(user_id)
+    user = user_cache.get_or_load(user_id, user_service.get_user_by_id)
     if user is None or user.did != did:
         raise credentials_exception
         
@@ -1,6 +1,163 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional, Tuple
 from passlib.context import CryptContext
+from modules.config.settings import settings
+
+# Custo fixado nos limites: hashes com outro custo são refeitos no próximo login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds
+)
+
+
+class PasswordPoolBusyError(RuntimeError):
+    pass
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _noop():
+    return None
+
+
+class PasswordHasher:
+    """
+    Executa o bcrypt em um pool de processos dedicado, fora do threadpool das
+    rotas. A fila é limitada: acima de max_pending as chamadas falham na hora
+    com PasswordPoolBusyError em vez de prender mais workers esperando. Uma
+    chamada que estoura o timeout continua contando como pendente até o
+    processo de fato terminar o trabalho.
+    """
+    
+    def __init__(self, workers: int = 2, max_pending: int = 16, timeout: float = 10.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def start(self):
+        """Cria os processos no startup, antes de a aplicação abrir outras threads"""
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("fork") if "fork" in methods else None
+                executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                # Os processos só são criados no primeiro submit; uma tarefa vazia
+                # força o fork agora, e não depois com as threads da aplicação rodando
+                executor.submit(_noop).result(timeout=self.timeout)
+                self._executor = executor
+        return self._executor
+    
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusyError("Muitas operações de senha em andamento")
+            self.pending += 1
+        
+        started = time.perf_counter()
+        try:
+            future = self.start().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # A vaga na fila só é liberada quando o processo termina (ou a tarefa é cancelada)
+        future.add_done_callback(self._release)
+        
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Sai da fila se ainda não começou; se já está rodando, segue ocupando a vaga
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise PasswordPoolBusyError("Tempo esgotado aguardando o pool de senhas")
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.completed += 1
+            self.total_ms += duration_ms
+            self.max_ms = max(self.max_ms, duration_ms)
+        return result
+    
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+    
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+    
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        valid, new_hash = self._run(_verify_and_update, plain_password, hashed_password)
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "bcrypt_rounds": settings.bcrypt_rounds,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "avg_ms": round(self.total_ms / self.completed, 3) if self.completed else 0.0,
+                "max_ms": round(self.max_ms, 3)
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_pool_workers,
+    max_pending=settings.password_pool_max_pending,
+    timeout=settings.password_pool_timeout
+)
+
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify_and_update(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica a senha e devolve o novo hash quando o custo configurado mudou"""
+    return password_hasher.verify_and_update(plain_password, hashed_password)
@@ -0,0 +1,152 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from modules.config.settings import settings
+
+# Campos que identificam a troca em cada tópico
+EXCHANGE_ID_FIELDS = ("cred_ex_id", "pres_ex_id", "connection_id")
+# Eventos gravados entre uma limpeza da tabela e a seguinte
+PRUNE_EVERY = 1000
+
+
+class ProcessedWebhookEvent:
+    """Eventos de webhook já processados (persistidos entre reinícios)"""
+    
+    @staticmethod
+    def _get_db_connection():
+        """Get database connection"""
+        db_path = settings.database_url.replace('sqlite:///', '')
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @staticmethod
+    def init_db():
+        """Initialize database tables"""
+        conn = ProcessedWebhookEvent._get_db_connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS processed_webhook_events (
+                event_key TEXT PRIMARY KEY,
+                topic TEXT NOT NULL,
+                exchange_id TEXT,
+                state TEXT,
+                processed_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_processed_webhook_events_processed_at ON processed_webhook_events(processed_at)')
+        conn.commit()
+        conn.close()
+        ProcessedWebhookEvent.prune()
+    
+    @classmethod
+    def prune(cls):
+        """Descarta eventos fora da janela de deduplicação"""
+        cutoff = datetime.utcnow() - timedelta(days=settings.webhook_dedup_retention_days)
+        conn = cls._get_db_connection()
+        try:
+            cursor = conn.execute('DELETE FROM processed_webhook_events WHERE processed_at < ?', (cutoff.isoformat(),))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+    
+    @classmethod
+    def claim(cls, event_key, topic, exchange_id, state):
+        """Registra o evento; retorna False se ele já tinha sido processado"""
+        conn = cls._get_db_connection()
+        try:
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO processed_webhook_events (event_key, topic, exchange_id, state, processed_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (event_key, topic, exchange_id, state, datetime.utcnow().isoformat()))
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+    
+    @classmethod
+    def release(cls, event_key):
+        conn = cls._get_db_connection()
+        try:
+            conn.execute('DELETE FROM processed_webhook_events WHERE event_key = ?', (event_key,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class WebhookDeduplicator:
+    """
+    Reconhece entregas repetidas do ACA-Py pela chave
+    (tópico, id da troca, estado, updated_at). Um LRU em memória responde
+    às repetições recentes sem abrir o banco; a tabela cobre o restante.
+    """
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self._claimed = 0
+    
+    @staticmethod
+    def exchange_id(body: dict):
+        return next((body[field] for field in EXCHANGE_ID_FIELDS if body.get(field)), None)
+    
+    @classmethod
+    def event_key(cls, topic: str, body: dict):
+        exchange_id = cls.exchange_id(body)
+        if not exchange_id or not body.get("state"):
+            return None
+        return f"{topic}:{exchange_id}:{body['state']}:{body.get('updated_at') or ''}"
+    
+    def _remember(self, key: str):
+        with self._lock:
+            self._recent[key] = True
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_entries:
+                self._recent.popitem(last=False)
+    
+    def claim(self, topic: str, body: dict):
+        """
+        Retorna a chave do evento se ele deve ser processado, ou None se for
+        uma entrega repetida. Eventos sem chave são sempre processados ("").
+        """
+        key = self.event_key(topic, body)
+        if key is None:
+            return ""
+        
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                return None
+        
+        if not ProcessedWebhookEvent.claim(key, topic, self.exchange_id(body), body.get("state")):
+            self._remember(key)
+            return None
+        
+        self._remember(key)
+        self._prune_periodically()
+        return key
+    
+    def _prune_periodically(self):
+        """Limpa a tabela a cada PRUNE_EVERY eventos novos, sem depender de reinício"""
+        with self._lock:
+            self._claimed += 1
+            if self._claimed < PRUNE_EVERY:
+                return
+            self._claimed = 0
+        try:
+            ProcessedWebhookEvent.prune()
+        except Exception as e:
+            print(f"Erro ao limpar eventos de webhook processados: {str(e)}")
+    
+    def release(self, key: str):
+        """Libera o evento quando o processamento falha, para aceitar o reenvio"""
+        if not key:
+            return
+        with self._lock:
+            self._recent.pop(key, None)
+        ProcessedWebhookEvent.release(key)
+
+
+webhook_dedup = WebhookDeduplicator(settings.webhook_dedup_cache_size)
@@ -2,15 +2,26 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from modules.utils.model import SuccessResponse
 from fastapi import Request
-from modules.webhook.service import process_present_proof_v2_0
+from modules.webhook.dedup import webhook_dedup
+from modules.webhook.event_log import WebhookEventLog
+from modules.webhook.service import dispatch
 
 router = APIRouter(prefix="/webhook", tags=["webhook"])
 
 @router.post("/topic/{topic}/", response_model=SuccessResponse)
 async def webhook(topic: str, request: Request):
     body = await request.json()
+    WebhookEventLog.append(topic, body)
 
-    if topic == "present_proof_v2_0":
-        process_present_proof_v2_0(body)
+    # Entregas repetidas do ACA-Py são confirmadas sem reprocessar
+    event_key = webhook_dedup.claim(topic, body)
+    if event_key is None:
+        return JSONResponse(status_code=200, content=SuccessResponse(data=f"Webhook duplicado ignorado para o tópico {topic}").model_dump())
+
+    try:
+        dispatch(topic, body)
+    except Exception:
+        webhook_dedup.release(event_key)
+        raise
 
     return JSONResponse(status_code=200, content=SuccessResponse(data=f"Webhook recebido com sucesso para o tópico {topic}").model_dump())
@@ -1,11 +1,17 @@
 from modules.webhook.schema import Notification, PresentProofRequest
 from modules.client.service import AcaPyClient
+from modules.webhook.event_log import is_replaying
+
+def dispatch(topic: str, body: dict):
+    """Encaminha o evento ao handler do tópico (webhook e reprodução do log)"""
+    if topic == "present_proof_v2_0":
+        return process_present_proof_v2_0(body)
+    return None
 
 def process_present_proof_v2_0(body: dict):
     try:
         if not 'state' in body:
             return None
-        print(body)
         
         if body['state'] == 'request-sent':
             return create_proof_request_record(body)
@@ -66,6 +72,10 @@ def receive_proof_request(body: dict):
             print("Erro: pres_ex_id não encontrado no payload")
             return None
         
+        if is_replaying():
+            # A verificação já foi feita no ACA-Py; o resultado chega no evento done
+            return None
+        
         print(f"Verificando apresentação para pres_ex_id: {pres_ex_id}")
         result = AcaPyClient.verify.verify_presentation(pres_ex_id)
         
@@ -101,11 +111,12 @@ def update_proof_request_abandoned(body: dict):
         print(f"Proof request {pres_ex_id} marcado como abandoned")
         
         # Cria notificação de erro para o verifier
-        notification = Notification(
-            tipo="proof-presentation-abandoned",
-            connection_id=body.get('connection_id'),
-        )
-        notification.save()
+        if not is_replaying():
+            notification = Notification(
+                tipo="proof-presentation-abandoned",
+                connection_id=body.get('connection_id'),
+            )
+            notification.save()
         
         return proof_request.to_dict()
     else:
@@ -1,7 +1,7 @@
 import modules.user.service as user_service
 from modules.auth.schema import AuthRegisterRequest, AuthLoginRequest
 from modules.utils.token import create_access_token
-from modules.utils.password import verify_password
+from modules.utils.password import verify_and_update_password
 
 def register_user(credentials: AuthRegisterRequest) -> tuple[dict, dict] | str:
     existing_user = user_service.get_user_by_email(credentials.email)
@@ -24,9 +24,15 @@ def login_user(credentials: AuthLoginRequest) -> tuple[dict, dict] | str:
     if not user:
         return "USER_NOT_FOUND"
 
-    if not verify_password(credentials.password, user.password_hash):
+    valid, new_hash = verify_and_update_password(credentials.password, user.password_hash)
+    if not valid:
         return "INVALID_PASSWORD"
 
+    # Hash gerado com outro custo do bcrypt: regrava com o custo atual
+    if new_hash:
+        user.password_hash = new_hash
+        user.save()
+
     response = { "user_name": user.first_name, "user_surname": user.last_name, "user_email": user.email }
 
     return response
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import APIRouter
+from contextlib import asynccontextmanager
 
 from modules.config.settings import settings
 from modules.utils.model import SuccessResponse
@@ -10,10 +11,20 @@ from modules.invitation import routes as invitation_routes
 from modules.credential import routes as credential_routes
 from modules.connection import routes as connection_routes
 from modules.ledger import routes as ledger_routes
+from modules.utils.password import password_hasher
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Gerencia o ciclo de vida da aplicação"""
+    # Startup: Sobe o pool de hash de senhas
+    password_hasher.start()
+    yield
+    # Shutdown: Encerra o pool de hash de senhas
+    password_hasher.shutdown()
 
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     app.title = "Holder API"
 
     app.add_middleware(
@@ -28,6 +28,16 @@ class Settings:
         
         self.database_url = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
 
+        # Hash de senhas: custo do bcrypt e pool de processos (workers, fila máxima, timeout em s)
+        self.bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", 12))
+        self.password_pool_workers = int(os.getenv("PASSWORD_POOL_WORKERS", 2))
+        self.password_pool_max_pending = int(os.getenv("PASSWORD_POOL_MAX_PENDING", 16))
+        self.password_pool_timeout = float(os.getenv("PASSWORD_POOL_TIMEOUT", 10))
+
+        # Cache dos usuários autenticados por JWT: entradas máximas e TTL (s)
+        self.user_cache_size = int(os.getenv("USER_CACHE_SIZE", 1000))
+        self.user_cache_ttl = float(os.getenv("USER_CACHE_TTL", 60))
+
         self.company_name = os.getenv("COMPANY_NAME", "Poupando Tempo")
 
     @property
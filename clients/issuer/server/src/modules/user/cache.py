@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from modules.config.settings import settings
+
+
+class UserCache:
+    """
+    Cache LRU com TTL dos usuários autenticados, por id. Evita abrir conexão
+    com o SQLite e montar o User a cada requisição com JWT. As gravações do
+    User invalidam a entrada; o TTL limita o tempo em que outros processos
+    da aplicação enxergam um usuário desatualizado.
+    """
+    
+    def __init__(self, max_size: int = 1000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrementado a cada invalidação: descarta cargas que começaram antes dela
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, user_id: str):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return user
+    
+    def get_or_load(self, user_id: str, loader: Callable[[str], Any]):
+        user = self.get(user_id)
+        if user is not None:
+            return user
+        
+        with self._lock:
+            version = self._version
+        user = loader(user_id)
+        if user is not None:
+            self._put(user_id, user, version)
+        return user
+    
+    def _put(self, user_id: str, user, version: int):
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, user_id: Optional[str] = None):
+        """Remove o usuário do cache, ou todos quando user_id não é informado"""
+        with self._lock:
+            self._version += 1
+            self.invalidations += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+user_cache = UserCache(max_size=settings.user_cache_size, ttl=settings.user_cache_ttl)
@@ -2,11 +2,9 @@ import uuid
 import sqlite3
 import os
 from datetime import datetime
-from passlib.context import CryptContext
 from modules.config.settings import settings
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from modules.utils.password import hash_password, verify_password
+from modules.user.cache import user_cache
 
 class User:
     """User model for authentication"""
@@ -58,11 +56,11 @@ class User:
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = pwd_context.hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Check if provided password matches hash"""
-        return pwd_context.verify(password, self.password_hash)
+        return verify_password(password, self.password_hash)
     
     def to_dict(self):
         """Convert user object to dictionary"""
@@ -152,6 +150,7 @@ class User:
                 ))
             
             conn.commit()
+            user_cache.invalidate(self.id)
             return True
         except Exception as e:
             conn.rollback()
@@ -165,6 +164,7 @@ class User:
         try:
             conn.execute('DELETE FROM users WHERE id = ?', (self.id,))
             conn.commit()
+            user_cache.invalidate(self.id)
             return True
         except Exception as e:
             conn.rollback()